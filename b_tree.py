@@ -1,78 +1,383 @@
 import icontract
-from typing import List, Optional, Tuple, Dict, Any
+from array import array
+from bisect import bisect_left
+import io
+import os
+from time import perf_counter_ns
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Type, Union
 from collections import deque
-from b_tree_node import BTreeNode
-from contracts_helpers import _check_node_key_count, _check_node_child_count, _check_keys_sorted
+from itertools import count
+from b_tree_node import BTreeNode, Key
+from b_tree_cursor import BTreeCursor
+from b_tree_io import _read_snapshot, _write_snapshot
+from b_tree_stats import BTreeStats
+from contracts_helpers import CheckMode, _check_node_key_count, _check_node_child_count, _check_subtree, _check_path
+
+_epochs = count(1)
+
+# Intercala duas sequências estritamente crescentes, gerando as chaves que estão só na primeira,
+# nas duas ou só na segunda, conforme os indicadores.
+def _merge_sorted(a: Iterator[Key], b: Iterator[Key], only_a: bool, both: bool, only_b: bool) -> Iterator[Key]:
+    end = object()
+    x, y = next(a, end), next(b, end)
+    while x is not end and y is not end:
+        if x < y:
+            if only_a: yield x
+            x = next(a, end)
+        elif y < x:
+            if only_b: yield y
+            y = next(b, end)
+        else:
+            if both: yield x
+            x, y = next(a, end), next(b, end)
+    if only_a and x is not end:
+        yield x
+        yield from a
+    if only_b and y is not end:
+        yield y
+        yield from b
 
 @icontract.invariant(lambda self: self._check_all_invariants(), description="Verifica as invariantes da Árvore-B")
 class BTree:
-    def __init__(self, t: int):
+    def __init__(self, t: int, check_mode: CheckMode = CheckMode.FULL, sample_every: int = 100,
+                 node_class: Type[BTreeNode] = BTreeNode, stats: bool = False, lazy_delete: bool = False,
+                 compaction_ratio: float = 0.25):
         if t < 2: raise ValueError("A ordem 't' da Árvore-B deve ser no mínimo 2.")
-        self.root, self.t = BTreeNode(leaf=True), t
+        if sample_every < 1: raise ValueError("O intervalo de amostragem deve ser no mínimo 1.")
+        if not 0 < compaction_ratio <= 1: raise ValueError("A proporção de compactação deve estar no intervalo (0, 1].")
+        self.t, self.node_class = t, node_class
+        # Classes de nó sem o gancho de busca (como as de terceiros) usam a bisseção comum.
+        self._bisect = getattr(node_class, "bisect_keys", bisect_left)
+        # Cada `snapshot`, `split` ou `join` inicia uma nova época, única entre todas as árvores;
+        # nós de outras épocas podem estar compartilhados e são copiados antes de qualquer
+        # alteração. A época 0 indica uma árvore que nunca compartilhou nós.
+        self._epoch = 0
+        self.root = self._new_node(leaf=True)
+        self.check_mode, self.sample_every = CheckMode(check_mode), sample_every
+        self._checks_done, self._touched_keys, self._full_check_due = 0, [], False
+        self.stats: Optional[BTreeStats] = BTreeStats() if stats else None
+        self._finger: Optional[List[BTreeNode]] = None
+        self.lazy_delete, self.compaction_ratio = lazy_delete, compaction_ratio
+        # Com remoção preguiçosa, `size` conta só as chaves vivas: as marcadas ficam nos nós, mas
+        # fora dos tamanhos das subárvores.
+        self._tombstones: Set[Key] = set()
+
+    @classmethod
+    def from_sorted(cls, keys: Iterable[Key], t: int, fill_factor: float = 1.0, **kwargs) -> "BTree":
+        tree = cls(t, **kwargs)
+        tree.root = tree._pack_sorted(keys, fill_factor)
+        return tree
+
+    @classmethod
+    def bulk_load(cls, keys: Iterable[Key], t: int, fill_factor: float = 1.0, **kwargs) -> "BTree":
+        return cls.from_sorted(sorted(set(keys)), t, fill_factor, **kwargs)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "BTree":
+        with open(path, "rb") as fp: return cls.from_bytes(fp.read(), **kwargs)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, **kwargs) -> "BTree":
+        return _read_snapshot(cls, data, **kwargs)
 
-    @icontract.require(lambda self, k: self.search(k) is None, "A chave a ser inserida não deve existir na árvore.")
+    def save(self, path: str):
+        # Grava em um arquivo temporário e o renomeia, para que um snapshot anterior
+        # nunca fique parcialmente sobrescrito.
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as fp: _write_snapshot(self._packed_live(), fp)
+        os.replace(tmp_path, path)
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        _write_snapshot(self._packed_live(), buffer)
+        return buffer.getvalue()
+
+    # Os snapshots binários não guardam marcas de remoção: as chaves vivas são empacotadas em uma
+    # árvore temporária, e esta (que pode ser um snapshot de leitura) não é alterada.
+    def _packed_live(self) -> "BTree":
+        if not self._tombstones: return self
+        tree = BTree(self.t, check_mode=CheckMode.OFF, node_class=self.node_class)
+        tree.root = tree._pack_sorted(self._cursor().first().forward(), 1.0)
+        return tree
+
+    def snapshot(self) -> "BTreeSnapshot":
+        from b_tree_snapshot import BTreeSnapshot
+        snap = BTreeSnapshot._of(self)
+        self._epoch = next(_epochs)
+        return snap
+
+    # A descida até k separa, em cada nível, as chaves e os filhos à esquerda e à direita do
+    # caminho. Cada lado é remontado de baixo para cima com `_join_subtrees`; como as alturas das
+    # partes crescem ao subir, a soma das diferenças de altura (e o custo total) é O(log n). As
+    # duas árvores compartilham os nós fora do caminho com esta, que não é alterada.
+    def split(self, k: Key) -> Tuple["BTree", "BTree"]:
+        left, right = self._empty_like(), self._empty_like()
+        self._epoch = next(_epochs)
+        # As marcas são repartidas antes da montagem, para que os tamanhos das partes já as descontem.
+        for dead in self._tombstones: (left if dead < k else right)._tombstones.add(dead)
+        lefts, rights = [], []
+        x, h = self.root, self._height_below(self.root)
+        while True:
+            i = self._bisect(x.keys, k)
+            found = i < len(x.keys) and x.keys[i] == k
+            if found or x.leaf: break
+            if i: lefts.append((*left._piece(x.keys[:i - 1], x.children[:i], h), x.keys[i - 1]))
+            if i < len(x.keys): rights.append((x.keys[i], *right._piece(x.keys[i + 1:], x.children[i + 1:], h)))
+            x, h = x.children[i], h - 1
+        acc = left._piece(x.keys[:i], x.children[:i + 1], h)
+        for node, height, s in reversed(lefts): acc = left._join_subtrees(node, height, s, *acc)
+        left.root = acc[0]
+        acc = right._piece(x.keys[i + 1:] if found else x.keys[i:], x.children[i + 1:], h)
+        for s, node, height in reversed(rights): acc = right._join_subtrees(*acc, s, node, height)
+        right.root = acc[0]
+        if found:
+            right._insert_along([], k)
+            if k in right._tombstones: right._shift_sizes(k, -1)
+        return left, right
+
+    # A maior chave de `left` vira a separadora: ela é removida de uma cópia de `left` e a árvore
+    # mais baixa é pendurada na borda da mais alta. As árvores de entrada não são alteradas.
+    @staticmethod
+    def join(left: "BTree", right: "BTree") -> "BTree":
+        if left.t != right.t or left.node_class is not right.node_class:
+            raise ValueError("As árvores devem ter a mesma ordem 't' e a mesma classe de nó.")
+        if left.root.keys and right.root.keys and left._get_predecessor(left.root) >= right._get_successor(right.root):
+            raise ValueError("Todas as chaves da árvore da esquerda devem ser menores que as da direita.")
+        tree = left._empty_like()
+        tree._tombstones = left._tombstones | right._tombstones
+        left._epoch, right._epoch = next(_epochs), next(_epochs)
+        if not left.root.keys: tree.root = right.root
+        elif not right.root.keys: tree.root = left.root
+        else:
+            tree.root = left.root
+            s = tree._get_predecessor(tree.root)
+            tree._delete_along([], s)
+            tree.root, _ = tree._join_subtrees(tree.root, tree._height_below(tree.root), s,
+                                               right.root, right._height_below(right.root))
+        return tree
+
+    def union(self, other: "BTree", fill_factor: float = 1.0) -> "BTree":
+        return self._merged_with(other, fill_factor, True, True, True)
+
+    def intersection(self, other: "BTree", fill_factor: float = 1.0) -> "BTree":
+        return self._merged_with(other, fill_factor, False, True, False)
+
+    def difference(self, other: "BTree", fill_factor: float = 1.0) -> "BTree":
+        return self._merged_with(other, fill_factor, True, False, False)
+
+    # As operações de conjunto intercalam as duas sequências ordenadas e montam o resultado com
+    # `_pack_sorted`, em tempo linear no total de chaves.
+    def _merged_with(self, other: "BTree", fill_factor: float, only_self: bool, both: bool, only_other: bool) -> "BTree":
+        tree = self._empty_like()
+        merged = _merge_sorted(self._cursor().first().forward(), other._cursor().first().forward(),
+                               only_self, both, only_other)
+        tree.root = tree._pack_sorted(merged, fill_factor)
+        return tree
+
+    @icontract.require(lambda self, k: not self._contains(k), "A chave a ser inserida não deve existir na árvore.")
     @icontract.ensure(
         lambda self, result: (self._check_structural_postconditions() and (not (result["root_keys_len"] == 2 * self.t - 1) or self.get_height() == result["height"] + 1)),
         description="A estrutura e a altura da árvore devem ser válidas após a inserção."
     )
-    def insert(self, k: int) -> Dict[str, Any]:
+    def insert(self, k: Key) -> Dict[str, Any]:
+        start = perf_counter_ns() if self.stats else 0
         old_state = {"height": self.get_height(), "root_keys_len": len(self.root.keys)}
-        root = self.root
-        if len(root.keys) == 2 * self.t - 1:
-            new_root = BTreeNode()
-            self.root = new_root
-            new_root.children.append(root)
-            self._split_child(new_root, 0)
-            self._insert_non_full(new_root, k)
-        else:
-            self._insert_non_full(root, k)
+        self._touch(k)
+        # Uma chave marcada como removida volta a valer; a descida ainda é feita para que uma
+        # raiz cheia seja dividida, como exige a pós-condição.
+        self._resurrect(k)
+        self._insert_along([], k)
+        if self.stats: self.stats.record("insert", perf_counter_ns() - start)
         return old_state
 
-    @icontract.require(lambda self, k: self.search(k) is not None, "A chave a ser removida deve existir na árvore.")
+    @icontract.require(lambda self, k: self._contains(k), "A chave a ser removida deve existir na árvore.")
     @icontract.ensure(
         lambda self, result: (
             self._check_structural_postconditions() and
-            self.get_height() in [result['height'], result['height'] - 1] and
-            (self.get_height() != result['height'] - 1 or (result["root_keys_len"] == 1 and not result["root_is_leaf"]))
+            (result["compacted"] or (
+                self.get_height() in [result['height'], result['height'] - 1] and
+                (self.get_height() != result['height'] - 1 or (result["root_keys_len"] == 1 and not result["root_is_leaf"]))
+            ))
         ),
         description="A estrutura e a altura da árvore devem ser válidas após a remoção."
     )
-    def delete(self, k: int) -> Dict[str, Any]:
+    def delete(self, k: Key) -> Dict[str, Any]:
+        start = perf_counter_ns() if self.stats else 0
         old_state = {"height": self.get_height(), "root_keys_len": len(self.root.keys), "root_is_leaf": self.root.leaf}
-        self._delete_recursive(self.root, k)
-        if len(self.root.keys) == 0 and not self.root.leaf:
-            self.root = self.root.children[0]
+        self._touch(k)
+        if self.lazy_delete: self._bury(k)
+        else: self._delete_along([], k)
+        old_state["compacted"] = self._maybe_compact()
+        if self.stats: self.stats.record("delete", perf_counter_ns() - start)
         return old_state
-    
+
+    @icontract.ensure(lambda self: self._check_structural_postconditions(), description="A estrutura da árvore deve ser válida após a inserção em lote.")
+    def insert_many(self, keys: Iterable[Key]) -> List[Tuple[Key, bool]]:
+        start = perf_counter_ns() if self.stats else 0
+        keys, path, inserted = list(keys), [], {}
+        for k in sorted(set(keys)):
+            self._touch(k)
+            inserted[k] = self._resurrect(k) or self._insert_along(path, k)
+        if self.stats: self.stats.record("insert_many", perf_counter_ns() - start)
+        return self._batch_outcomes(keys, inserted)
+
+    @icontract.ensure(lambda self: self._check_structural_postconditions(), description="A estrutura da árvore deve ser válida após a remoção em lote.")
+    def delete_many(self, keys: Iterable[Key]) -> List[Tuple[Key, bool]]:
+        start = perf_counter_ns() if self.stats else 0
+        keys, path, removed = list(keys), [], {}
+        for k in sorted(set(keys)):
+            self._touch(k)
+            removed[k] = self._bury(k) if self.lazy_delete else self._delete_along(path, k)
+        self._maybe_compact()
+        if self.stats: self.stats.record("delete_many", perf_counter_ns() - start)
+        return self._batch_outcomes(keys, removed)
+
+    # Resultado por chave na ordem da entrada; repetições dentro do lote contam como ignoradas.
+    def _batch_outcomes(self, keys: List[Key], applied: Dict[Key, bool]) -> List[Tuple[Key, bool]]:
+        outcomes, seen = [], set()
+        for k in keys:
+            outcomes.append((k, applied[k] and k not in seen))
+            seen.add(k)
+        return outcomes
+
+    def compact(self, fill_factor: float = 1.0):
+        if not self._tombstones: return
+        live = list(self._cursor().first().forward())
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            stack.extend(node.children)
+            self._release_node(node)
+        self._tombstones = set()
+        self.root = self._pack_sorted(live, fill_factor)
+        if self.stats: self.stats.count("compactions")
+
+    # Remoção preguiçosa: a chave fica na árvore, marcada como removida, até sair por uma
+    # compactação; só os tamanhos do caminho até ela mudam.
+    def _bury(self, k: Key) -> bool:
+        if k in self._tombstones or not self._shift_sizes(k, -1): return False
+        self._tombstones.add(k)
+        if self.stats: self.stats.count("tombstones")
+        return True
+
+    def _resurrect(self, k: Key) -> bool:
+        if k not in self._tombstones: return False
+        self._tombstones.discard(k)
+        self._shift_sizes(k, 1)
+        return True
+
+    # Soma `delta` aos tamanhos dos nós do caminho até `k`, em uma só descida; retorna False se
+    # `k` não está na árvore. Os nós do caminho são anotados e só mudam (e só são copiados, se
+    # compartilhados) depois que a chave é encontrada.
+    def _shift_sizes(self, k: Key, delta: int) -> bool:
+        bisect, x, path = self._bisect, self.root, []
+        while True:
+            i = bisect(x.keys, k)
+            if i < len(x.keys) and x.keys[i] == k: break
+            if x.leaf: return False
+            path.append((x, i))
+            x = x.children[i]
+        if self._epoch:
+            node = self._writable_root()
+            for _, i in path:
+                node.size += delta
+                node = self._writable_child(node, i)
+            node.size += delta
+            return True
+        for node, _ in path: node.size += delta
+        x.size += delta
+        return True
+
+    # Compactação amortizada: quando as marcas passam da proporção configurada das chaves
+    # guardadas, todas saem de uma vez. Uma passada ordenada filtra as marcas das folhas (os
+    # tamanhos, que já as descontam, não mudam) e, na volta, acerta com um irmão os nós que
+    # ficaram com menos de t-1 chaves; as poucas marcas que restam em nós internos saem depois,
+    # em ordem, com o caminho compartilhado de `_delete_along`. Como a próxima passada só vem
+    # após outras `compaction_ratio * n` remoções, o custo por remoção é O(1) amortizado.
+    def _maybe_compact(self) -> bool:
+        dead = self._tombstones
+        if len(dead) <= self.compaction_ratio * (self.root.size + len(dead)): return False
+        self._finger = None
+        self._sweep(self._writable_root())
+        while not self.root.keys and not self.root.leaf:
+            old_root, self.root = self.root, self.root.children[0]
+            self._release_node(old_root)
+        path = []
+        for k in sorted(dead): self._delete_along(path, k)
+        dead.clear()
+        # A passada altera a árvore toda; no modo barato, a próxima verificação é completa.
+        self._touched_keys, self._full_check_due = [], self.check_mode is CheckMode.CHEAP
+        if self.stats: self.stats.count("compactions")
+        return True
+
+    def _sweep(self, x: BTreeNode):
+        dead = self._tombstones
+        if x.leaf:
+            for i in reversed([i for i, k in enumerate(x.keys) if k in dead]):
+                dead.discard(x.keys[i])
+                del x.keys[i]
+            return
+        for j in range(len(x.children)): self._sweep(self._writable_child(x, j))
+        j = 0
+        while len(x.children) > 1 and j < len(x.children):
+            if len(x.children[j].keys) < self.t - 1:
+                j = j - 1 if j else 0
+                self._rebalance_siblings(x, j)
+            else: j += 1
+
+    # Quanto uma chave conta nos tamanhos: 0 se está marcada como removida, 1 caso contrário.
+    def _weight(self, k: Key) -> int:
+        return 0 if self._tombstones and k in self._tombstones else 1
+
+    def _live_count(self, keys) -> int:
+        dead = self._tombstones
+        return len(keys) - sum(1 for k in keys if k in dead) if dead else len(keys)
+
+    def _touch(self, k: Key):
+        if self.check_mode is CheckMode.CHEAP: self._touched_keys.append(k)
+
+    # Com estatísticas ativas, o tempo das verificações de contrato é medido à parte do das operações.
+    def _timed_check(self, check, *args) -> bool:
+        if not self.stats: return check(*args)
+        start = perf_counter_ns()
+        ok = check(*args)
+        self.stats.record_contract(perf_counter_ns() - start)
+        return ok
+
+    def _contains(self, k: Key) -> bool:
+        if self._tombstones and k in self._tombstones: return False
+        spine = self._finger
+        if spine and spine[0] is self.root and spine[-1].keys and k > spine[-1].keys[-1]: return False
+        return self._timed_check(self._search_from, self.root, k) is not None
+
     def _check_all_invariants(self) -> bool:
-        if not self.root: return True
-        leaf_depths = self._get_all_leaf_depths()
-        if len(set(leaf_depths)) > 1: return False
-        return self._check_node_properties_recursively(self.root)
-        
-    def _get_all_leaf_depths(self) -> List[int]:
-        if not self.root or (not self.root.keys and self.root.leaf): return [0]
-        depths, q = [], deque([(self.root, 0)])
-        while q:
-            node, depth = q.popleft()
-            if node.leaf: depths.append(depth)
-            for child in node.children: q.append((child, depth + 1))
-        return depths
+        return self._timed_check(self._evaluate_invariants)
 
-    def _check_node_properties_recursively(self, node: BTreeNode) -> bool:
-        if not _check_keys_sorted(node.keys): return False
-        if not node.leaf:
-            for i in range(len(node.keys)):
-                for key_in_left_subtree in self._get_all_keys(node.children[i]):
-                    if key_in_left_subtree >= node.keys[i]: return False
-                for key_in_right_subtree in self._get_all_keys(node.children[i+1]):
-                    if key_in_right_subtree <= node.keys[i]: return False
-            for child in node.children:
-                if not self._check_node_properties_recursively(child): return False
+    def _evaluate_invariants(self) -> bool:
+        if not self.root: return True
+        mode = self.check_mode
+        if mode is CheckMode.FULL:
+            dead = self._tombstones
+            return _check_subtree(self.root, self.t, dead) and all(self._search_from(self.root, k) for k in dead)
+        if mode is CheckMode.CHEAP:
+            touched, self._touched_keys = self._touched_keys, []
+            if self._full_check_due:
+                self._full_check_due = False
+                return _check_subtree(self.root, self.t, self._tombstones)
+            height = self.get_height()
+            return all(_check_path(self.root, self.t, k, height, self._tombstones) for k in touched)
+        if mode is CheckMode.SAMPLED:
+            # Cada operação pública avalia a invariante duas vezes (entrada e saída).
+            self._checks_done += 1
+            return self._checks_done % (2 * self.sample_every) != 0 or _check_subtree(self.root, self.t, self._tombstones)
         return True
-        
+
     def _check_structural_postconditions(self) -> bool:
-        if not self.root: return True
+        # Nos modos mais baratos a estrutura é coberta pela invariante da saída.
+        if not self.root or self.check_mode is not CheckMode.FULL: return True
+        return self._timed_check(self._evaluate_structure)
+
+    def _evaluate_structure(self) -> bool:
         q = deque([(self.root, True)])
         while q:
             node, is_root = q.popleft()
@@ -81,116 +386,569 @@ class BTree:
             for child in node.children: q.append((child, False))
         return True
 
-    def search(self, k: int) -> Optional[Tuple[BTreeNode, int]]:
-        return self._search_recursive(self.root, k)
+    def search(self, k: Key) -> Optional[Tuple[BTreeNode, int]]:
+        if self._tombstones and k in self._tombstones: return None
+        if not self.stats: return self._search_from(self.root, k)
+        start = perf_counter_ns()
+        result = self._search_from(self.root, k)
+        self.stats.record("search", perf_counter_ns() - start)
+        # Todas as folhas estão na mesma profundidade: a busca visita um nó por nível,
+        # da raiz até o nó onde parou.
+        stop_height = self._height_below(result[0]) if result else 0
+        self.stats.count("nodes_visited", self._height_below(self.root) - stop_height + 1)
+        return result
 
-    def _search_recursive(self, x: BTreeNode, k: int) -> Optional[Tuple[BTreeNode, int]]:
-        i = 0
-        while i < len(x.keys) and k > x.keys[i]: i += 1
-        if i < len(x.keys) and k == x.keys[i]: return (x, i)
-        if x.leaf: return None
-        return self._search_recursive(x.children[i], k)
+    def _search_from(self, x: BTreeNode, k: Key) -> Optional[Tuple[BTreeNode, int]]:
+        bisect = self._bisect
+        while True:
+            i = bisect(x.keys, k)
+            if i < len(x.keys) and x.keys[i] == k: return (x, i)
+            if x.leaf: return None
+            x = x.children[i]
 
-    def _insert_non_full(self, x: BTreeNode, k: int):
-        i = len(x.keys) - 1
-        if x.leaf:
-            x.keys.append(0)
-            while i >= 0 and k < x.keys[i]: x.keys[i + 1], i = x.keys[i], i - 1
-            x.keys[i + 1] = k
-        else:
-            while i >= 0 and k < x.keys[i]: i -= 1
-            i += 1
-            if len(x.children[i].keys) == 2 * self.t - 1:
+    def __contains__(self, k: Key) -> bool:
+        if self._tombstones and k in self._tombstones: return False
+        return self._search_from(self.root, k) is not None
+
+    def search_many(self, keys, positions: bool = False):
+        try: import numpy as np
+        except ImportError as e: raise ImportError("search_many requer o pacote numpy (pip install numpy).") from e
+        probes, keys_in_root = np.asarray(keys), self.root.keys
+        # O caminho vetorizado vale para chaves inteiras; as de outros tipos são buscadas uma a uma.
+        if probes.dtype.kind not in "iub" or (keys_in_root and not isinstance(keys_in_root[0], int)):
+            return self._search_each(np, np.asarray(keys, dtype=object), positions)
+        probes = probes.astype(np.int64, copy=False)
+        flat = probes.ravel()
+        order = np.argsort(flat, kind="stable")
+        sorted_probes = flat[order]
+        result = np.full(flat.shape, -1, dtype=np.int64) if positions else np.zeros(flat.shape, dtype=bool)
+        self._search_sorted(np, sorted_probes, order, result, positions)
+        return result.reshape(probes.shape)
+
+    def _search_each(self, np, probes, positions: bool):
+        flat = probes.ravel()
+        if not positions: return np.array([self._contains(k) for k in flat], dtype=bool).reshape(probes.shape)
+        result = [r if found else -1 for r, found in map(self._rank, flat)]
+        return np.array(result, dtype=np.int64).reshape(probes.shape)
+
+    # Percorre a árvore uma única vez com as consultas ordenadas: em cada nó, `searchsorted`
+    # encaminha todo o trecho de consultas que chegou até ele, e cada filho recebe o trecho
+    # contíguo das consultas não encontradas que caem entre as suas separadoras. `base` é o
+    # número de chaves vivas da árvore à esquerda da subárvore do nó; com marcas de remoção,
+    # `live_before[j]` conta as chaves vivas do nó antes da j-ésima.
+    def _search_sorted(self, np, sorted_probes, order, result, positions: bool):
+        dead = self._tombstones
+        stack = [(self.root, 0, len(sorted_probes), 0)]
+        while stack:
+            x, lo, hi, base = stack.pop()
+            keys = x.keys
+            n = len(keys)
+            if not n: continue
+            node_keys = np.frombuffer(keys, dtype=np.int64) if isinstance(keys, array) else np.array(keys, dtype=np.int64)
+            probes = sorted_probes[lo:hi]
+            idx = np.searchsorted(node_keys, probes)
+            hit = node_keys[np.minimum(idx, n - 1)] == probes
+            live_before = np.arange(n + 1)
+            if dead:
+                live = np.fromiter((k not in dead for k in keys), bool, n)
+                np.cumsum(live, out=live_before[1:])
+            if positions and not x.leaf:
+                before = np.zeros(n + 2, dtype=np.int64)
+                np.cumsum(np.fromiter((c.size for c in x.children), np.int64, n + 1), out=before[1:])
+            if hit.any():
+                at, found = idx[hit], order[lo:hi][hit]
+                if dead:
+                    # Chaves marcadas encerram a busca, mas ficam como ausentes.
+                    alive = live[at]
+                    at, found = at[alive], found[alive]
+                if not positions: result[found] = True
+                elif x.leaf: result[found] = base + live_before[at]
+                else: result[found] = base + live_before[at] + before[at + 1]
+            if x.leaf: continue
+            starts = np.searchsorted(idx, np.arange(n + 2))
+            hits_per_child = np.bincount(idx[hit], minlength=n + 1)
+            for j in np.flatnonzero(starts[1:] - starts[:-1] - hits_per_child):
+                child_base = base + live_before[j] + before[j] if positions else 0
+                stack.append((x.children[j], lo + starts[j], lo + starts[j + 1] - hits_per_child[j], child_base))
+
+    def __iter__(self) -> Iterator[Key]:
+        return self._cursor().first().forward()
+
+    def __reversed__(self) -> Iterator[Key]:
+        return self._cursor().last().backward()
+
+    def cursor(self) -> BTreeCursor:
+        return BTreeCursor(self)
+
+    # O cursor das rotinas internas, sobre as chaves como estão guardadas nos nós.
+    def _cursor(self) -> BTreeCursor:
+        return self.cursor()
+
+    def range(self, lo: Optional[Key] = None, hi: Optional[Key] = None,
+              inclusive: Union[bool, Tuple[bool, bool]] = (True, True)) -> Iterator[Key]:
+        lo_inclusive, hi_inclusive = (inclusive, inclusive) if isinstance(inclusive, bool) else inclusive
+        cursor = self._cursor().first() if lo is None else self._cursor().seek(lo)
+        if lo is not None and not lo_inclusive and cursor._current() == lo: cursor.next()
+        return self._range_from(cursor, hi, hi_inclusive)
+
+    def _range_from(self, cursor: BTreeCursor, hi: Optional[Key], hi_inclusive: bool) -> Iterator[Key]:
+        for k in cursor.forward():
+            if hi is not None and (k > hi or (k == hi and not hi_inclusive)): return
+            yield k
+
+    def __len__(self) -> int:
+        return self.root.size
+
+    def rank(self, k: Key) -> int:
+        return self._rank(k)[0]
+
+    def select(self, i: int) -> Key:
+        n = len(self)
+        if i < 0: i += n
+        if not 0 <= i < n: raise IndexError("Índice fora do intervalo da árvore.")
+        return self._select(i)
+
+    # Desce pelos tamanhos das subárvores, que já descontam as marcas; dentro de cada nó, as
+    # chaves marcadas são puladas.
+    def _select(self, i: int) -> Key:
+        dead, x = self._tombstones, self.root
+        while not x.leaf:
+            for j, child in enumerate(x.children):
+                if i < child.size:
+                    x = child
+                    break
+                i -= child.size
+                if dead and x.keys[j] in dead: continue
+                if i == 0: return x.keys[j]
+                i -= 1
+        if not dead: return x.keys[i]
+        for k in x.keys:
+            if k in dead: continue
+            if i == 0: return k
+            i -= 1
+
+    def count_range(self, lo: Optional[Key] = None, hi: Optional[Key] = None,
+                    inclusive: Union[bool, Tuple[bool, bool]] = (True, True)) -> int:
+        lo_inclusive, hi_inclusive = (inclusive, inclusive) if isinstance(inclusive, bool) else inclusive
+        start, end = 0, self.root.size
+        if lo is not None:
+            start, found = self._rank(lo)
+            if found and not lo_inclusive: start += 1
+        if hi is not None:
+            end, found = self._rank(hi)
+            if found and hi_inclusive: end += 1
+        return max(0, end - start)
+
+    # Retorna quantas chaves vivas são menores que `k` e se `k` está na árvore (e não marcada),
+    # somando os tamanhos das subárvores à esquerda do caminho de busca.
+    def _rank(self, k: Key) -> Tuple[int, bool]:
+        dead, r, x = self._tombstones, 0, self.root
+        while True:
+            i = self._bisect(x.keys, k)
+            hit = i < len(x.keys) and x.keys[i] == k
+            before = self._live_count(x.keys[:i]) if dead else i
+            found = hit and not (dead and k in dead)
+            if x.leaf: return r + before, found
+            r += before + sum(x.children[j].size for j in range(i))
+            if hit: return r + x.children[i].size, found
+            x = x.children[i]
+
+    # `path` guarda (nó, lo, hi) da raiz até o último nó visitado, onde (lo, hi) é o intervalo
+    # aberto de chaves que cabe na subárvore do nó. Em um lote ordenado a descida recomeça do
+    # nó mais profundo do caminho que contém a próxima chave e ainda não está cheio.
+    def _insert_along(self, path: List[tuple], k: Key) -> bool:
+        if self._append(k):
+            path.clear()
+            return True
+        max_keys = 2 * self.t - 1
+        while path:
+            x, lo, hi = path[-1]
+            if (lo is None or k > lo) and (hi is None or k < hi) and len(x.keys) < max_keys: break
+            path.pop()
+        if not path:
+            if len(self.root.keys) == max_keys: self._split_root()
+            path.append((self._writable_root(), None, None))
+        x, lo, hi = path[-1]
+        while True:
+            i = self._bisect(x.keys, k)
+            if i < len(x.keys) and x.keys[i] == k: return False
+            if x.leaf:
+                x.keys.insert(i, k)
+                for node, _, _ in path: node.size += 1
+                return True
+            if len(x.children[i].keys) == max_keys:
                 self._split_child(x, i)
+                if k == x.keys[i]: return False
                 if k > x.keys[i]: i += 1
-            self._insert_non_full(x.children[i], k)
+            lo, hi = (x.keys[i - 1] if i else lo), (x.keys[i] if i < len(x.keys) else hi)
+            x = self._writable_child(x, i)
+            path.append((x, lo, hi))
+
+    # Caminho rápido para chaves maiores que todas as da árvore (timestamps, IDs sequenciais):
+    # a chave vai direto para a folha mais à direita, sem descida por busca binária.
+    def _append(self, k: Key) -> bool:
+        max_keys = 2 * self.t - 1
+        spine = self._right_spine()
+        leaf = spine[-1]
+        if not leaf.keys or k <= leaf.keys[-1]: return False
+        # Como na inserção comum (e no contrato de `insert`), uma raiz cheia é sempre dividida.
+        if len(self.root.keys) == max_keys: self._split_root()
+        if len(leaf.keys) == max_keys or spine[0] is not self.root: spine = self._make_room_on_right()
+        else: spine = self._writable_spine()
+        leaf = spine[-1]
+        leaf.keys.append(k)
+        for node in spine: node.size += 1
+        if self.stats: self.stats.count("appends")
+        return True
+
+    # `_finger` guarda a borda direita da árvore (da raiz até a folha mais à direita). Divisões
+    # e fusões que podem alterá-la a descartam; uma troca de raiz é detectada aqui.
+    def _right_spine(self) -> List[BTreeNode]:
+        spine = self._finger
+        if spine is None or spine[0] is not self.root:
+            x, spine = self.root, [self.root]
+            while not x.leaf:
+                x = x.children[-1]
+                spine.append(x)
+            self._finger = spine
+        return spine
+
+    # A borda direita pronta para ser alterada. Como a cópia sob escrita copia caminhos a partir
+    # da raiz, uma folha da época atual implica que toda a borda também é.
+    def _writable_spine(self) -> List[BTreeNode]:
+        spine = self._right_spine()
+        if self._epoch and spine[-1].epoch != self._epoch:
+            x = self._writable_root()
+            spine = [x]
+            while not x.leaf:
+                x = self._writable_child(x, len(x.children) - 1)
+                spine.append(x)
+            self._finger = spine
+        return spine
+
+    # Abre espaço na folha mais à direita, que está cheia. Subindo pela borda, cada nível cheio
+    # passa chaves para o irmão da esquerda enquanto ele tiver espaço; só quando o irmão também
+    # está cheio o nó é dividido. Assim, sob inserções crescentes, apenas os dois últimos nós de
+    # cada nível ficam parcialmente cheios.
+    def _make_room_on_right(self) -> List[BTreeNode]:
+        max_keys = 2 * self.t - 1
+        while True:
+            spine = self._writable_spine()
+            if len(spine[-1].keys) < max_keys: return spine
+            j = len(spine) - 1
+            while j > 0 and len(spine[j - 1].keys) == max_keys and len(spine[j - 1].children[-2].keys) == max_keys: j -= 1
+            if j == 0: self._split_root()
+            elif len(spine[j - 1].children[-2].keys) < max_keys: self._shift_into_left(spine[j - 1], len(spine[j - 1].keys) - 1)
+            else: self._split_child(spine[j - 1], len(spine[j - 1].keys))
+
+    # Move chaves (e filhos) do filho i+1 de x para o filho i, pela separadora, até enchê-lo.
+    def _shift_into_left(self, x: BTreeNode, i: int):
+        if self.stats: self.stats.count("rotations")
+        left, right = self._writable_child(x, i), self._writable_child(x, i + 1)
+        m = 2 * self.t - 1 - len(left.keys)
+        # A esquerda ganha a separadora e m-1 chaves; a direita perde essas m-1 e a nova
+        # separadora. Com marcas de remoção, as duas contagens podem diferir.
+        lost = self._live_count(right.keys[:m]) if self._tombstones else m
+        left.keys.append(x.keys[i])
+        left.keys.extend(right.keys[:m - 1])
+        x.keys[i] = right.keys[m - 1]
+        del right.keys[:m]
+        gained = self._live_count(left.keys[-m:]) if self._tombstones else m
+        if not right.leaf:
+            moved = sum(c.size for c in right.children[:m])
+            gained, lost = gained + moved, lost + moved
+            left.children.extend(right.children[:m])
+            del right.children[:m]
+        left.size, right.size = left.size + gained, right.size - lost
+
+    def _new_node(self, leaf: bool = False) -> BTreeNode:
+        node = self.node_class(leaf=leaf)
+        node.epoch = self._epoch
+        return node
+
+    # Cópia sob escrita: um nó de outra época pode estar em um snapshot, então é copiado (e o
+    # pai, já copiado, passa a apontar para a cópia) antes de ser alterado. As rotinas de
+    # divisão, fusão e empréstimo só alteram nós obtidos por aqui. A cópia pode estar na borda
+    # direita, então `_finger` é descartado.
+    def _writable_child(self, x: BTreeNode, i: int) -> BTreeNode:
+        child = x.children[i]
+        if not self._epoch or child.epoch == self._epoch: return child
+        x.children[i] = copy = self._copy_node(child)
+        self._finger = None
+        return copy
+
+    def _writable_root(self) -> BTreeNode:
+        self.root = self._writable(self.root)
+        return self.root
+
+    def _writable(self, node: BTreeNode) -> BTreeNode:
+        if not self._epoch or node.epoch == self._epoch: return node
+        return self._copy_node(node)
+
+    def _copy_node(self, node: BTreeNode) -> BTreeNode:
+        copy = self._new_node(leaf=node.leaf)
+        copy.keys, copy.children, copy.size = node.keys[:], node.children[:], node.size
+        return copy
+
+    # Chamado quando um nó sai da árvore (fusão ou redução da altura); armazenamentos que
+    # gerenciam o espaço dos nós, como o paginado, o reaproveitam.
+    def _release_node(self, node: BTreeNode):
+        pass
+
+    def _split_root(self):
+        if self.stats: self.stats.count("root_splits")
+        new_root = self._new_node()
+        new_root.children.append(self.root)
+        new_root.size = self.root.size
+        self.root = new_root
+        self._split_child(new_root, 0)
 
     def _split_child(self, x: BTreeNode, i: int):
+        if self.stats: self.stats.count("splits")
+        if i == len(x.keys): self._finger = None
         t = self.t
-        y = x.children[i]
-        z = BTreeNode(leaf=y.leaf)        
+        y = self._writable_child(x, i)
+        z = self._new_node(leaf=y.leaf)
         x.children.insert(i + 1, z)
         x.keys.insert(i, y.keys[t - 1])
         z.keys, y.keys = y.keys[t:], y.keys[:t - 1]
         if not y.leaf:
             z.children, y.children = y.children[t:], y.children[:t]
+        z.size = self._live_count(z.keys) + sum(c.size for c in z.children)
+        y.size -= z.size + self._weight(x.keys[i])
 
-    def _delete_recursive(self, x: BTreeNode, k: int):
-        t, i = self.t, 0
-        while i < len(x.keys) and k > x.keys[i]: i += 1
-        if i < len(x.keys) and x.keys[i] == k:
-            if x.leaf: x.keys.pop(i)
-            else: self._delete_from_internal_node(x, i)
-        else:
-            if x.leaf: return
-            child_idx = i
-            is_last_child = (child_idx == len(x.children) - 1)
-            if len(x.children[child_idx].keys) < t:
-                self._fill_child(x, child_idx)
-            if is_last_child and child_idx > len(x.keys):
-                self._delete_recursive(x.children[child_idx - 1], k)
+    # Mesma ideia de `_insert_along`: a descida recomeça do nó mais profundo do caminho que
+    # contém a chave e que pode perder uma chave (a raiz ou um nó com ao menos t chaves).
+    def _delete_along(self, path: List[tuple], k: Key) -> bool:
+        t = self.t
+        while path:
+            x, lo, hi = path[-1]
+            if (lo is None or k > lo) and (hi is None or k < hi) and (x is self.root or len(x.keys) >= t): break
+            path.pop()
+        if not path: path.append((self._writable_root(), None, None))
+        x, lo, hi = path[-1]
+        # Com marcas, a chave removida e o substituto que sobe no lugar dela podem contar de
+        # forma diferente: cada par (j, w) diz que os nós do caminho a partir de j perdem w.
+        drops = [(0, self._weight(k))] if self._tombstones else None
+        while True:
+            i = self._bisect(x.keys, k)
+            if i < len(x.keys) and x.keys[i] == k:
+                if x.leaf:
+                    x.keys.pop(i)
+                    removed = True
+                    break
+                i, k = self._delete_from_internal_node(x, i)
+                # A descida segue até a folha de onde sai o substituto; no modo barato, é esse
+                # caminho que precisa ser verificado.
+                self._touch(k)
+                if drops is not None: drops.append((len(path), self._weight(k)))
             else:
-                self._delete_recursive(x.children[child_idx], k)
+                if x.leaf:
+                    removed = False
+                    break
+                is_last_child = (i == len(x.keys))
+                if len(x.children[i].keys) < t:
+                    self._fill_child(x, i)
+                if is_last_child and i > len(x.keys): i -= 1
+            lo, hi = (x.keys[i - 1] if i else lo), (x.keys[i] if i < len(x.keys) else hi)
+            x = self._writable_child(x, i)
+            path.append((x, lo, hi))
+        if removed and drops is not None:
+            for (j, w), (end, _) in zip(drops, drops[1:] + [(len(path), 0)]):
+                for node, _, _ in path[j:end]: node.size -= w
+        elif removed:
+            for node, _, _ in path: node.size -= 1
+        if len(self.root.keys) == 0 and not self.root.leaf:
+            old_root, self.root = self.root, self.root.children[0]
+            self._release_node(old_root)
+            path.clear()
+            if self.stats: self.stats.count("root_shrinks")
+        return removed
 
-    def _delete_from_internal_node(self, x: BTreeNode, i: int):
+    # Retorna o índice do filho e a chave com que a descida da remoção deve continuar.
+    def _delete_from_internal_node(self, x: BTreeNode, i: int) -> Tuple[int, Key]:
         t, k = self.t, x.keys[i]
         if len(x.children[i].keys) >= t:
             pred = self._get_predecessor(x.children[i])
             x.keys[i] = pred
-            self._delete_recursive(x.children[i], pred)
-        elif len(x.children[i+1].keys) >= t:
+            return i, pred
+        if len(x.children[i+1].keys) >= t:
             succ = self._get_successor(x.children[i+1])
             x.keys[i] = succ
-            self._delete_recursive(x.children[i+1], succ)
-        else:
-            self._merge_children(x, i)
-            self._delete_recursive(x.children[i], k)
+            return i + 1, succ
+        self._merge_children(x, i)
+        return i, k
 
     def _fill_child(self, x: BTreeNode, i: int):
+        if self.stats: self.stats.count("fills")
         if i != 0 and len(x.children[i - 1].keys) >= self.t: self._borrow_from_prev(x, i)
         elif i != len(x.keys) and len(x.children[i + 1].keys) >= self.t: self._borrow_from_next(x, i)
         elif i != len(x.keys): self._merge_children(x, i)
         else: self._merge_children(x, i - 1)
 
     def _borrow_from_prev(self, x: BTreeNode, i: int):
-        child, sibling = x.children[i], x.children[i - 1]
+        if self.stats: self.stats.count("borrows_prev")
+        child, sibling = self._writable_child(x, i), self._writable_child(x, i - 1)
         child.keys.insert(0, x.keys[i - 1])
         x.keys[i - 1] = sibling.keys.pop()
-        if not child.leaf: child.children.insert(0, sibling.children.pop())
+        # A separadora desce e a chave do irmão sobe; com marcas, elas podem contar diferente.
+        gained, lost = self._weight(child.keys[0]), self._weight(x.keys[i - 1])
+        if not child.leaf:
+            child.children.insert(0, sibling.children.pop())
+            gained, lost = gained + child.children[0].size, lost + child.children[0].size
+        child.size, sibling.size = child.size + gained, sibling.size - lost
 
     def _borrow_from_next(self, x: BTreeNode, i: int):
-        child, sibling = x.children[i], x.children[i + 1]
+        if self.stats: self.stats.count("borrows_next")
+        child, sibling = self._writable_child(x, i), self._writable_child(x, i + 1)
         child.keys.append(x.keys[i])
         x.keys[i] = sibling.keys.pop(0)
-        if not child.leaf: child.children.append(sibling.children.pop(0))
+        gained, lost = self._weight(child.keys[-1]), self._weight(x.keys[i])
+        if not child.leaf:
+            child.children.append(sibling.children.pop(0))
+            gained, lost = gained + child.children[-1].size, lost + child.children[-1].size
+        child.size, sibling.size = child.size + gained, sibling.size - lost
 
     def _merge_children(self, x: BTreeNode, i: int):
-        child, sibling = x.children[i], x.children[i + 1]
-        child.keys.append(x.keys.pop(i))
+        if self.stats: self.stats.count("merges")
+        if i == len(x.keys) - 1: self._finger = None
+        child, sibling = self._writable_child(x, i), x.children[i + 1]
+        separator = x.keys.pop(i)
+        child.keys.append(separator)
         child.keys.extend(sibling.keys)
         child.children.extend(sibling.children)
+        child.size += self._weight(separator) + sibling.size
         x.children.pop(i + 1)
+        self._release_node(sibling)
 
-    def _get_predecessor(self, x: BTreeNode) -> int:
+    # Junta os filhos i e i+1 de x se couberem em um nó; caso contrário, redistribui as
+    # chaves ao meio, deixando o filho da direita com ao menos t-1 chaves.
+    def _rebalance_siblings(self, x: BTreeNode, i: int):
+        if len(x.children[i].keys) + len(x.children[i + 1].keys) + 1 <= 2 * self.t - 1:
+            self._merge_children(x, i)
+            return
+        left, right = self._writable_child(x, i), self._writable_child(x, i + 1)
+        keys, children = left.keys[:], [*left.children, *right.children]
+        keys.append(x.keys[i])
+        keys.extend(right.keys)
+        total, m = left.size + self._weight(x.keys[i]) + right.size, (len(keys) - 1) // 2
+        left.keys, x.keys[i], right.keys = keys[:m], keys[m], keys[m + 1:]
+        if not left.leaf: left.children, right.children = children[:m + 1], children[m + 1:]
+        left.size = self._live_count(left.keys) + sum(c.size for c in left.children)
+        right.size = total - self._weight(keys[m]) - left.size
+
+    # Uma árvore vazia com a mesma configuração, já em uma época própria, para receber nós
+    # compartilhados com esta.
+    def _empty_like(self, cls: Optional[Type["BTree"]] = None) -> "BTree":
+        tree = (cls or type(self))(self.t, check_mode=self.check_mode, sample_every=self.sample_every,
+                                   node_class=self.node_class, stats=self.stats is not None,
+                                   lazy_delete=self.lazy_delete, compaction_ratio=self.compaction_ratio)
+        tree._epoch = next(_epochs)
+        tree.root = tree._new_node(leaf=True)
+        return tree
+
+    # Uma parte de um nó cortado por `split`, vista como uma subárvore de altura h. Uma parte sem
+    # chaves com um único filho é o próprio filho; sem filhos, uma folha vazia.
+    def _piece(self, keys, children: List[BTreeNode], h: int) -> Tuple[BTreeNode, int]:
+        if not keys and children: return children[0], h - 1
+        node = self._new_node(leaf=not children)
+        node.keys, node.children = keys, list(children)
+        node.size = self._live_count(keys) + sum(c.size for c in children)
+        return node, (h if children else 0)
+
+    # Junta as subárvores a (altura ha) e b (altura hb), com a < s < b, em O(|ha - hb| + 1): a
+    # mais baixa vira o filho da borda da mais alta no nível certo, com s como separadora. As
+    # raízes das partes podem ter menos de t-1 chaves; ao virarem filhos, são acertadas com o
+    # irmão por `_rebalance_siblings`, e os nós que passam de 2t-1 chaves são divididos na volta.
+    def _join_subtrees(self, a: BTreeNode, ha: int, s: Key, b: BTreeNode, hb: int) -> Tuple[BTreeNode, int]:
+        t, self._finger = self.t, None
+        if ha == hb:
+            root = self._new_node()
+            root.keys.append(s)
+            root.children.extend((a, b))
+            root.size = a.size + self._weight(s) + b.size
+            if min(len(a.keys), len(b.keys)) < t - 1: self._rebalance_siblings(root, 0)
+            return (root, ha + 1) if root.keys else (root.children[0], ha)
+        on_right = ha > hb
+        (top, h), short = ((a, ha), b) if on_right else ((b, hb), a)
+        path = [self._writable(top)]
+        while h > min(ha, hb) + 1:
+            x = path[-1]
+            path.append(self._writable_child(x, len(x.children) - 1 if on_right else 0))
+            h -= 1
+        x = path[-1]
+        if on_right: x.keys.append(s); x.children.append(short)
+        else: x.keys.insert(0, s); x.children.insert(0, short)
+        for node in path: node.size += self._weight(s) + short.size
+        if len(short.keys) < t - 1: self._rebalance_siblings(x, len(x.keys) - 1 if on_right else 0)
+        for j in range(len(path) - 1, 0, -1):
+            if len(path[j].keys) < 2 * t: break
+            self._split_child(path[j - 1], len(path[j - 1].keys) if on_right else 0)
+        top, h = path[0], max(ha, hb)
+        if len(top.keys) == 2 * t:
+            new_root = self._new_node()
+            new_root.children.append(top)
+            new_root.size = top.size
+            self._split_child(new_root, 0)
+            return new_root, h + 1
+        return top, h
+
+    # Constrói a árvore de baixo para cima em uma única passada sobre as chaves ordenadas.
+    # `spine[j]` é o nó aberto mais à direita do nível j (0 = folhas); quando um nó atinge a
+    # capacidade, a próxima chave sobe como separadora e uma nova cadeia de nós é aberta abaixo dela.
+    def _pack_sorted(self, keys: Iterable[Key], fill_factor: float) -> BTreeNode:
+        if not 0 < fill_factor <= 1: raise ValueError("O fator de preenchimento deve estar no intervalo (0, 1].")
+        t = self.t
+        cap = min(2 * t - 1, max(t - 1, round(fill_factor * (2 * t - 1))))
+        spine, prev = [self._new_node(leaf=True)], None
+        for k in keys:
+            if prev is not None and k <= prev: raise ValueError("As chaves devem estar em ordem estritamente crescente.")
+            prev = k
+            if len(spine[0].keys) < cap:
+                spine[0].keys.append(k)
+                continue
+            level = 1
+            while level < len(spine) and len(spine[level].keys) == cap: level += 1
+            if level == len(spine):
+                new_root = self._new_node()
+                new_root.children.append(spine[-1])
+                spine.append(new_root)
+            spine[level].keys.append(k)
+            for node in spine[:level]: node.size = self._live_count(node.keys) + sum(c.size for c in node.children)
+            for j in range(level - 1, -1, -1):
+                spine[j] = self._new_node(leaf=(j == 0))
+                spine[j + 1].children.append(spine[j])
+        for node in spine: node.size = self._live_count(node.keys) + sum(c.size for c in node.children)
+        # A borda direita pode ter ficado com poucas chaves. Descendo por ela, cada filho
+        # interno passa a ter ao menos t chaves, de modo que ainda possa ceder uma ao ser
+        # ajustado no nível seguinte; as folhas precisam apenas do mínimo t-1.
+        root = x = spine[-1]
+        while not x.leaf:
+            child = x.children[-1]
+            if x.keys and len(child.keys) < (t - 1 if child.leaf else t):
+                self._rebalance_siblings(x, len(x.keys) - 1)
+            if not x.keys:
+                old_root, root = x, x.children[0]
+                self._release_node(old_root)
+                x = root
+                continue
+            x = x.children[-1]
+        return root
+
+    def _get_predecessor(self, x: BTreeNode) -> Key:
         while not x.leaf: x = x.children[-1]
         return x.keys[-1]
         
-    def _get_successor(self, x: BTreeNode) -> int:
+    def _get_successor(self, x: BTreeNode) -> Key:
         while not x.leaf: x = x.children[0]
         return x.keys[0]
         
-    def _get_all_keys(self, node: Optional[BTreeNode]) -> List[int]:
-        if not node: return []
-        keys, q = [], deque([node])
-        while q:
-            curr = q.popleft()
-            keys.extend(curr.keys)
-            for child in curr.children: q.append(child)
-        return keys
-        
     def get_height(self) -> int:
-        if not self.root or self.root.leaf: return 0
-        h, node = 0, self.root
+        if not self.root: return 0
+        return self._height_below(self.root)
+
+    def _height_below(self, node: BTreeNode) -> int:
+        h = 0
         while not node.leaf:
             node = node.children[0]
             h += 1
@@ -198,7 +956,7 @@ class BTree:
         
     def print_tree(self):
         print(f"--- Estrutura da Árvore (t={self.t}) ---")
-        print(f"Altura: {self.get_height()} | Total de chaves: {len(self._get_all_keys(self.root))}")
+        print(f"Altura: {self.get_height()} | Total de chaves: {len(self)}")
         
         if not self.root or not self.root.keys:
             print("Árvore vazia.")
@@ -211,7 +969,7 @@ class BTree:
 
     def _print_recursive(self, node: BTreeNode, prefix: str, is_last: bool, is_root: bool = False, level: int = 0):
         node_type = "F" if node.leaf else "I"
-        node_info = f"{node.keys} ({node_type})"
+        node_info = f"{list(node.keys)} ({node_type})"
         
         # Formatação com nível
         if is_root:
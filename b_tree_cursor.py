@@ -0,0 +1,157 @@
+from typing import Iterator, List, Optional, Tuple
+from b_tree_node import BTreeNode, Key
+
+class BTreeCursor:
+    """
+    Cursor sobre as chaves de uma Árvore-B em ordem crescente.
+
+    O cursor guarda apenas o caminho da raiz até a posição atual, portanto usa
+    memória O(altura) e pode ser reposicionado ou percorrido nos dois sentidos.
+    Se a árvore for modificada, o cursor deve ser reposicionado com `seek`,
+    `first` ou `last` antes de voltar a ser usado. Chaves marcadas como
+    removidas (remoção preguiçosa) são puladas.
+
+    Atributos:
+        tree (BTree): A árvore percorrida.
+    """
+    def __init__(self, tree):
+        """Cria um cursor ainda não posicionado."""
+        self.tree = tree
+        # Nos ancestrais, o índice é o do filho pelo qual a descida passou; no último
+        # elemento, é o índice da chave atual.
+        self._stack: List[Tuple[BTreeNode, int]] = []
+
+    @property
+    def valid(self) -> bool:
+        """True se o cursor estiver posicionado sobre uma chave."""
+        return bool(self._stack)
+
+    @property
+    def key(self) -> Optional[Key]:
+        """A chave sob o cursor, ou None se ele estiver fora da árvore."""
+        return self._current()
+
+    # A chave guardada no nó; subclasses podem apresentá-la de outra forma em `key`.
+    def _current(self):
+        if not self._stack: return None
+        node, i = self._stack[-1]
+        return node.keys[i]
+
+    def first(self) -> "BTreeCursor":
+        """Posiciona o cursor na menor chave."""
+        self._stack = []
+        self._descend_leftmost(self.tree.root)
+        self._skip_dead(self._step_forward)
+        return self
+
+    def last(self) -> "BTreeCursor":
+        """Posiciona o cursor na maior chave."""
+        self._stack = []
+        self._descend_rightmost(self.tree.root)
+        self._skip_dead(self._step_backward)
+        return self
+
+    def seek(self, k: Key) -> "BTreeCursor":
+        """Posiciona o cursor na menor chave maior ou igual a `k`."""
+        self._stack, x = [], self.tree.root
+        while True:
+            i = self.tree._bisect(x.keys, k)
+            if i < len(x.keys) and x.keys[i] == k:
+                self._stack.append((x, i))
+                break
+            if x.leaf:
+                if i < len(x.keys): self._stack.append((x, i))
+                else: self._ascend_forward()
+                break
+            self._stack.append((x, i))
+            x = x.children[i]
+        self._skip_dead(self._step_forward)
+        return self
+
+    def seek_last(self, k: Key) -> "BTreeCursor":
+        """Posiciona o cursor na maior chave menor ou igual a `k`."""
+        self.seek(k)
+        if not self._stack: return self.last()
+        if self._current() > k: self.prev()
+        return self
+
+    def next(self) -> bool:
+        """Avança para a chave seguinte; retorna False se o cursor sair da árvore."""
+        self._step_forward()
+        self._skip_dead(self._step_forward)
+        return bool(self._stack)
+
+    def prev(self) -> bool:
+        """Recua para a chave anterior; retorna False se o cursor sair da árvore."""
+        self._step_backward()
+        self._skip_dead(self._step_backward)
+        return bool(self._stack)
+
+    def _step_forward(self):
+        if not self._stack: return
+        node, i = self._stack[-1]
+        if not node.leaf:
+            self._stack[-1] = (node, i + 1)
+            self._descend_leftmost(node.children[i + 1])
+        elif i + 1 < len(node.keys): self._stack[-1] = (node, i + 1)
+        else:
+            self._stack.pop()
+            self._ascend_forward()
+
+    def _step_backward(self):
+        if not self._stack: return
+        node, i = self._stack[-1]
+        if not node.leaf: self._descend_rightmost(node.children[i])
+        elif i > 0: self._stack[-1] = (node, i - 1)
+        else:
+            self._stack.pop()
+            self._ascend_backward()
+
+    # Repete `step` enquanto a chave sob o cursor estiver marcada como removida.
+    def _skip_dead(self, step):
+        dead = self.tree._tombstones
+        while dead and self._stack and self._current() in dead: step()
+
+    def forward(self) -> Iterator[Key]:
+        """Gera as chaves a partir da posição atual, em ordem crescente."""
+        while self._stack:
+            node, i = self._stack[-1]
+            yield node.keys[i]
+            self.next()
+
+    def backward(self) -> Iterator[Key]:
+        """Gera as chaves a partir da posição atual, em ordem decrescente."""
+        while self._stack:
+            node, i = self._stack[-1]
+            yield node.keys[i]
+            self.prev()
+
+    def _descend_leftmost(self, x: BTreeNode):
+        while not x.leaf:
+            self._stack.append((x, 0))
+            x = x.children[0]
+        if x.keys: self._stack.append((x, 0))
+        else: self._ascend_forward()
+
+    def _descend_rightmost(self, x: BTreeNode):
+        while not x.leaf:
+            self._stack.append((x, len(x.keys)))
+            x = x.children[-1]
+        if x.keys: self._stack.append((x, len(x.keys) - 1))
+        else: self._ascend_backward()
+
+    # Sobe pelos ancestrais até o primeiro cuja descida não passou pelo último filho.
+    def _ascend_forward(self):
+        while self._stack:
+            node, i = self._stack[-1]
+            if i < len(node.keys): return
+            self._stack.pop()
+
+    # Sobe pelos ancestrais até o primeiro cuja descida não passou pelo primeiro filho.
+    def _ascend_backward(self):
+        while self._stack:
+            node, i = self._stack[-1]
+            if i > 0:
+                self._stack[-1] = (node, i - 1)
+                return
+            self._stack.pop()
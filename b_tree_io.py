@@ -0,0 +1,104 @@
+import struct
+import sys
+import zlib
+from array import array
+from typing import BinaryIO, List
+from b_tree_node import BTreeNode
+
+_SNAPSHOT_MAGIC = b"BTREESN1"
+_SNAPSHOT_HEADER = struct.Struct("<8sIIq")  # magic, t, altura, número de chaves
+_COUNT = struct.Struct("<q")
+_CRC = struct.Struct("<I")
+
+def _from_le(data) -> array:
+    """Converte bytes little-endian em um `array('q')`."""
+    values = array("q")
+    values.frombytes(data)
+    if sys.byteorder == "big": values.byteswap()
+    return values
+
+def _to_le(values: array) -> bytes:
+    """Converte um `array('q')` em bytes little-endian."""
+    if sys.byteorder == "big":
+        values = array("q", values)
+        values.byteswap()
+    return values.tobytes()
+
+def _write_snapshot(tree, fp: BinaryIO):
+    """
+    Grava a árvore no formato binário de snapshot.
+
+    Formato (int64 little-endian, salvo indicação):
+        cabeçalho: magic (8 bytes), t (uint32), altura (uint32), número de chaves;
+        para cada nível, da raiz às folhas: número de nós N, N contagens de
+        chaves e as chaves de todos os nós do nível concatenadas;
+        trailer: CRC32 (uint32) de todos os bytes anteriores.
+    Os filhos de cada nível são os nós do nível seguinte, na ordem gravada.
+    """
+    if tree.root.keys and not isinstance(tree.root.keys[0], int):
+        raise TypeError("Snapshots binários só guardam chaves inteiras de 64 bits.")
+    height = tree.get_height()
+    crc = 0
+
+    def emit(data: bytes):
+        nonlocal crc
+        crc = zlib.crc32(data, crc)
+        fp.write(data)
+
+    emit(_SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, tree.t, height, len(tree)))
+    level = [tree.root]
+    while level:
+        counts, keys = array("q", (len(node.keys) for node in level)), array("q")
+        for node in level: keys.extend(node.keys)
+        emit(_COUNT.pack(len(level)))
+        emit(_to_le(counts))
+        emit(_to_le(keys))
+        level = [child for node in level for child in node.children]
+    fp.write(_CRC.pack(crc))
+
+def _read_snapshot(cls, data: bytes, **kwargs):
+    """
+    Reconstrói uma árvore de `cls` a partir dos bytes de um snapshot.
+
+    Os nós são criados com `_new_node` e recebem as chaves diretamente dos
+    buffers: nenhuma chave é reinserida e nenhum contrato é avaliado. A
+    integridade é garantida pelo CRC32 e pela consistência entre o cabeçalho,
+    as contagens de chaves e o número de nós de cada nível.
+    """
+    if len(data) < _SNAPSHOT_HEADER.size + _CRC.size: raise ValueError("Snapshot truncado.")
+    view = memoryview(data)
+    magic, t, height, key_count = _SNAPSHOT_HEADER.unpack_from(view, 0)
+    if magic != _SNAPSHOT_MAGIC: raise ValueError("Os dados não são um snapshot de Árvore-B.")
+    if zlib.crc32(view[:-_CRC.size]) != _CRC.unpack_from(view, len(view) - _CRC.size)[0]:
+        raise ValueError("Checksum do snapshot não confere.")
+    tree = cls(t, **kwargs)
+    as_array, offset = isinstance(tree.root.keys, array), _SNAPSHOT_HEADER.size
+    levels: List[List[BTreeNode]] = []
+    expected_nodes = 1
+    for depth in range(height + 1):
+        (n,) = _COUNT.unpack_from(view, offset)
+        if n != expected_nodes: raise ValueError("Snapshot corrompido: número de nós inconsistente.")
+        offset += _COUNT.size
+        counts = _from_le(view[offset:offset + 8 * n])
+        offset += 8 * n
+        total = sum(counts)
+        keys = _from_le(view[offset:offset + 8 * total])
+        offset += 8 * total
+        level, start = [], 0
+        for c in counts:
+            node = tree._new_node(leaf=(depth == height))
+            node.keys = keys[start:start + c] if as_array else keys[start:start + c].tolist()
+            start += c
+            level.append(node)
+        if levels:
+            it = iter(level)
+            for parent in levels[-1]: parent.children = [next(it) for _ in range(len(parent.keys) + 1)]
+        levels.append(level)
+        expected_nodes = total + n
+    if offset != len(view) - _CRC.size: raise ValueError("Snapshot corrompido: bytes excedentes.")
+    for level in reversed(levels):
+        for node in level: node.size = len(node.keys) + sum(child.size for child in node.children)
+    if levels[0][0].size != key_count: raise ValueError("Snapshot corrompido: número de chaves inconsistente.")
+    tree._release_node(tree.root)
+    tree.root = levels[0][0]
+    return tree
@@ -1,12 +1,178 @@
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+from os.path import commonprefix
+from typing import Any, Iterable, Iterator
+
+# As chaves podem ser de qualquer tipo com ordem total e hashable (int, str, bytes, tuplas...);
+# layouts especializados, como `CompactBTreeNode` e `PrefixBTreeNode`, restringem o tipo.
+Key = Any
+
 class BTreeNode:
     """
     Um nó em uma Árvore-B.
 
     Atributos:
         leaf (bool): True se o nó for uma folha, False caso contrário.
-        keys (list[int]): A lista de chaves armazenadas no nó.
+        keys (list): A lista ordenada de chaves armazenadas no nó.
         children (list[BTreeNode]): A lista de nós filhos.
+        size (int): O número de chaves na subárvore enraizada no nó.
+        epoch (int): A época da árvore em que o nó foi criado; nós de outras
+            épocas podem estar compartilhados com snapshots ou outras árvores.
     """
+    __slots__ = ("leaf", "keys", "children", "size", "epoch")
+    # A busca binária que a árvore usa nas chaves dos nós desta classe.
+    bisect_keys = staticmethod(bisect_left)
+
     def __init__(self, leaf: bool = False):
         """Inicializa um novo nó da Árvore-B."""
-        self.leaf, self.keys, self.children = leaf, [], []
\ No newline at end of file
+        self.leaf, self.keys, self.children, self.size, self.epoch = leaf, [], [], 0, 0
+
+class CompactBTreeNode(BTreeNode):
+    """
+    Um nó compacto, com as chaves em um `array('q')` contíguo de inteiros de 64 bits.
+
+    As chaves deixam de ser objetos `int` individuais, o que reduz a memória por
+    chave; `insert` e `pop` do array deslocam os elementos no próprio buffer.
+    Só aceita chaves no intervalo de um inteiro de 64 bits com sinal.
+    """
+    __slots__ = ()
+
+    def __init__(self, leaf: bool = False):
+        """Inicializa um novo nó compacto da Árvore-B."""
+        super().__init__(leaf)
+        self.keys = array("q")
+
+class PrefixKeys:
+    """
+    Uma sequência ordenada de chaves `str` ou `bytes` com compressão de prefixo.
+
+    O prefixo comum a todas as chaves é guardado uma única vez; os sufixos ficam
+    concatenados em um único objeto, com as posições finais em um `array('I')`.
+    O nó passa a ter um punhado de objetos em vez de um objeto por chave.
+    `bisect_left` compara a chave procurada apenas com os sufixos, e o acesso
+    por índice remonta a chave completa. Inserções e remoções que preservam o
+    prefixo deslocam os sufixos no lugar; as demais alterações recalculam o
+    prefixo e remontam a sequência.
+
+    Atributos:
+        prefix (str | bytes | None): O prefixo comum, ou None se não houver chaves.
+    """
+    __slots__ = ("prefix", "_suffixes", "_ends")
+
+    def __init__(self, keys: Iterable[Key] = ()):
+        """Cria a sequência com as chaves (já ordenadas) de `keys`."""
+        self._assign(list(keys))
+
+    def _assign(self, keys: list):
+        if not keys:
+            self.prefix, self._suffixes, self._ends = None, None, array("I")
+            return
+        if not isinstance(keys[0], (str, bytes)): raise TypeError("PrefixKeys só aceita chaves str ou bytes.")
+        prefix = commonprefix(keys)
+        n = len(prefix)
+        self.prefix, self._suffixes = prefix, prefix[:0].join(k[n:] for k in keys)
+        self._ends = array("I", accumulate(len(k) - n for k in keys))
+
+    def _index(self, i: int) -> int:
+        n = len(self._ends)
+        if i < 0: i += n
+        if not 0 <= i < n: raise IndexError("Índice fora do intervalo das chaves.")
+        return i
+
+    def _suffix_at(self, i: int):
+        ends = self._ends
+        return self._suffixes[(ends[i - 1] if i else 0):ends[i]]
+
+    def __len__(self) -> int:
+        return len(self._ends)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice): return PrefixKeys(list(self)[i])
+        return self.prefix + self._suffix_at(self._index(i))
+
+    def __iter__(self) -> Iterator[Key]:
+        prefix, suffixes, start = self.prefix, self._suffixes, 0
+        for end in self._ends:
+            yield prefix + suffixes[start:end]
+            start = end
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (PrefixKeys, list)): return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f"PrefixKeys({list(self)!r})"
+
+    def __setitem__(self, i: int, k: Key):
+        keys = list(self)
+        keys[i] = k
+        self._assign(keys)
+
+    def __delitem__(self, i):
+        keys = list(self)
+        del keys[i]
+        self._assign(keys)
+
+    def insert(self, i: int, k: Key):
+        n = len(self._ends)
+        i = min(max(i + n if i < 0 else i, 0), n)
+        if self.prefix is None or not k.startswith(self.prefix):
+            keys = list(self)
+            keys.insert(i, k)
+            self._assign(keys)
+            return
+        suffix, ends = k[len(self.prefix):], self._ends
+        start = ends[i - 1] if i else 0
+        self._suffixes = self._suffixes[:start] + suffix + self._suffixes[start:]
+        ends.insert(i, start)
+        for j in range(i, n + 1): ends[j] += len(suffix)
+
+    def append(self, k: Key):
+        self.insert(len(self._ends), k)
+
+    def extend(self, keys: Iterable[Key]):
+        self._assign([*self, *keys])
+
+    def pop(self, i: int = -1) -> Key:
+        i, ends = self._index(i), self._ends
+        start, end = (ends[i - 1] if i else 0), ends[i]
+        k = self.prefix + self._suffixes[start:end]
+        if len(ends) == 1:
+            self._assign([])
+            return k
+        self._suffixes = self._suffixes[:start] + self._suffixes[end:]
+        del ends[i]
+        for j in range(i, len(ends)): ends[j] -= end - start
+        return k
+
+    def bisect_left(self, k: Key) -> int:
+        """Retorna a posição de `k` como `bisect.bisect_left`, comparando apenas os sufixos."""
+        ends = self._ends
+        if not ends: return 0
+        prefix = self.prefix
+        # Uma chave que não começa pelo prefixo fica antes ou depois de todas as do nó.
+        if not k.startswith(prefix): return 0 if k < prefix else len(ends)
+        s, suffixes, lo, hi = k[len(prefix):], self._suffixes, 0, len(ends)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if suffixes[(ends[mid - 1] if mid else 0):ends[mid]] < s: lo = mid + 1
+            else: hi = mid
+        return lo
+
+class PrefixBTreeNode(BTreeNode):
+    """
+    Um nó para chaves `str` ou `bytes` com compressão de prefixo (`PrefixKeys`).
+
+    Em índices de URLs, caminhos e nomes, as chaves de um mesmo nó costumam
+    compartilhar um prefixo longo, que passa a ser guardado uma vez por nó, e os
+    sufixos ficam contíguos na memória. As buscas da árvore usam
+    `PrefixKeys.bisect_left`, que compara apenas os sufixos.
+    """
+    __slots__ = ()
+    bisect_keys = staticmethod(PrefixKeys.bisect_left)
+
+    def __init__(self, leaf: bool = False):
+        """Inicializa um novo nó com compressão de prefixo."""
+        super().__init__(leaf)
+        self.keys = PrefixKeys()
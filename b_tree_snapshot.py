@@ -0,0 +1,40 @@
+from b_tree import BTree
+from contracts_helpers import CheckMode
+
+class BTreeSnapshot(BTree):
+    """
+    Uma versão imutável de uma Árvore-B, criada em O(1) por `BTree.snapshot()`
+    (mais uma cópia das marcas da remoção preguiçosa, se houver).
+
+    O snapshot compartilha todos os nós com a árvore de origem. Depois dele, a
+    árvore de origem passa a uma nova época e copia cada nó de uma época
+    anterior antes de alterá-lo: uma escrita copia apenas o caminho da raiz até a
+    folha (e os irmãos usados em divisões, fusões e empréstimos), e os nós do
+    snapshot nunca mudam. Os nós que só o snapshot usa são liberados pelo coletor
+    do Python quando ele deixa de ser referenciado.
+
+    Todas as leituras da `BTree` (buscas, iteração, cursores, intervalos,
+    estatísticas de ordem, `search_many` e snapshots binários) estão disponíveis,
+    assim como `split`, `join` e as operações de conjunto, que retornam árvores
+    `BTree` comuns; as escritas levantam `NotImplementedError`.
+    """
+    @classmethod
+    def _of(cls, tree: BTree) -> "BTreeSnapshot":
+        snap = cls(tree.t, check_mode=CheckMode.OFF, node_class=tree.node_class)
+        snap.root, snap._tombstones = tree.root, set(tree._tombstones)
+        return snap
+
+    def _empty_like(self, cls=None) -> BTree:
+        return super()._empty_like(cls or BTree)
+
+    def insert(self, k: int):
+        raise NotImplementedError("Snapshots da Árvore-B são somente leitura.")
+
+    def delete(self, k: int):
+        raise NotImplementedError("Snapshots da Árvore-B são somente leitura.")
+
+    def insert_many(self, keys):
+        raise NotImplementedError("Snapshots da Árvore-B são somente leitura.")
+
+    def delete_many(self, keys):
+        raise NotImplementedError("Snapshots da Árvore-B são somente leitura.")
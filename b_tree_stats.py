@@ -0,0 +1,84 @@
+from typing import Any, Dict, List
+
+_COUNTERS = ("splits", "root_splits", "merges", "borrows_prev", "borrows_next", "fills", "root_shrinks",
+             "appends", "rotations", "tombstones", "compactions", "flushes", "nodes_visited")
+
+class _OperationStats:
+    """Contagem, tempo total e histograma de latência de um tipo de operação."""
+    __slots__ = ("count", "total_ns", "buckets")
+
+    def __init__(self):
+        self.count, self.total_ns, self.buckets = 0, 0, []
+
+class BTreeStats:
+    """
+    Contadores e histogramas de latência das operações de uma Árvore-B.
+
+    O histograma de cada operação usa faixas em potências de dois de
+    microssegundos: a faixa `b` conta as operações com duração em
+    [2^(b-1), 2^b) us, e a faixa 0 as que levaram menos de 1 us. As latências
+    medem o corpo das operações; o tempo gasto nos contratos (pré-condições,
+    invariantes e pós-condições estruturais) é acumulado à parte.
+
+    Atributos:
+        counters (dict[str, int]): Divisões, fusões, empréstimos, preenchimentos,
+            mudanças de altura, inserções pela borda direita, rotações para o
+            irmão da esquerda, marcas de remoção preguiçosa, compactações, lotes
+            empurrados dos buffers de escrita e nós visitados por buscas.
+        contract_checks (int): O número de verificações de contrato medidas.
+        contract_ns (int): O tempo total dessas verificações, em nanossegundos.
+    """
+    def __init__(self):
+        """Inicializa as estatísticas zeradas."""
+        self.reset()
+
+    def reset(self):
+        """Zera todos os contadores e histogramas."""
+        self.counters: Dict[str, int] = dict.fromkeys(_COUNTERS, 0)
+        self._operations: Dict[str, _OperationStats] = {}
+        self.contract_checks, self.contract_ns = 0, 0
+
+    def count(self, event: str, n: int = 1):
+        """Soma `n` ao contador `event`."""
+        self.counters[event] += n
+
+    def record(self, operation: str, elapsed_ns: int):
+        """Registra uma execução de `operation` que levou `elapsed_ns` nanossegundos."""
+        stats = self._operations.get(operation)
+        if stats is None: stats = self._operations[operation] = _OperationStats()
+        stats.count += 1
+        stats.total_ns += elapsed_ns
+        b = (elapsed_ns // 1000).bit_length()
+        if b >= len(stats.buckets): stats.buckets.extend([0] * (b + 1 - len(stats.buckets)))
+        stats.buckets[b] += 1
+
+    def record_contract(self, elapsed_ns: int):
+        """Registra uma verificação de contrato que levou `elapsed_ns` nanossegundos."""
+        self.contract_checks += 1
+        self.contract_ns += elapsed_ns
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Retorna uma cópia das estatísticas em tipos simples, pronta para exportar em JSON."""
+        operations = {}
+        for name, stats in self._operations.items():
+            operations[name] = {
+                "count": stats.count,
+                "total_us": stats.total_ns / 1000,
+                "mean_us": stats.total_ns / 1000 / stats.count,
+                "histogram_us": {_bucket_label(b): c for b, c in enumerate(stats.buckets) if c},
+            }
+        return {"counters": dict(self.counters), "operations": operations,
+                "contracts": {"checks": self.contract_checks, "total_us": self.contract_ns / 1000}}
+
+def _bucket_label(b: int) -> str:
+    return f"<{1 << b}"
+
+def format_snapshot(snapshot: Dict[str, Any]) -> List[str]:
+    """Formata um snapshot de `BTreeStats` como linhas de texto."""
+    lines = ["Contadores: " + ", ".join(f"{name}={value}" for name, value in snapshot["counters"].items())]
+    for name, op in snapshot["operations"].items():
+        histogram = " ".join(f"{label}us:{c}" for label, c in op["histogram_us"].items())
+        lines.append(f"{name}: {op['count']} operações, média {op['mean_us']:.2f} us | {histogram}")
+    contracts = snapshot["contracts"]
+    lines.append(f"Contratos: {contracts['checks']} verificações, {contracts['total_us']:.2f} us no total")
+    return lines
@@ -0,0 +1,78 @@
+"""
+Compara a vazão de escrita da `BufferedBTree` com a do `insert` da `BTree`.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.buffered --n 200000 --orders 16 64 --buffer-sizes 128 512 2048
+
+Para cada ordem `t` são inseridas `--n` chaves aleatórias (com uma fração
+`--deletes` de remoções intercaladas) em uma `BTree` com os contratos
+desligados e em `BufferedBTree`s com cada tamanho de buffer. Em seguida as
+mesmas `--probes` consultas com `in` são feitas nas duas árvores, ainda com
+as mensagens pendentes nos buffers: os resultados precisam coincidir, e a vazão
+das consultas também é informada. O tempo de escrita da árvore com buffer
+inclui o esvaziamento final dos buffers (`flush`), feito após as consultas.
+"""
+import argparse
+import random
+import time
+from b_tree import BTree
+from buffered_b_tree import BufferedBTree
+
+def make_workload(n: int, deletes: float, seed: int) -> list:
+    """Retorna (chave, inserção?) para `n` inserções aleatórias com remoções de chaves já inseridas."""
+    rng = random.Random(seed)
+    keys, ops = rng.sample(range(10 * n), n), []
+    for i, k in enumerate(keys):
+        ops.append((k, True))
+        if i and rng.random() < deletes: ops.append((keys[rng.randrange(i)], False))
+    return ops
+
+def ingest(tree, ops: list, blind: bool) -> float:
+    """Aplica as escritas e retorna o tempo gasto, em segundos."""
+    start = time.perf_counter()
+    if blind:
+        for k, op in ops: tree.insert(k) if op else tree.delete(k)
+    else:
+        # O `insert`/`delete` da `BTree` exigem a chave ausente/presente.
+        for k, op in ops:
+            if op: tree.insert(k)
+            elif k in tree: tree.delete(k)
+    return time.perf_counter() - start
+
+def query(tree, probes: list):
+    """Retorna os resultados de `in` para as consultas e a vazão em consultas por segundo."""
+    start = time.perf_counter()
+    found = [k in tree for k in probes]
+    return found, len(probes) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=200000, help="número de chaves inseridas")
+    parser.add_argument("--deletes", type=float, default=0.1, help="remoções por inserção")
+    parser.add_argument("--probes", type=int, default=50000, help="número de consultas")
+    parser.add_argument("--orders", type=int, nargs="+", default=[16, 64], help="ordens t a medir")
+    parser.add_argument("--buffer-sizes", type=int, nargs="+", default=[128, 512, 2048], help="tamanhos de buffer")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    ops = make_workload(args.n, args.deletes, args.seed)
+    rng = random.Random(args.seed + 1)
+    probes = [rng.randrange(10 * args.n) for _ in range(args.probes)]
+    print(f"{'t':>4} {'árvore':<22} {'escritas/s':>12} {'ganho':>7} {'consultas/s':>12}")
+    for t in args.orders:
+        plain = BTree(t, check_mode="off")
+        base_rate = len(ops) / ingest(plain, ops, blind=False)
+        expected, query_rate = query(plain, probes)
+        print(f"{t:>4} {'BTree.insert':<22} {base_rate:>12.0f} {'1.00x':>7} {query_rate:>12.0f}")
+        for size in args.buffer_sizes:
+            buffered = BufferedBTree(t, buffer_size=size, check_mode="off")
+            elapsed = ingest(buffered, ops, blind=True)
+            found, query_rate = query(buffered, probes)
+            start = time.perf_counter()
+            buffered.flush()
+            rate = len(ops) / (elapsed + time.perf_counter() - start)
+            if found != expected: raise SystemExit(f"Resultados divergentes para t={t}, buffer={size}.")
+            print(f"{t:>4} {f'buffer={size}':<22} {rate:>12.0f} {rate / base_rate:>6.2f}x {query_rate:>12.0f}")
+
+if __name__ == "__main__":
+    main()
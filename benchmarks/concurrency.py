@@ -0,0 +1,78 @@
+"""
+Compara a vazão da `ConcurrentBTree` com a de uma `BTree` protegida por uma trava global.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.concurrency --n 50000 --ops 20000 --threads 1 2 4 8 --reads 0.9
+
+Cada thread executa `--ops` operações sobre chaves aleatórias: buscas com
+probabilidade `--reads` e, no restante, inserções ou remoções em uma faixa de
+chaves exclusiva da thread. No CPython com GIL as threads não executam
+bytecode em paralelo; o ganho vem de leitores não ficarem na fila atrás de
+escritores. Em builds sem GIL as descidas em subárvores distintas escalam com
+os núcleos.
+"""
+import argparse
+import random
+import threading
+import time
+from b_tree import BTree
+from concurrent_b_tree import ConcurrentBTree
+
+class _GloballyLockedTree:
+    """Uma `BTree` com uma única trava em volta de cada operação."""
+
+    def __init__(self, tree: BTree):
+        self._tree, self._lock = tree, threading.Lock()
+
+    def search(self, k: int):
+        with self._lock: return self._tree.search(k)
+
+    def insert(self, k: int):
+        with self._lock: self._tree.insert(k)
+
+    def delete(self, k: int):
+        with self._lock: self._tree.delete(k)
+
+def _worker(tree, index: int, args, base_keys: list):
+    """Executa a carga de uma thread; escritas ficam na faixa de chaves exclusiva da thread."""
+    rng, owned = random.Random(args.seed + index), set()
+    offset = args.n * 10 * (index + 1)
+    for _ in range(args.ops):
+        if rng.random() < args.reads:
+            tree.search(rng.choice(base_keys))
+            continue
+        k = offset + rng.randrange(args.n)
+        if k in owned:
+            tree.delete(k)
+            owned.discard(k)
+        else:
+            tree.insert(k)
+            owned.add(k)
+
+def run(tree, threads: int, args, base_keys: list) -> float:
+    """Executa `threads` threads sobre `tree` e retorna a vazão em operações por segundo."""
+    workers = [threading.Thread(target=_worker, args=(tree, i, args, base_keys)) for i in range(threads)]
+    start = time.perf_counter()
+    for w in workers: w.start()
+    for w in workers: w.join()
+    return threads * args.ops / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=50000, help="número de chaves carregadas inicialmente")
+    parser.add_argument("--ops", type=int, default=20000, help="operações por thread")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8], help="números de threads a medir")
+    parser.add_argument("--reads", type=float, default=0.9, help="fração de buscas na carga")
+    parser.add_argument("--t", type=int, default=32, help="ordem da árvore")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    base_keys = sorted(random.Random(args.seed).sample(range(args.n * 10), args.n))
+    print(f"{'threads':>7} {'trava global (op/s)':>20} {'concorrente (op/s)':>20}")
+    for threads in args.threads:
+        locked = _GloballyLockedTree(BTree.from_sorted(base_keys, t=args.t, check_mode="off"))
+        concurrent = ConcurrentBTree.from_sorted(base_keys, t=args.t)
+        print(f"{threads:>7} {run(locked, threads, args, base_keys):>20.0f} {run(concurrent, threads, args, base_keys):>20.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compara a latência da remoção preguiçosa com a da remoção imediata.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.lazy_delete --n 200000 --t 32 256 --deletes 150000 --fill 0.5
+
+Para cada ordem, duas árvores com as mesmas chaves removem as mesmas chaves,
+em ordem aleatória e com as verificações de contrato desligadas. As árvores
+são montadas com `--fill` (por padrão, nós pela metade, como depois de muitas
+inserções e remoções), onde a remoção imediata mais pega empréstimos e funde
+nós. A remoção preguiçosa inclui as compactações disparadas no meio da
+sequência, de modo que a média já traz o custo amortizado da limpeza das
+marcas; o máximo mostra o que elas custam nas remoções em que acontecem. Cada
+modo é medido `--repeat` vezes, alternando com o outro e com o coletor de lixo
+desligado, e vale a repetição de menor média.
+"""
+import argparse
+import gc
+import random
+import statistics
+import time
+from b_tree import BTree
+
+def latencies(tree: BTree, keys) -> list:
+    """Remove `keys` de `tree`, uma a uma, e retorna a duração de cada remoção em µs."""
+    out = []
+    gc.disable()
+    for k in keys:
+        start = time.perf_counter_ns()
+        tree.delete(k)
+        out.append((time.perf_counter_ns() - start) / 1000)
+    gc.enable()
+    return out
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=200000, help="número de chaves na árvore")
+    parser.add_argument("--t", type=int, nargs="+", default=[32, 256], help="ordens a medir")
+    parser.add_argument("--deletes", type=int, default=150000, help="número de remoções")
+    parser.add_argument("--fill", type=float, default=0.5, help="ocupação dos nós na montagem")
+    parser.add_argument("--ratio", type=float, default=0.25, help="proporção de marcas que dispara a compactação")
+    parser.add_argument("--repeat", type=int, default=3, help="repetições de cada medida")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    keys = random.Random(args.seed).sample(range(args.n), min(args.deletes, args.n))
+    print(f"{'t':>5} {'modo':>11} {'média (µs)':>11} {'p99 (µs)':>9} {'máx (ms)':>9} {'total (s)':>10}")
+    for t in args.t:
+        best = {}
+        for _ in range(args.repeat):
+            for lazy in (False, True):
+                tree = BTree.from_sorted(range(args.n), t, args.fill, check_mode="off", lazy_delete=lazy,
+                                         compaction_ratio=args.ratio)
+                lat = latencies(tree, keys)
+                if lazy not in best or statistics.fmean(lat) < statistics.fmean(best[lazy]): best[lazy] = lat
+        for lazy, lat in best.items():
+            p99 = statistics.quantiles(lat, n=100)[98]
+            print(f"{t:>5} {'preguiçosa' if lazy else 'imediata':>11} {statistics.fmean(lat):>11.2f} {p99:>9.2f} "
+                  f"{max(lat) / 1000:>9.2f} {sum(lat) / 1e6:>10.2f}")
+
+if __name__ == "__main__":
+    main()
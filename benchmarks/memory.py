@@ -0,0 +1,46 @@
+"""
+Compara a memória por chave de três layouts de nó: o layout original (classe
+com `__dict__` e chaves em `list`), o `BTreeNode` atual (com `__slots__`) e o
+`CompactBTreeNode` (com `__slots__` e chaves em `array('q')`).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.memory --sizes 1000000 10000000 --t 64
+
+A árvore é construída com `BTree.from_sorted` e a memória é medida com
+`tracemalloc`, que contabiliza nós, listas, arrays e os objetos `int`.
+"""
+import argparse
+import gc
+import tracemalloc
+from b_tree import BTree
+from b_tree_node import BTreeNode, CompactBTreeNode
+
+class DictBTreeNode:
+    """Reproduz o layout original do nó, sem `__slots__`, para comparação."""
+    def __init__(self, leaf: bool = False):
+        self.leaf, self.keys, self.children, self.size = leaf, [], [], 0
+
+def bytes_per_key(node_class: type, n: int, t: int) -> float:
+    """Constrói uma árvore com `n` chaves e retorna os bytes alocados por chave."""
+    gc.collect()
+    tracemalloc.start()
+    tree = BTree.from_sorted(range(n), t, check_mode="off", node_class=node_class)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tree
+    return allocated / n
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000], help="números de chaves")
+    parser.add_argument("--t", type=int, default=64, help="ordem da árvore")
+    args = parser.parse_args()
+
+    print(f"{'chaves':>12} {'original (B/chave)':>19} {'BTreeNode (B/chave)':>20} {'Compact (B/chave)':>18} {'redução':>8}")
+    for n in args.sizes:
+        original, slotted = bytes_per_key(DictBTreeNode, n, args.t), bytes_per_key(BTreeNode, n, args.t)
+        compact = bytes_per_key(CompactBTreeNode, n, args.t)
+        print(f"{n:>12} {original:>19.1f} {slotted:>20.1f} {compact:>18.1f} {original / compact:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Compara o `BTreeNode` com o `PrefixBTreeNode` em um corpus de URLs.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.prefix_keys --n 200000 --orders 16 64
+    python -m benchmarks.prefix_keys --corpus urls.txt
+
+Sem `--corpus`, as URLs são geradas com a forma de um log de rastreamento:
+algumas centenas de hosts com popularidade de Zipf, caminhos montados a partir
+de um vocabulário (seções, datas, slugs e identificadores numéricos) e parte
+delas com parâmetros de consulta. Com `--corpus`, cada linha do arquivo é uma
+URL. As chaves são medidas como `str` e como `bytes` (UTF-8).
+
+Para cada ordem `t` e layout de nó, a árvore é construída com
+`BTree.from_sorted`, e são informados os bytes alocados por chave (medidos
+com `tracemalloc`, incluindo os objetos das chaves), a média de caracteres do
+prefixo guardado por nó e a vazão de `in` para `--probes` consultas, metade
+delas presentes. A memória das URLs em uma `list` simples serve de referência.
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from b_tree import BTree
+from b_tree_node import BTreeNode, PrefixBTreeNode
+
+SECTIONS = ["produtos", "categoria", "blog", "noticias", "docs", "api", "usuarios", "busca", "ajuda", "loja"]
+WORDS = ["casa", "jardim", "eletronicos", "celular", "livro", "python", "arvore", "dados", "guia", "oferta",
+         "tutorial", "receita", "viagem", "esporte", "musica", "filme", "carro", "moda", "saude", "escola"]
+
+def make_corpus(n: int, seed: int) -> list:
+    """Gera `n` URLs distintas com a distribuição descrita no cabeçalho do módulo."""
+    rng = random.Random(seed)
+    hosts = [f"{rng.choice(['www', 'blog', 'loja', 'api', 'm'])}.{rng.choice(WORDS)}{i}.{rng.choice(['com', 'com.br', 'org', 'net'])}"
+             for i in range(300)]
+    weights = [1 / (i + 1) for i in range(len(hosts))]
+    urls = set()
+    while len(urls) < n:
+        host = rng.choices(hosts, weights)[0]
+        parts = [rng.choice(SECTIONS)]
+        if rng.random() < 0.5: parts.append(f"{rng.randrange(2015, 2025)}/{rng.randrange(1, 13):02d}")
+        parts.append("-".join(rng.sample(WORDS, rng.randrange(1, 4))))
+        if rng.random() < 0.6: parts.append(str(rng.randrange(10 ** 6)))
+        url = f"{'https' if rng.random() < 0.9 else 'http'}://{host}/{'/'.join(parts)}"
+        if rng.random() < 0.3: url += f"?ref={rng.choice(WORDS)}&pagina={rng.randrange(50)}"
+        urls.add(url)
+    return list(urls)
+
+def fresh(keys: list):
+    """Gera cópias novas das chaves, para que a medição de memória inclua os objetos das chaves."""
+    for k in keys: yield bytes(bytearray(k)) if isinstance(k, bytes) else k.encode().decode()
+
+def allocated(build) -> tuple:
+    """Executa `build` e retorna (resultado, bytes alocados que continuam vivos)."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+def mean_prefix(tree: BTree) -> float:
+    """Retorna a média de caracteres do prefixo guardado por nó (0 para nós sem prefixo)."""
+    total, nodes, stack = 0, 0, [tree.root]
+    while stack:
+        node = stack.pop()
+        stack.extend(node.children)
+        total, nodes = total + len(getattr(node.keys, "prefix", None) or ""), nodes + 1
+    return total / nodes
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=200000, help="número de URLs geradas")
+    parser.add_argument("--corpus", help="arquivo com uma URL por linha (substitui o corpus gerado)")
+    parser.add_argument("--orders", type=int, nargs="+", default=[16, 64], help="ordens t a medir")
+    parser.add_argument("--probes", type=int, default=100000, help="número de consultas")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open(args.corpus, encoding="utf-8") as fp: urls = sorted({line.strip() for line in fp if line.strip()})
+    else: urls = sorted(make_corpus(args.n, args.seed))
+    rng = random.Random(args.seed + 1)
+    misses = [u + "/x" for u in rng.sample(urls, min(len(urls), args.probes // 2))]
+    print(f"{len(urls)} URLs, {sum(map(len, urls)) / len(urls):.1f} caracteres em média")
+    print(f"{'chaves':<6} {'t':>4} {'nó':<16} {'B/chave':>9} {'prefixo':>8} {'consultas/s':>12}")
+    for encoded in (False, True):
+        keys = [u.encode() for u in urls] if encoded else list(urls)
+        probes = [k.encode() if encoded else k for k in misses] + rng.sample(keys, min(len(keys), args.probes // 2))
+        rng.shuffle(probes)
+        label = "bytes" if encoded else "str"
+        copies, size = allocated(lambda: list(fresh(keys)))
+        print(f"{label:<6} {'-':>4} {'list':<16} {size / len(keys):>9.1f} {'-':>8} {'-':>12}")
+        del copies
+        for t in args.orders:
+            for node_class in (BTreeNode, PrefixBTreeNode):
+                tree, size = allocated(lambda: BTree.from_sorted(fresh(keys), t, check_mode="off", node_class=node_class))
+                start = time.perf_counter()
+                hits = sum(1 for k in probes if k in tree)
+                rate = len(probes) / (time.perf_counter() - start)
+                if hits != len(probes) - len(misses): raise SystemExit(f"Resultados errados para t={t}, {node_class.__name__}.")
+                print(f"{label:<6} {t:>4} {node_class.__name__:<16} {size / len(keys):>9.1f} {mean_prefix(tree):>8.1f} {rate:>12.0f}")
+                del tree
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Suíte de benchmarks da `BTree` com saída em JSON e comparação com uma linha de base.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.run --output atual.json
+    python -m benchmarks.run --baseline base.json --threshold 0.10
+
+Cada caso combina uma operação (insert, search, delete, mixed), uma
+distribuição de chaves (sequential, random, skewed), uma ordem `t`, um número
+de chaves `n` e um modo de verificação dos contratos (`off`, `sampled`,
+`cheap`, `full`). O modo `full` valida a árvore inteira a cada operação e só é
+medido para `n <= --full-max-n`. O tempo de cada caso é o menor entre
+`--repeat` execuções, em microssegundos por operação.
+
+Com `--baseline`, casos mais lentos que a linha de base por mais que
+`--threshold` (fração) são marcados como regressão e o processo termina com
+código 1.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+from b_tree import BTree
+from contracts_helpers import CheckMode
+
+OPERATIONS = ("insert", "search", "delete", "mixed")
+DISTRIBUTIONS = ("sequential", "random", "skewed")
+
+def make_keys(dist: str, n: int, rng: random.Random) -> Tuple[List[int], List[int]]:
+    """
+    Retorna as chaves na ordem de inserção e uma sequência de `n` buscas.
+
+    `skewed` concentra 80% das chaves em uma faixa estreita do espaço de chaves
+    (inserções caem sempre nas mesmas folhas) e 90% das buscas em 10% das chaves.
+    """
+    if dist == "sequential":
+        keys = list(range(n))
+        return keys, keys[:]
+    if dist == "random":
+        keys = rng.sample(range(10 * n), n)
+        return keys, [rng.choice(keys) for _ in range(n)]
+    hot = rng.sample(range(4 * n, 6 * n), int(0.8 * n))
+    cold = rng.sample([*range(4 * n), *range(6 * n, 10 * n)], n - len(hot))
+    keys = hot + cold
+    rng.shuffle(keys)
+    hot_keys = keys[:max(1, n // 10)]
+    return keys, [rng.choice(hot_keys) if rng.random() < 0.9 else rng.choice(keys) for _ in range(n)]
+
+def prepare(op: str, keys: List[int], probes: List[int], t: int, mode: str,
+            rng: random.Random) -> Tuple[Callable[[], None], int]:
+    """Constrói o estado inicial de uma execução e retorna a função medida e seu número de operações."""
+    if op == "insert":
+        tree = BTree(t, check_mode=mode)
+        return (lambda: [tree.insert(k) for k in keys]), len(keys)
+    if op == "search":
+        tree = BTree.from_sorted(sorted(keys), t, check_mode=mode)
+        return (lambda: [tree.search(k) for k in probes]), len(probes)
+    if op == "delete":
+        tree = BTree.from_sorted(sorted(keys), t, check_mode=mode)
+        return (lambda: [tree.delete(k) for k in keys]), len(keys)
+    # mixed: metade das chaves já carregada; 50% buscas, 25% inserções e 25% remoções.
+    present, absent = keys[::2], keys[1::2]
+    tree = BTree.from_sorted(sorted(present), t, check_mode=mode)
+    plan = [(tree.search, k) for k in probes[:len(keys) // 2]]
+    plan += [(tree.insert, k) for k in absent[:len(keys) // 4]]
+    plan += [(tree.delete, k) for k in present[:len(keys) // 4]]
+    rng.shuffle(plan)
+    return (lambda: [f(k) for f, k in plan]), len(plan)
+
+def run_case(op: str, dist: str, t: int, n: int, mode: str, repeat: int, seed: int) -> Dict[str, float]:
+    """Mede um caso `repeat` vezes, com estado novo a cada execução, e retorna o melhor tempo."""
+    best = float("inf")
+    for r in range(repeat):
+        rng = random.Random(seed)
+        keys, probes = make_keys(dist, n, rng)
+        fn, ops = prepare(op, keys, probes, t, mode, rng)
+        start = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - start) * 1e6 / ops)
+    return {"us_per_op": best, "ops": ops}
+
+def case_name(op: str, dist: str, t: int, n: int, mode: str) -> str:
+    return f"{op}/{dist}/t={t}/n={n}/mode={mode}"
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[Tuple[str, float, float]]:
+    """Retorna (caso, tempo da linha de base, tempo atual) dos casos mais lentos que `1 + threshold` vezes a base."""
+    regressions = []
+    for name, current in results.items():
+        if name not in baseline: continue
+        old, new = baseline[name]["us_per_op"], current["us_per_op"]
+        if new > old * (1 + threshold): regressions.append((name, old, new))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", nargs="+", choices=OPERATIONS, default=list(OPERATIONS))
+    parser.add_argument("--dists", nargs="+", choices=DISTRIBUTIONS, default=list(DISTRIBUTIONS))
+    parser.add_argument("--orders", type=int, nargs="+", default=[2, 16, 128], help="ordens t a medir")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="números de chaves")
+    parser.add_argument("--modes", nargs="+", choices=[m.value for m in CheckMode], default=["off", "cheap", "full"],
+                        help="modos de verificação dos contratos")
+    parser.add_argument("--full-max-n", type=int, default=2000, help="maior n medido no modo full")
+    parser.add_argument("--repeat", type=int, default=3, help="execuções por caso; vale a mais rápida")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="arquivo JSON onde gravar os resultados")
+    parser.add_argument("--baseline", help="arquivo JSON de uma execução anterior para comparação")
+    parser.add_argument("--threshold", type=float, default=0.10, help="piora relativa tolerada antes de acusar regressão")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fp: baseline = json.load(fp)["results"]
+
+    results = {}
+    print(f"{'caso':<48} {'us/op':>10} {'base':>10} {'variação':>9}")
+    for op in args.ops:
+        for dist in args.dists:
+            for t in args.orders:
+                for n in args.sizes:
+                    for mode in args.modes:
+                        if mode == "full" and n > args.full_max_n: continue
+                        name = case_name(op, dist, t, n, mode)
+                        results[name] = run_case(op, dist, t, n, mode, args.repeat, args.seed)
+                        line = f"{name:<48} {results[name]['us_per_op']:>10.2f}"
+                        if name in baseline:
+                            old = baseline[name]["us_per_op"]
+                            line += f" {old:>10.2f} {(results[name]['us_per_op'] / old - 1) * 100:>+8.1f}%"
+                        print(line, flush=True)
+
+    if args.output:
+        meta = {"python": platform.python_version(), "platform": platform.platform(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "args": vars(args)}
+        with open(args.output, "w", encoding="utf-8") as fp: json.dump({"meta": meta, "results": results}, fp, indent=2)
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, old, new in regressions:
+        print(f"REGRESSÃO: {name}: {old:.2f} -> {new:.2f} us/op ({(new / old - 1) * 100:+.1f}%)")
+    if regressions: sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Mede a construção e a varredura completa de uma `ShardedBTree` com vários processos.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.sharded --n 2000000 --t 64 --shards 8 --workers 1 2 4 8
+
+A linha de base é `BTree.bulk_load` no processo atual. Para cada número de
+processos, `ShardedBTree.build` particiona as chaves no processo atual (em C,
+com numpy), carrega as partições nos processos de trabalho e recarrega os
+snapshots à medida que chegam; a varredura soma as chaves de cada partição
+com `map_shards`. O ganho só aparece com mais de um núcleo disponível, e a
+parte serial (partição e recarga da última partição) limita o ganho da
+construção, pela lei de Amdahl.
+"""
+import argparse
+import os
+import random
+import time
+from b_tree import BTree
+from sharded_b_tree import ShardedBTree
+
+def timed(fn):
+    """Executa `fn` e retorna (resultado, segundos)."""
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=2000000, help="número de chaves")
+    parser.add_argument("--t", type=int, default=64, help="ordem das árvores")
+    parser.add_argument("--shards", type=int, default=8, help="número de partições")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="números de processos a medir")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    keys = random.Random(args.seed).sample(range(10 * args.n), args.n)
+    tree, base_build = timed(lambda: BTree.bulk_load(keys, args.t, check_mode="off"))
+    total, base_scan = timed(lambda: sum(tree))
+    print(f"núcleos disponíveis: {os.cpu_count()}")
+    print(f"{'processos':>9} {'construção (s)':>15} {'ganho':>7} {'varredura (s)':>14} {'ganho':>7}")
+    print(f"{'base':>9} {base_build:>15.2f} {'1.00x':>7} {base_scan:>14.2f} {'1.00x':>7}")
+    for workers in args.workers:
+        sharded, build = timed(lambda: ShardedBTree.build(keys, args.t, args.shards, workers, check_mode="off"))
+        sums, scan = timed(lambda: sharded.map_shards(sum, workers))
+        if sum(sums) != total: raise SystemExit("A varredura em paralelo divergiu da sequencial.")
+        print(f"{workers:>9} {build:>15.2f} {base_build / build:>6.2f}x {scan:>14.2f} {base_scan / scan:>6.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Mede como a latência de busca, inserção e remoção escala com a ordem `t`.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.t_scaling --n 50000 --orders 2 8 32 128 512 2048
+
+Os contratos ficam desligados (`check_mode="off"`) para medir apenas os
+algoritmos da árvore.
+"""
+import argparse
+import random
+import time
+from b_tree import BTree
+
+def _per_op_us(start: float, ops: int) -> float:
+    """Converte o tempo decorrido desde `start` em microssegundos por operação."""
+    return (time.perf_counter() - start) * 1e6 / ops
+
+def run_order(t: int, keys: list, probes: list) -> dict:
+    """Executa inserção, busca e remoção para uma ordem `t` e retorna as latências médias."""
+    tree = BTree(t=t, check_mode="off")
+    start = time.perf_counter()
+    for k in keys: tree.insert(k)
+    insert_us = _per_op_us(start, len(keys))
+    start = time.perf_counter()
+    for k in probes: tree.search(k)
+    search_us = _per_op_us(start, len(probes))
+    removed = keys[::2]
+    start = time.perf_counter()
+    for k in removed: tree.delete(k)
+    delete_us = _per_op_us(start, len(removed))
+    return {"t": t, "height": tree.get_height(), "insert_us": insert_us, "search_us": search_us, "delete_us": delete_us}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=20000, help="número de chaves inseridas")
+    parser.add_argument("--orders", type=int, nargs="+", default=[2, 8, 32, 128, 512, 2048], help="ordens t a medir")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    keys = rng.sample(range(args.n * 10), args.n)
+    probes = [rng.choice(keys) for _ in range(args.n)]
+    print(f"{'t':>6} {'altura':>6} {'insert (us)':>12} {'search (us)':>12} {'delete (us)':>12}")
+    for t in args.orders:
+        r = run_order(t, keys, probes)
+        print(f"{r['t']:>6} {r['height']:>6} {r['insert_us']:>12.2f} {r['search_us']:>12.2f} {r['delete_us']:>12.2f}")
+
+if __name__ == "__main__":
+    main()
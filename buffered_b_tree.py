@@ -0,0 +1,315 @@
+from bisect import bisect_left
+from time import perf_counter_ns
+from typing import Dict, Iterable, Optional, Tuple
+import icontract
+from b_tree import BTree
+from b_tree_cursor import BTreeCursor
+from b_tree_node import BTreeNode
+
+class BufferedBTreeNode(BTreeNode):
+    """
+    Um nó da Árvore-B com um buffer de mensagens pendentes.
+
+    Atributos:
+        buffer (dict[int, bool]): Inserções (True) e remoções (False) ainda não
+            aplicadas à subárvore do nó, uma por chave (a mais recente). Só nós
+            internos recebem mensagens.
+    """
+    __slots__ = ("buffer",)
+
+    def __init__(self, leaf: bool = False):
+        """Inicializa um novo nó com o buffer vazio."""
+        super().__init__(leaf)
+        self.buffer: Dict[int, bool] = {}
+
+class BufferedBTree(BTree):
+    """
+    Uma Árvore-B com buffers de escrita nos nós internos (estilo B-épsilon).
+
+    `insert` e `delete` apenas registram uma mensagem no buffer da raiz. Quando
+    um buffer passa de `buffer_size` mensagens, as destinadas ao filho que mais
+    recebe são empurradas em lote para ele; nas folhas, o lote é aplicado de uma
+    vez e as divisões e fusões necessárias são feitas de baixo para cima. O custo
+    de descer até a folha é assim dividido entre as mensagens de um lote.
+
+    As escritas são cegas: inserir uma chave existente ou remover uma ausente não
+    tem efeito, e as operações não verificam isso (nem retornam se a chave foi
+    aplicada). Uma mensagem fica sempre acima da posição física da sua chave, e a
+    mais alta é a mais recente; `in` consulta os buffers do caminho de busca antes
+    das chaves de cada nó. A remoção de uma chave que está em um nó interno vira
+    uma marca de remoção (como na remoção preguiçosa) e a chave só sai da árvore
+    ao descer para uma folha ou na compactação.
+
+    Operações que dependem da posição das chaves (`search`, iteração, cursores,
+    intervalos, `len`, `rank`, `select`, `count_range`, snapshots e as posições
+    de `search_many`) esvaziam todos os buffers antes. `snapshot`, `split`, `join`
+    e as operações de conjunto não são suportados, pois os buffers são alterados
+    no lugar.
+    """
+    def __init__(self, t: int, buffer_size: Optional[int] = None, **kwargs):
+        buffer_size = 32 * t if buffer_size is None else buffer_size
+        if buffer_size < 1: raise ValueError("O tamanho do buffer deve ser no mínimo 1.")
+        super().__init__(t, node_class=BufferedBTreeNode, **kwargs)
+        self.buffer_size = buffer_size
+        # `_dirty` indica mensagens pendentes; `_reshapes` conta as mudanças de forma feitas
+        # durante o esvaziamento dos buffers.
+        self._dirty, self._reshapes = False, 0
+
+    def insert(self, k: int):
+        self._write(k, True)
+
+    def delete(self, k: int):
+        self._write(k, False)
+
+    def insert_many(self, keys: Iterable[int]):
+        for k in keys: self._write(k, True)
+
+    def delete_many(self, keys: Iterable[int]):
+        for k in keys: self._write(k, False)
+
+    @icontract.ensure(lambda self: self._check_structural_postconditions(), description="A estrutura da árvore deve ser válida após esvaziar os buffers.")
+    def flush(self):
+        """Aplica todas as mensagens pendentes e compacta a árvore se houver marcas demais."""
+        self._flush_all()
+        self._maybe_compact()
+
+    def search(self, k: int) -> Optional[Tuple[BTreeNode, int]]:
+        if not self._lookup(k): return None
+        found = self._search_from(self.root, k)
+        if found is None:
+            # A chave só existe como mensagem; a posição física exige aplicá-la.
+            self._flush_all()
+            found = self._search_from(self.root, k)
+        return found
+
+    def __contains__(self, k: int) -> bool:
+        return self._lookup(k)
+
+    def _contains(self, k: int) -> bool:
+        return self._lookup(k)
+
+    def search_many(self, keys, positions: bool = False):
+        if positions or not self._dirty:
+            self._flush_all()
+            return super().search_many(keys, positions)
+        import numpy as np
+        result = super().search_many(keys)
+        pending = self._pending_messages()
+        if pending:
+            flat, probes = result.reshape(-1), np.asarray(keys, dtype=np.int64).ravel()
+            order = sorted(pending)
+            pending_keys = np.array(order, dtype=np.int64)
+            pending_ops = np.array([pending[k] for k in order], dtype=bool)
+            idx = np.minimum(np.searchsorted(pending_keys, probes), len(order) - 1)
+            hit = pending_keys[idx] == probes
+            flat[hit] = pending_ops[idx[hit]]
+        return result
+
+    def snapshot(self):
+        raise NotImplementedError("Snapshots de leitura não são suportados pela BufferedBTree.")
+
+    def _empty_like(self, cls=None):
+        raise NotImplementedError("Divisão, junção e operações de conjunto não são suportadas pela BufferedBTree.")
+
+    def cursor(self) -> BTreeCursor:
+        self._flush_all()
+        return super().cursor()
+
+    def __len__(self) -> int:
+        self._flush_all()
+        return super().__len__()
+
+    def rank(self, k: int) -> int:
+        self._flush_all()
+        return super().rank(k)
+
+    def select(self, i: int) -> int:
+        self._flush_all()
+        return super().select(i)
+
+    def count_range(self, *args, **kwargs) -> int:
+        self._flush_all()
+        return super().count_range(*args, **kwargs)
+
+    def save(self, path: str):
+        self._flush_all()
+        super().save(path)
+
+    def to_bytes(self) -> bytes:
+        self._flush_all()
+        return super().to_bytes()
+
+    def _write(self, k: int, op: bool):
+        start = perf_counter_ns() if self.stats else 0
+        root = self.root
+        if root.leaf:
+            # Enquanto a árvore cabe em uma folha não há buffer: a escrita é aplicada direto.
+            if op: self._resurrect(k) or self._insert_along([], k)
+            elif self._delete_along([], k): self._tombstones.discard(k)
+        else:
+            root.buffer[k] = op
+            self._dirty = True
+            if len(root.buffer) > self.buffer_size: self._flush_root()
+        if self.stats: self.stats.record("insert" if op else "delete", perf_counter_ns() - start)
+
+    # As escritas não passam pelos contratos, que custariam mais que a própria escrita; a
+    # estrutura é verificada a cada esvaziamento do buffer da raiz.
+    @icontract.ensure(lambda self: self._check_structural_postconditions(), description="A estrutura da árvore deve ser válida após esvaziar o buffer da raiz.")
+    def _flush_root(self):
+        self._flush(self.root, self.buffer_size)
+        self._settle_root()
+
+    # A primeira mensagem encontrada na descida é a mais recente; sem mensagem, vale a chave física.
+    def _lookup(self, k: int) -> bool:
+        x = self.root
+        while True:
+            op = x.buffer.get(k)
+            if op is not None: return op
+            i = bisect_left(x.keys, k)
+            if i < len(x.keys) and x.keys[i] == k: return k not in self._tombstones
+            if x.leaf: return False
+            x = x.children[i]
+
+    # Reúne as mensagens de todos os buffers; os ancestrais são visitados antes e prevalecem.
+    def _pending_messages(self) -> Dict[int, bool]:
+        pending, stack = {}, [self.root]
+        while stack:
+            x = stack.pop()
+            if x.leaf: continue
+            for k, op in x.buffer.items(): pending.setdefault(k, op)
+            stack.extend(x.children)
+        return pending
+
+    def _flush_all(self):
+        if not self._dirty: return
+        # Um nó que fica sem chaves interrompe o esvaziamento da sua subárvore até ser ajustado
+        # pelo pai, por isso podem ser necessárias várias rodadas.
+        while not self.root.leaf and self._pending_messages():
+            self._flush(self.root, 0)
+            self._settle_root()
+        self._dirty = False
+
+    # Empurra mensagens de `x` para os filhos até o buffer ter no máximo `limit`, sempre o lote
+    # do filho que mais recebe. Com `limit` 0, esvazia também os buffers de toda a subárvore.
+    # Retorna a variação do número de chaves vivas na subárvore causada pelas folhas; marcas
+    # postas ou retiradas já ajustam os tamanhos do caminho desde a raiz.
+    def _flush(self, x: BTreeNode, limit: int) -> int:
+        delta = 0
+        while x.keys:
+            self._absorb(x)
+            if len(x.buffer) <= limit: break
+            pending = sorted(x.buffer)
+            cuts = [0, *(bisect_left(pending, s) for s in x.keys), len(pending)]
+            j = max(range(len(x.children)), key=lambda c: cuts[c + 1] - cuts[c])
+            batch = {k: x.buffer.pop(k) for k in pending[cuts[j]:cuts[j + 1]]}
+            delta += self._push_down(x, j, batch, limit)
+        if not limit and x.keys and not x.children[0].leaf:
+            # Filhos que não receberam mensagens podem ter buffers pendentes. Se a forma de `x`
+            # mudar, o filho anterior é revisitado, pois pode ter recebido nós de um irmão.
+            j = 0
+            while x.keys and j < len(x.children):
+                reshapes = self._reshapes
+                delta += self._push_down(x, j, {}, 0)
+                j = j + 1 if reshapes == self._reshapes else max(0, j - 1)
+        x.size += delta
+        return delta
+
+    # Mensagens para chaves do próprio nó são aplicadas nele: a inserção retira a marca de
+    # remoção, e a remoção marca a chave, já que retirá-la de um nó interno exigiria descer.
+    def _absorb(self, x: BTreeNode):
+        if not x.buffer: return
+        for s in x.keys:
+            op = x.buffer.pop(s, None)
+            if op is None: continue
+            if op: self._resurrect(s)
+            else: self._bury(s)
+
+    def _push_down(self, x: BTreeNode, j: int, batch: Dict[int, bool], limit: int) -> int:
+        if self.stats and batch: self.stats.count("flushes")
+        child = x.children[j]
+        if child.leaf: delta = self._apply_to_leaf(child, batch)
+        else:
+            child.buffer.update(batch)
+            delta = self._flush(child, limit)
+        if len(child.keys) > 2 * self.t - 1: self._split_overfull(x, j)
+        elif len(child.keys) < self.t - 1: self._rebalance_siblings(x, j - 1 if j else 0)
+        return delta
+
+    def _apply_to_leaf(self, leaf: BTreeNode, batch: Dict[int, bool]) -> int:
+        keys, delta = leaf.keys, 0
+        for k in sorted(batch):
+            i = bisect_left(keys, k)
+            present = i < len(keys) and keys[i] == k
+            if batch[k]:
+                if present: self._resurrect(k)
+                else:
+                    keys.insert(i, k)
+                    delta += 1
+            elif present:
+                keys.pop(i)
+                # Uma chave marcada já estava fora dos tamanhos; só a marca é descartada.
+                if k in self._tombstones: self._tombstones.discard(k)
+                else: delta -= 1
+        leaf.size += delta
+        return delta
+
+    # Depois de um lote a raiz pode ter chaves demais (é dividida) ou nenhuma (a altura diminui).
+    def _settle_root(self):
+        while True:
+            root = self.root
+            if len(root.keys) > 2 * self.t - 1:
+                if self.stats: self.stats.count("root_splits")
+                new_root = self._new_node()
+                new_root.children.append(root)
+                new_root.size = root.size
+                self.root = new_root
+                self._split_overfull(new_root, 0)
+            elif not root.leaf and not root.keys:
+                child = root.children[0]
+                if child.leaf: self._apply_to_leaf(child, root.buffer)
+                else: child.buffer.update(root.buffer)
+                self.root = child
+                self._release_node(root)
+                if self.stats: self.stats.count("root_shrinks")
+            else: return
+
+    # Divide o filho j de `p`, que pode ter qualquer número de chaves acima do máximo: cada
+    # passo separa as t-1 últimas chaves em um novo nó e sobe a anterior para `p`.
+    def _split_overfull(self, p: BTreeNode, j: int):
+        t, y = self.t, p.children[j]
+        while len(y.keys) > 2 * t - 1:
+            if self.stats: self.stats.count("splits")
+            z = self._new_node(leaf=y.leaf)
+            n = len(y.keys)
+            m = y.keys[n - t]
+            z.keys, y.keys = y.keys[n - t + 1:], y.keys[:n - t]
+            if not y.leaf: z.children, y.children = y.children[-t:], y.children[:-t]
+            z.size = self._live_count(z.keys) + sum(c.size for c in z.children)
+            y.size -= z.size + self._weight(m)
+            self._partition_buffer(p, m, y, z, y.buffer)
+            p.keys.insert(j, m)
+            p.children.insert(j + 1, z)
+        self._reshapes += 1
+        self._finger = None
+
+    def _merge_children(self, x: BTreeNode, i: int):
+        x.children[i].buffer.update(x.children[i + 1].buffer)
+        super()._merge_children(x, i)
+
+    def _rebalance_siblings(self, x: BTreeNode, i: int):
+        left, right = x.children[i], x.children[i + 1]
+        pending = {**left.buffer, **right.buffer}
+        super()._rebalance_siblings(x, i)
+        if len(x.children) > i + 1 and x.children[i + 1] is right: self._partition_buffer(x, x.keys[i], left, right, pending)
+        self._reshapes += 1
+        self._finger = None
+
+    # Reparte as mensagens entre os irmãos separados por `sep`. A mensagem da própria
+    # separadora sobe para o pai, a menos que ele já tenha uma mais recente.
+    def _partition_buffer(self, parent: BTreeNode, sep: int, left: BTreeNode, right: BTreeNode, pending: Dict[int, bool]):
+        if not pending:
+            left.buffer, right.buffer = {}, {}
+            return
+        left.buffer = {k: op for k, op in pending.items() if k < sep}
+        right.buffer = {k: op for k, op in pending.items() if k > sep}
+        if sep in pending: parent.buffer.setdefault(sep, pending[sep])
@@ -0,0 +1,297 @@
+import threading
+from bisect import bisect_left
+from typing import Iterable, List, Optional, Tuple
+import icontract
+from b_tree import BTree
+from b_tree_node import BTreeNode
+from contracts_helpers import CheckMode
+
+class RWLatch:
+    """
+    Trava de leitores/escritor: vários leitores ou um único escritor por vez.
+
+    Escritores em espera têm preferência sobre novos leitores, de modo que uma
+    sequência contínua de leituras não impede uma escrita de avançar.
+    """
+    __slots__ = ("_cond", "_readers", "_writer", "_writers_waiting")
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers, self._writer, self._writers_waiting = 0, False, 0
+
+    def acquire_read(self):
+        with self._cond:
+            while self._writer or self._writers_waiting: self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if not self._readers: self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers: self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+class LatchedBTreeNode(BTreeNode):
+    """
+    Um nó da Árvore-B com sua própria trava de leitores/escritor.
+
+    Atributos:
+        latch (RWLatch): A trava que protege as chaves e os filhos do nó.
+    """
+    __slots__ = ("latch",)
+
+    def __init__(self, leaf: bool = False):
+        """Inicializa um novo nó com uma trava livre."""
+        super().__init__(leaf)
+        self.latch = RWLatch()
+
+class ConcurrentBTree(BTree):
+    """
+    Uma Árvore-B segura para uso por várias threads, com travas por nó.
+
+    As descidas usam acoplamento de travas (a trava do filho é obtida antes de
+    liberar a do pai). Inserções e remoções tentam primeiro um caminho otimista,
+    com travas de leitura até a folha e de escrita apenas nela; se a folha não
+    for segura (cheia na inserção, com t-1 chaves na remoção) ou a chave a remover
+    estiver em um nó interno, a operação recomeça com travas de escrita, dividindo
+    ou preenchendo os filhos na descida e liberando cada ancestral assim que o
+    filho se torna seguro. A trava `_root_latch` protege o ponteiro da raiz.
+
+    Os tamanhos das subárvores não são mantidos, pois os ancestrais já foram
+    liberados quando a folha muda: `len` usa um contador e `rank`, `select` e
+    `count_range` (e as posições de `search_many`) não são suportados, assim como
+    `snapshot`, `split`, `join` e as operações de conjunto, já que a cópia sob
+    escrita trocaria nós travados. Os contratos
+    ficam desligados, e a árvore não aceita as opções da `BTree` (nem nas
+    construções por `from_sorted`, `bulk_load` e `from_bytes`). Iteração, intervalos, cursores, buscas em lote,
+    impressão e snapshots não usam as travas e só devem ser usados sem escritas
+    concorrentes.
+    """
+    def __init__(self, t: int):
+        super().__init__(t, check_mode=CheckMode.OFF, node_class=LatchedBTreeNode)
+        self._root_latch = RWLatch()
+        self._count, self._count_lock = 0, threading.Lock()
+
+    @classmethod
+    def from_sorted(cls, keys: Iterable[int], t: int, fill_factor: float = 1.0) -> "ConcurrentBTree":
+        tree = super().from_sorted(keys, t, fill_factor)
+        tree._count = tree.root.size
+        return tree
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ConcurrentBTree":
+        tree = super().from_bytes(data)
+        tree._count = tree.root.size
+        return tree
+
+    def insert(self, k: int):
+        if not self._insert(k): raise icontract.ViolationError("A chave a ser inserida não deve existir na árvore.")
+
+    def delete(self, k: int):
+        if not self._delete(k): raise icontract.ViolationError("A chave a ser removida deve existir na árvore.")
+
+    def insert_many(self, keys: Iterable[int]) -> List[Tuple[int, bool]]:
+        keys = list(keys)
+        return self._batch_outcomes(keys, {k: self._insert(k) for k in sorted(set(keys))})
+
+    def delete_many(self, keys: Iterable[int]) -> List[Tuple[int, bool]]:
+        keys = list(keys)
+        return self._batch_outcomes(keys, {k: self._delete(k) for k in sorted(set(keys))})
+
+    def search(self, k: int) -> Optional[Tuple[BTreeNode, int]]:
+        self._root_latch.acquire_read()
+        x = self.root
+        x.latch.acquire_read()
+        self._root_latch.release_read()
+        while True:
+            i = bisect_left(x.keys, k)
+            if (i < len(x.keys) and x.keys[i] == k) or x.leaf:
+                found = i < len(x.keys) and x.keys[i] == k
+                x.latch.release_read()
+                return (x, i) if found else None
+            child = x.children[i]
+            child.latch.acquire_read()
+            x.latch.release_read()
+            x = child
+
+    def __contains__(self, k: int) -> bool:
+        return self.search(k) is not None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def search_many(self, keys, positions: bool = False):
+        if positions: raise NotImplementedError("Estatísticas de ordem não são suportadas pela ConcurrentBTree.")
+        return super().search_many(keys)
+
+    def rank(self, k: int) -> int:
+        raise NotImplementedError("Estatísticas de ordem não são suportadas pela ConcurrentBTree.")
+
+    def snapshot(self):
+        raise NotImplementedError("Snapshots de leitura não são suportados pela ConcurrentBTree.")
+
+    def _empty_like(self, cls=None):
+        raise NotImplementedError("Divisão, junção e operações de conjunto não são suportadas pela ConcurrentBTree.")
+
+    def select(self, i: int) -> int:
+        raise NotImplementedError("Estatísticas de ordem não são suportadas pela ConcurrentBTree.")
+
+    def count_range(self, *args, **kwargs) -> int:
+        raise NotImplementedError("Estatísticas de ordem não são suportadas pela ConcurrentBTree.")
+
+    def _add_to_count(self, delta: int):
+        with self._count_lock: self._count += delta
+
+    def _insert(self, k: int) -> bool:
+        leaf = self._descend_optimistic(k)
+        if leaf is None: return False
+        try:
+            i = bisect_left(leaf.keys, k)
+            if i < len(leaf.keys) and leaf.keys[i] == k: return False
+            inserted = len(leaf.keys) < 2 * self.t - 1
+            if inserted: leaf.keys.insert(i, k)
+        finally:
+            leaf.latch.release_write()
+        if not inserted: inserted = self._insert_pessimistic(k)
+        if inserted: self._add_to_count(1)
+        return inserted
+
+    def _delete(self, k: int) -> bool:
+        leaf = self._descend_optimistic(k)
+        if leaf is not None:
+            try:
+                i = bisect_left(leaf.keys, k)
+                if i == len(leaf.keys) or leaf.keys[i] != k: return False
+                removed = len(leaf.keys) >= self.t or leaf is self.root
+                if removed: leaf.keys.pop(i)
+            finally:
+                leaf.latch.release_write()
+        if leaf is None or not removed: removed = self._delete_pessimistic(k)
+        if removed: self._add_to_count(-1)
+        return removed
+
+    # Desce com travas de leitura e trava para escrita apenas a folha de `k`, que é retornada
+    # travada. Retorna None, sem travas, se `k` estiver em um nó interno. O campo `leaf` de um
+    # nó nunca muda, então o tipo de trava de cada nó é conhecido antes de obtê-la.
+    def _descend_optimistic(self, k: int) -> Optional[BTreeNode]:
+        self._root_latch.acquire_read()
+        x = self.root
+        x.latch.acquire_write() if x.leaf else x.latch.acquire_read()
+        self._root_latch.release_read()
+        while not x.leaf:
+            i = bisect_left(x.keys, k)
+            if i < len(x.keys) and x.keys[i] == k:
+                x.latch.release_read()
+                return None
+            child = x.children[i]
+            child.latch.acquire_write() if child.leaf else child.latch.acquire_read()
+            x.latch.release_read()
+            x = child
+        return x
+
+    # Caminho pessimista da inserção: com travas de escrita, divide a raiz e cada filho cheio
+    # na descida. Depois disso o filho nunca se divide, e o pai é liberado.
+    def _insert_pessimistic(self, k: int) -> bool:
+        max_keys = 2 * self.t - 1
+        self._root_latch.acquire_write()
+        x = self.root
+        x.latch.acquire_write()
+        if len(x.keys) == max_keys:
+            self._split_root()
+            old_root, x = x, self.root
+            x.latch.acquire_write()
+            old_root.latch.release_write()
+        self._root_latch.release_write()
+        try:
+            while True:
+                i = bisect_left(x.keys, k)
+                if i < len(x.keys) and x.keys[i] == k: return False
+                if x.leaf:
+                    x.keys.insert(i, k)
+                    return True
+                child = x.children[i]
+                child.latch.acquire_write()
+                if len(child.keys) == max_keys:
+                    self._split_child(x, i)
+                    if k >= x.keys[i]:
+                        child.latch.release_write()
+                        if k == x.keys[i]: return False
+                        child = x.children[i + 1]
+                        child.latch.acquire_write()
+                x.latch.release_write()
+                x = child
+        finally:
+            x.latch.release_write()
+
+    # Caminho pessimista da remoção: com travas de escrita, garante que cada filho visitado tenha
+    # ao menos t chaves (travando também os irmãos usados no empréstimo ou na fusão) e libera o
+    # pai em seguida. Uma chave em nó interno é trocada pela maior chave da subárvore esquerda
+    # (`mode` -1) ou pela menor da direita (`mode` 0); o nó que a contém (`target`) fica travado
+    # até que a substituta seja retirada da folha.
+    def _delete_pessimistic(self, k: int) -> bool:
+        t = self.t
+        self._root_latch.acquire_write()
+        x = self.root
+        x.latch.acquire_write()
+        root_latched, target, mode = True, None, None
+        try:
+            while True:
+                if mode is None:
+                    i = bisect_left(x.keys, k)
+                    found = i < len(x.keys) and x.keys[i] == k
+                else:
+                    i, found = (len(x.keys) if mode < 0 else 0), False
+                if x.leaf:
+                    if target is not None:
+                        node, j = target
+                        node.keys[j] = x.keys.pop() if mode < 0 else x.keys.pop(0)
+                        return True
+                    if found: x.keys.pop(i)
+                    return found
+                if found:
+                    left, right = x.children[i], x.children[i + 1]
+                    left.latch.acquire_write()
+                    right.latch.acquire_write()
+                    if len(left.keys) >= t:
+                        target, mode, child = (x, i), -1, left
+                        right.latch.release_write()
+                    elif len(right.keys) >= t:
+                        target, mode, child = (x, i), 0, right
+                        left.latch.release_write()
+                    else:
+                        self._merge_children(x, i)
+                        child = left
+                        right.latch.release_write()
+                else:
+                    child = x.children[i]
+                    child.latch.acquire_write()
+                    if len(child.keys) < t:
+                        latched = [child] + [x.children[j] for j in (i - 1, i + 1) if 0 <= j <= len(x.keys)]
+                        for node in latched[1:]: node.latch.acquire_write()
+                        self._fill_child(x, i)
+                        if i > len(x.keys): i -= 1
+                        child = x.children[i]
+                        for node in latched:
+                            if node is not child: node.latch.release_write()
+                if x is self.root and not x.keys:
+                    self.root = child
+                    self._release_node(x)
+                if target is None or target[0] is not x: x.latch.release_write()
+                if root_latched:
+                    self._root_latch.release_write()
+                    root_latched = False
+                x = child
+        finally:
+            x.latch.release_write()
+            if target is not None and target[0] is not x: target[0].latch.release_write()
+            if root_latched: self._root_latch.release_write()
@@ -1,5 +1,22 @@
-from typing import List
-from b_tree_node import BTreeNode
+from bisect import bisect_left
+from enum import Enum
+from typing import AbstractSet, Sequence
+from b_tree_node import BTreeNode, Key
+
+class CheckMode(str, Enum):
+    """
+    Nível de verificação dos contratos da Árvore-B.
+
+    Valores:
+        OFF: desativa invariantes e pós-condições estruturais.
+        SAMPLED: verificação completa a cada N operações públicas.
+        CHEAP: verifica apenas os caminhos tocados pelas operações de escrita.
+        FULL: verificação completa antes e depois de toda operação pública.
+    """
+    OFF = "off"
+    SAMPLED = "sampled"
+    CHEAP = "cheap"
+    FULL = "full"
 
 def _check_node_key_count(node: BTreeNode, t: int, is_root: bool) -> bool:
     """Verifica se o número de chaves em um nó está dentro dos limites da Árvore-B."""
@@ -14,6 +31,68 @@ def _check_node_child_count(node: BTreeNode, t: int, is_root: bool) -> bool:
     min_children, max_children = (2 if is_root else t), 2 * t
     return min_children <= len(node.children) <= max_children
 
-def _check_keys_sorted(keys: List[int]) -> bool:
+def _check_keys_sorted(keys: Sequence[Key]) -> bool:
     """Verifica se as chaves em uma lista estão ordenadas crescentemente."""
-    return all(keys[i] <= keys[i + 1] for i in range(len(keys) - 1))
\ No newline at end of file
+    return all(keys[i] <= keys[i + 1] for i in range(len(keys) - 1))
+
+def _check_keys_in_bounds(keys: Sequence[Key], lo, hi) -> bool:
+    """Verifica se as chaves (já ordenadas) estão estritamente entre os limites herdados dos ancestrais."""
+    if not keys: return True
+    return (lo is None or keys[0] > lo) and (hi is None or keys[-1] < hi)
+
+def _check_node_size(node: BTreeNode, dead: AbstractSet[Key] = frozenset()) -> bool:
+    """Verifica se o tamanho guardado no nó é a soma das suas chaves vivas (fora de `dead`) com os tamanhos dos filhos."""
+    live = len(node.keys) - sum(1 for k in node.keys if k in dead) if dead else len(node.keys)
+    return node.size == live + sum(child.size for child in node.children)
+
+def _check_node(node: BTreeNode, t: int, is_root: bool, lo, hi, dead: AbstractSet[Key] = frozenset()) -> bool:
+    """Aplica ao nó todas as verificações locais: contagens, tamanho, ordenação e limites."""
+    return (_check_node_key_count(node, t, is_root) and _check_node_child_count(node, t, is_root)
+            and _check_node_size(node, dead) and _check_keys_sorted(node.keys) and _check_keys_in_bounds(node.keys, lo, hi))
+
+def _check_subtree(root: BTreeNode, t: int, dead: AbstractSet[Key] = frozenset()) -> bool:
+    """
+    Valida a árvore inteira em uma única passada, em tempo linear.
+
+    Cada nó é visitado uma vez carregando os limites (lo, hi) definidos pelas
+    chaves separadoras dos ancestrais, o que substitui a comparação de cada
+    separador com todas as chaves das subárvores. `dead` são as chaves com
+    marca de remoção, que não entram nos tamanhos.
+    """
+    leaf_depth, stack = None, [(root, None, None, 0)]
+    while stack:
+        node, lo, hi, depth = stack.pop()
+        if not _check_node(node, t, node is root, lo, hi, dead): return False
+        if node.leaf:
+            if leaf_depth is None: leaf_depth = depth
+            elif depth != leaf_depth: return False
+            continue
+        bounds = [lo, *node.keys, hi]
+        for i, child in enumerate(node.children): stack.append((child, bounds[i], bounds[i + 1], depth + 1))
+    return True
+
+def _check_path(root: BTreeNode, t: int, k: Key, height: int, dead: AbstractSet[Key] = frozenset()) -> bool:
+    """
+    Valida apenas o caminho da raiz até a folha em que `k` está (ou estaria).
+
+    Além dos nós do caminho, verifica as contagens e os limites dos filhos de
+    cada nó visitado, que são os irmãos afetados por divisões, fusões e
+    empréstimos. Quando `k` é a separadora de um nó interno, segue pelos dois
+    filhos vizinhos, pois ela pode ter vindo do predecessor ou do sucessor na
+    remoção. O custo é O(altura * t).
+    """
+    stack = [(root, None, None, 0)]
+    while stack:
+        node, lo, hi, depth = stack.pop()
+        if not _check_node(node, t, node is root, lo, hi, dead): return False
+        if node.leaf:
+            if depth != height: return False
+            continue
+        bounds = [lo, *node.keys, hi]
+        for i, child in enumerate(node.children):
+            if not _check_node(child, t, False, bounds[i], bounds[i + 1], dead): return False
+        i = bisect_left(node.keys, k)
+        stack.append((node.children[i], bounds[i], bounds[i + 1], depth + 1))
+        if i < len(node.keys) and node.keys[i] == k:
+            stack.append((node.children[i + 1], bounds[i + 1], bounds[i + 2], depth + 1))
+    return True
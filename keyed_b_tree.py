@@ -0,0 +1,157 @@
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+from b_tree import BTree
+from b_tree_cursor import BTreeCursor
+from b_tree_node import BTreeNode, Key
+
+class _Entry:
+    """Um valor guardado na `KeyedBTree` junto com a sua chave de ordenação."""
+    __slots__ = ("key", "value")
+
+    def __init__(self, key: Key, value: Any):
+        self.key, self.value = key, value
+
+    def __lt__(self, other: "_Entry") -> bool:
+        return self.key < other.key
+
+    def __le__(self, other: "_Entry") -> bool:
+        return self.key <= other.key
+
+    def __gt__(self, other: "_Entry") -> bool:
+        return self.key > other.key
+
+    def __ge__(self, other: "_Entry") -> bool:
+        return self.key >= other.key
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, _Entry) and self.key == other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __repr__(self) -> str:
+        return repr(self.value)
+
+class _KeyedCursor(BTreeCursor):
+    """Cursor da `KeyedBTree`: é posicionado por valores e devolve valores."""
+
+    @property
+    def key(self) -> Any:
+        entry = self._current()
+        return None if entry is None else entry.value
+
+    def seek(self, value: Any) -> "_KeyedCursor":
+        return super().seek(self.tree._entry(value))
+
+    def seek_last(self, value: Any) -> "_KeyedCursor":
+        return super().seek_last(self.tree._entry(value))
+
+    def forward(self) -> Iterator[Any]:
+        return (entry.value for entry in super().forward())
+
+    def backward(self) -> Iterator[Any]:
+        return (entry.value for entry in super().backward())
+
+class KeyedBTree(BTree):
+    """
+    Uma Árvore-B ordenada por uma função de chave, como `sorted(valores, key=key)`.
+
+    Cada valor é guardado junto com `key(valor)`, calculada uma única vez na
+    inserção, e a árvore compara apenas essas chaves; dois valores com a mesma
+    chave são o mesmo elemento. As operações recebem e devolvem valores: buscas,
+    remoções, posições e limites de intervalo aplicam `key` ao argumento, então
+    basta passar um valor com a chave desejada. As chaves precisam ter ordem
+    total e ser hashable. Snapshots binários e de leitura não são suportados.
+
+    Atributos:
+        key (Callable): A função que extrai a chave de ordenação de um valor
+            (sem função, o próprio valor é a chave).
+    """
+    def __init__(self, t: int, key: Optional[Callable[[Any], Key]] = None, **kwargs):
+        """Cria uma árvore vazia ordenada por `key`; `kwargs` vão para a `BTree`."""
+        super().__init__(t, **kwargs)
+        self.key = key
+
+    @classmethod
+    def from_sorted(cls, values: Iterable[Any], t: int, fill_factor: float = 1.0,
+                    key: Optional[Callable[[Any], Key]] = None, **kwargs) -> "KeyedBTree":
+        tree = cls(t, key=key, **kwargs)
+        tree.root = tree._pack_sorted(map(tree._entry, values), fill_factor)
+        return tree
+
+    @classmethod
+    def bulk_load(cls, values: Iterable[Any], t: int, fill_factor: float = 1.0,
+                  key: Optional[Callable[[Any], Key]] = None, **kwargs) -> "KeyedBTree":
+        tree, unique = cls(t, key=key, **kwargs), {}
+        # Como em `insert_many`, entre valores com a mesma chave vale o primeiro.
+        for entry in map(tree._entry, values): unique.setdefault(entry.key, entry)
+        tree.root = tree._pack_sorted(sorted(unique.values()), fill_factor)
+        return tree
+
+    @classmethod
+    def from_bytes(cls, data: bytes, **kwargs):
+        raise NotImplementedError("Snapshots binários não são suportados pela KeyedBTree.")
+
+    def snapshot(self):
+        raise NotImplementedError("Snapshots de leitura não são suportados pela KeyedBTree.")
+
+    # Os cursores do usuário são posicionados por valores; os limites passados pelas rotinas
+    # internas da `BTree` já são entradas e não são embrulhados de novo.
+    def _entry(self, value: Any) -> _Entry:
+        if isinstance(value, _Entry): return value
+        return _Entry(value if self.key is None else self.key(value), value)
+
+    def _empty_like(self, cls=None) -> "KeyedBTree":
+        tree = super()._empty_like(cls)
+        tree.key = self.key
+        return tree
+
+    def insert(self, value: Any):
+        return super().insert(self._entry(value))
+
+    def delete(self, value: Any):
+        return super().delete(self._entry(value))
+
+    def insert_many(self, values: Iterable[Any]) -> List[Tuple[Any, bool]]:
+        return [(entry.value, applied) for entry, applied in super().insert_many(map(self._entry, values))]
+
+    def delete_many(self, values: Iterable[Any]) -> List[Tuple[Any, bool]]:
+        return [(entry.value, applied) for entry, applied in super().delete_many(map(self._entry, values))]
+
+    def search(self, value: Any) -> Optional[Tuple[BTreeNode, int]]:
+        return super().search(self._entry(value))
+
+    def __contains__(self, value: Any) -> bool:
+        return super().__contains__(self._entry(value))
+
+    def search_many(self, values: Iterable[Any], positions: bool = False):
+        return super().search_many([self._entry(value) for value in values], positions)
+
+    def split(self, value: Any) -> Tuple["KeyedBTree", "KeyedBTree"]:
+        return super().split(self._entry(value))
+
+    def __iter__(self) -> Iterator[Any]:
+        return (entry.value for entry in super().__iter__())
+
+    def __reversed__(self) -> Iterator[Any]:
+        return (entry.value for entry in super().__reversed__())
+
+    def cursor(self) -> _KeyedCursor:
+        return _KeyedCursor(self)
+
+    def _cursor(self) -> BTreeCursor:
+        return BTreeCursor(self)
+
+    def range(self, lo: Any = None, hi: Any = None,
+              inclusive: Union[bool, Tuple[bool, bool]] = (True, True)) -> Iterator[Any]:
+        lo, hi = (None if lo is None else self._entry(lo)), (None if hi is None else self._entry(hi))
+        return (entry.value for entry in super().range(lo, hi, inclusive))
+
+    def count_range(self, lo: Any = None, hi: Any = None, inclusive: Union[bool, Tuple[bool, bool]] = (True, True)) -> int:
+        lo, hi = (None if lo is None else self._entry(lo)), (None if hi is None else self._entry(hi))
+        return super().count_range(lo, hi, inclusive)
+
+    def rank(self, value: Any) -> int:
+        return super().rank(self._entry(value))
+
+    def select(self, i: int) -> Any:
+        return super().select(i).value
@@ -1,4 +1,10 @@
+import argparse
+import sys
+import time
+from typing import IO, Iterable, List, Optional
 from b_tree import BTree
+from b_tree_stats import format_snapshot
+from contracts_helpers import CheckMode
 import icontract
 
 # Códigos ANSI para cores no terminal
@@ -17,13 +23,13 @@ def run():
         except ValueError:
             print(f"{RED}Erro: Entrada inválida. Por favor, digite um número inteiro.{RESET}")
 
-    b_tree = BTree(t=t)
+    b_tree = BTree(t=t, stats=True)
     print(f"{GREEN}Árvore-B de ordem t={t} criada com sucesso!{RESET}")
     
     def menu():
         """Exibe o menu de opções para o usuário."""
         print(f"\n{BOLD}{BLUE}--- MENU ÁRVORE-B (t={b_tree.t}) ---{RESET}")
-        print(f"{YELLOW}1. Inserir chave(s){RESET}\n{YELLOW}2. Remover chave(s){RESET}\n{YELLOW}3. Buscar chave{RESET}\n{YELLOW}4. Exibir árvore{RESET}\n{YELLOW}5. Sair{RESET}\n")
+        print(f"{YELLOW}1. Inserir chave(s){RESET}\n{YELLOW}2. Remover chave(s){RESET}\n{YELLOW}3. Buscar chave{RESET}\n{YELLOW}4. Exibir árvore{RESET}\n{YELLOW}5. Exibir estatísticas{RESET}\n{YELLOW}6. Sair{RESET}\n")
         return input(f"{BOLD}Escolha uma opção: {RESET}")
 
     while True:
@@ -32,12 +38,9 @@ def run():
             try:
                 chave_input = input(f"{BOLD}Digite a(s) chave(s) a inserir (separadas por espaço): {RESET}")
                 chaves = [int(item) for item in chave_input.split()]
-                for chave in chaves:
-                    if b_tree.search(chave) is not None:
-                        print(f"{YELLOW}Chave {chave} já existe. Ignorando.{RESET}")
-                        continue
-                    b_tree.insert(chave)
-                    print(f"{GREEN}Chave {chave} inserida com sucesso.{RESET}")
+                for chave, inserida in b_tree.insert_many(chaves):
+                    if inserida: print(f"{GREEN}Chave {chave} inserida com sucesso.{RESET}")
+                    else: print(f"{YELLOW}Chave {chave} já existe. Ignorando.{RESET}")
             except ValueError: print(f"{RED}Entrada inválida. Digite apenas números inteiros separados por espaço.{RESET}")
             except icontract.errors.ViolationError as e: print(f"{RED}Erro de contrato ao inserir: {e}{RESET}")
         
@@ -45,12 +48,9 @@ def run():
             try:
                 chave_input = input(f"{BOLD}Digite a(s) chave(s) a remover (separadas por espaço): {RESET}")
                 chaves = [int(item) for item in chave_input.split()]
-                for chave in chaves:
-                    if b_tree.search(chave) is None:
-                        print(f"{YELLOW}Chave {chave} não existe. Ignorando.{RESET}")
-                        continue
-                    b_tree.delete(chave)
-                    print(f"{GREEN}Chave {chave} removida com sucesso.{RESET}")
+                for chave, removida in b_tree.delete_many(chaves):
+                    if removida: print(f"{GREEN}Chave {chave} removida com sucesso.{RESET}")
+                    else: print(f"{YELLOW}Chave {chave} não existe. Ignorando.{RESET}")
             except ValueError: print(f"{RED}Entrada inválida. Digite apenas números inteiros separados por espaço.{RESET}")
             except icontract.errors.ViolationError as e: print(f"{RED}Erro de contrato ao remover: {e}{RESET}")
 
@@ -65,10 +65,95 @@ def run():
             print(f"{CYAN}", end=""); b_tree.print_tree(); print(f"{RESET}", end="")
 
         elif opcao == '5':
+            for linha in format_snapshot(b_tree.stats.snapshot()): print(f"{CYAN}{linha}{RESET}")
+
+        elif opcao == '6':
             print(f"{BOLD}{BLUE}Saindo...{RESET}"); break
             
         else:
             print(f"{RED}Opção inválida. Tente novamente.{RESET}")
 
+def _search_flags(b_tree: BTree, chaves: List[int]) -> List[bool]:
+    """Verifica a presença das chaves; lotes grandes usam `search_many` quando o NumPy está disponível."""
+    if len(chaves) >= 256:
+        try: return b_tree.search_many(chaves).tolist()
+        except ImportError: pass
+    return [chave in b_tree for chave in chaves]
+
+def _flush(b_tree: BTree, op: str, pendentes: List[List[int]], saida: IO[str]):
+    """Aplica em um único lote as linhas pendentes de mesma operação e escreve uma linha de resultado por linha."""
+    chaves = [chave for linha in pendentes for chave in linha]
+    if op == "s": flags = _search_flags(b_tree, chaves)
+    else: flags = [ok for _, ok in (b_tree.insert_many(chaves) if op == "i" else b_tree.delete_many(chaves))]
+    linhas, inicio = [], 0
+    for linha in pendentes:
+        linhas.append(" ".join([op, *("1" if ok else "0" for ok in flags[inicio:inicio + len(linha)])]))
+        inicio += len(linha)
+    saida.write("\n".join(linhas) + "\n")
+
+def run_stream(b_tree: BTree, entrada: Iterable[str], saida: IO[str], chunk: int = 10000) -> int:
+    """
+    Executa as operações lidas de `entrada` e escreve uma linha de resultado por operação.
+
+    Formato de entrada (uma operação por linha; linhas vazias e iniciadas por `#` são ignoradas):
+        i K1 K2 ...   insere as chaves         -> i F1 F2 ... (1 = inserida, 0 = já existia)
+        d K1 K2 ...   remove as chaves         -> d F1 F2 ... (1 = removida, 0 = não existia)
+        s K1 K2 ...   busca as chaves          -> s F1 F2 ... (1 = encontrada)
+        r LO HI       chaves em [LO, HI]       -> r K1 K2 ...
+        c LO HI       quantidade em [LO, HI]   -> c N
+    Linhas inválidas produzem `e NÚMERO_DA_LINHA MENSAGEM`. Linhas consecutivas de `i`, `d`
+    ou `s` são acumuladas e aplicadas em lotes de até `chunk` chaves. Retorna o número de
+    operações executadas (chaves em `i`/`d`/`s` e consultas `r`/`c`).
+    """
+    op_pendente, pendentes, tamanho, total = None, [], 0, 0
+    for numero, linha in enumerate(entrada, 1):
+        partes = linha.split()
+        if not partes or partes[0].startswith("#"): continue
+        op = partes[0]
+        try:
+            valores = [int(p) for p in partes[1:]]
+            if op not in ("i", "d", "s", "r", "c"): raise ValueError(f"operação desconhecida '{op}'")
+            if op in ("r", "c") and len(valores) != 2: raise ValueError(f"'{op}' espera LO HI")
+        except ValueError as e:
+            if pendentes: _flush(b_tree, op_pendente, pendentes, saida)
+            op_pendente, pendentes, tamanho = None, [], 0
+            saida.write(f"e {numero} {e}\n")
+            continue
+        if pendentes and (op != op_pendente or tamanho >= chunk):
+            _flush(b_tree, op_pendente, pendentes, saida)
+            pendentes, tamanho = [], 0
+        if op in ("i", "d", "s"):
+            op_pendente = op
+            pendentes.append(valores)
+            tamanho += len(valores)
+            total += len(valores)
+            continue
+        op_pendente, total = None, total + 1
+        if op == "r": saida.write(" ".join(["r", *map(str, b_tree.range(*valores))]) + "\n")
+        else: saida.write(f"c {b_tree.count_range(*valores)}\n")
+    if pendentes: _flush(b_tree, op_pendente, pendentes, saida)
+    return total
+
+def main(argv: Optional[List[str]] = None):
+    """Sem argumentos, abre o menu interativo; com `--batch`, executa as operações de um arquivo ou da entrada padrão."""
+    parser = argparse.ArgumentParser(description="Demonstração da Árvore-B com Design by Contracts.")
+    parser.add_argument("--batch", nargs="?", const="-", metavar="ARQUIVO",
+                        help="executa as operações do arquivo (ou da entrada padrão, com '-' ou sem valor) sem menu")
+    parser.add_argument("-t", type=int, default=32, help="ordem da árvore no modo batch (padrão: 32)")
+    parser.add_argument("--chunk", type=int, default=10000, help="chaves por lote no modo batch (padrão: 10000)")
+    parser.add_argument("--check-mode", choices=[m.value for m in CheckMode], default="off",
+                        help="modo de verificação dos contratos no modo batch (padrão: off)")
+    args = parser.parse_args(argv)
+    if args.batch is None: return run()
+
+    b_tree = BTree(t=args.t, check_mode=args.check_mode)
+    entrada = sys.stdin if args.batch == "-" else open(args.batch, encoding="utf-8")
+    inicio = time.perf_counter()
+    try: total = run_stream(b_tree, entrada, sys.stdout, args.chunk)
+    finally:
+        if entrada is not sys.stdin: entrada.close()
+    decorrido = time.perf_counter() - inicio
+    print(f"{total} operações em {decorrido:.3f} s ({total / decorrido if decorrido else 0:.0f} op/s)", file=sys.stderr)
+
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    main()
\ No newline at end of file
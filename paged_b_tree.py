@@ -0,0 +1,312 @@
+import mmap
+import os
+import struct
+import weakref
+from array import array
+from collections import OrderedDict
+from typing import List, Optional
+from b_tree import BTree
+from b_tree_io import _from_le, _to_le
+from contracts_helpers import CheckMode
+
+_MAGIC = b"BTREEPG1"
+_FILE_HEADER = struct.Struct("<8sIIqqq")  # magic, t, page_size, raiz, páginas, início da lista livre
+_FILE_HEADER_SIZE = 64
+_PAGE_HEADER = struct.Struct("<BxxxIq")   # folha, número de chaves, tamanho da subárvore
+_MIN_POOL_PAGES = 8
+_INITIAL_PAGES = 64
+
+class _Frame:
+    """O conteúdo decodificado de uma página mantido no buffer pool."""
+    __slots__ = ("leaf", "keys", "children", "size")
+
+    def __init__(self, leaf: bool, keys: array, children: list, size: int):
+        self.leaf, self.keys, self.children, self.size = leaf, keys, children, size
+
+class PageFile:
+    """
+    Arquivo de páginas de tamanho fixo acessado por `mmap`.
+
+    O arquivo começa com um cabeçalho de 64 bytes; a página `p` (numerada a
+    partir de 1, com 0 como referência nula) ocupa `page_size` bytes a partir de
+    `64 + (p - 1) * page_size`. Cada página guarda o cabeçalho do nó, até 2t-1
+    chaves e até 2t identificadores de páginas filhas, todos em int64
+    little-endian. Páginas liberadas formam uma lista encadeada reaproveitada
+    pelas próximas alocações.
+
+    Atributos:
+        t (int): A ordem da árvore armazenada.
+        page_size (int): O tamanho de cada página em bytes.
+        root_id (int): A página da raiz, ou 0 se o arquivo ainda não tem árvore.
+    """
+    def __init__(self, path: str, t: Optional[int] = None):
+        """Abre o arquivo em `path`, criando-o se não existir ou estiver vazio."""
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self._fp = open(path, "r+b" if exists else "w+b")
+        if exists:
+            self._mm = mmap.mmap(self._fp.fileno(), 0)
+            magic, file_t, self.page_size, self.root_id, self._page_count, self._free_head = _FILE_HEADER.unpack_from(self._mm, 0)
+            if magic != _MAGIC: raise ValueError(f"O arquivo '{path}' não é um arquivo de páginas de Árvore-B.")
+            if t is not None and t != file_t: raise ValueError(f"O arquivo foi criado com t={file_t}, não t={t}.")
+            self.t = file_t
+        else:
+            if t is None: raise ValueError("A ordem 't' é obrigatória para criar um novo arquivo de páginas.")
+            self.t, self.page_size = t, _PAGE_HEADER.size + 8 * (2 * t - 1) + 8 * 2 * t
+            self.root_id, self._page_count, self._free_head = 0, 0, 0
+            self._fp.truncate(_FILE_HEADER_SIZE + _INITIAL_PAGES * self.page_size)
+            self._mm = mmap.mmap(self._fp.fileno(), 0)
+            self.write_header()
+        self._children_offset = _PAGE_HEADER.size + 8 * (2 * self.t - 1)
+
+    def _offset(self, page_id: int) -> int:
+        return _FILE_HEADER_SIZE + (page_id - 1) * self.page_size
+
+    def allocate(self) -> int:
+        """Reserva uma página, reaproveitando a lista de páginas livres quando possível."""
+        if self._free_head:
+            page_id = self._free_head
+            self._free_head = struct.unpack_from("<q", self._mm, self._offset(page_id))[0]
+            return page_id
+        self._page_count += 1
+        needed = _FILE_HEADER_SIZE + self._page_count * self.page_size
+        if needed > len(self._mm):
+            new_size = max(needed, 2 * len(self._mm))
+            self._mm.close()
+            self._fp.truncate(new_size)
+            self._mm = mmap.mmap(self._fp.fileno(), 0)
+        return self._page_count
+
+    def free(self, page_id: int):
+        """Devolve a página à lista de páginas livres."""
+        struct.pack_into("<q", self._mm, self._offset(page_id), self._free_head)
+        self._free_head = page_id
+
+    def read(self, page_id: int):
+        """Lê a página e retorna (folha, chaves, ids dos filhos, tamanho da subárvore)."""
+        offset = self._offset(page_id)
+        leaf, n, size = _PAGE_HEADER.unpack_from(self._mm, offset)
+        start = offset + _PAGE_HEADER.size
+        keys = _from_le(self._mm[start:start + 8 * n])
+        if leaf: return True, keys, [], size
+        start = offset + self._children_offset
+        return False, keys, _from_le(self._mm[start:start + 8 * (n + 1)]).tolist(), size
+
+    def encode(self, frame: _Frame) -> bytes:
+        """Serializa o conteúdo de um nó no formato de página."""
+        n = len(frame.keys)
+        if n > 2 * self.t - 1: raise ValueError("O nó excede a capacidade de uma página.")
+        page = bytearray(self.page_size)
+        _PAGE_HEADER.pack_into(page, 0, frame.leaf, n, frame.size)
+        page[_PAGE_HEADER.size:_PAGE_HEADER.size + 8 * n] = _to_le(frame.keys)
+        if not frame.leaf:
+            ids = array("q", (child.page_id for child in frame.children))
+            page[self._children_offset:self._children_offset + 8 * len(ids)] = _to_le(ids)
+        return bytes(page)
+
+    def raw(self, page_id: int) -> bytes:
+        """Retorna os bytes da página como estão no arquivo."""
+        offset = self._offset(page_id)
+        return self._mm[offset:offset + self.page_size]
+
+    def write(self, page_id: int, data: bytes):
+        """Grava os bytes da página no arquivo mapeado."""
+        offset = self._offset(page_id)
+        self._mm[offset:offset + self.page_size] = data
+
+    def write_header(self):
+        """Grava o cabeçalho com a raiz, o número de páginas e a lista de páginas livres."""
+        _FILE_HEADER.pack_into(self._mm, 0, _MAGIC, self.t, self.page_size, self.root_id, self._page_count, self._free_head)
+
+    def flush(self):
+        """Grava o cabeçalho e sincroniza o mapeamento com o disco."""
+        self.write_header()
+        self._mm.flush()
+
+    def close(self):
+        """Sincroniza e fecha o arquivo."""
+        if self._mm.closed: return
+        self.flush()
+        self._mm.close()
+        self._fp.close()
+
+class PagedNode:
+    """
+    Referência a um nó armazenado em uma página.
+
+    Expõe `leaf`, `keys`, `children` e `size` como um `BTreeNode`, buscando o
+    conteúdo no buffer pool a cada acesso, de modo que os algoritmos da
+    `BTree` rodam sem alterações. O pool mantém uma única referência viva por
+    página, o que preserva comparações de identidade entre nós.
+
+    Atributos:
+        page_id (int): A página onde o nó está armazenado.
+    """
+    __slots__ = ("_pool", "page_id", "__weakref__")
+
+    def __init__(self, pool: "BufferPool", page_id: int):
+        """Cria a referência para a página `page_id` do pool."""
+        self._pool, self.page_id = pool, page_id
+
+    @property
+    def leaf(self) -> bool:
+        return self._pool.frame(self.page_id).leaf
+
+    @leaf.setter
+    def leaf(self, value: bool):
+        self._pool.frame(self.page_id).leaf = value
+
+    @property
+    def keys(self) -> array:
+        return self._pool.frame(self.page_id).keys
+
+    @keys.setter
+    def keys(self, value):
+        self._pool.frame(self.page_id).keys = value if isinstance(value, array) else array("q", value)
+
+    @property
+    def children(self) -> List["PagedNode"]:
+        return self._pool.frame(self.page_id).children
+
+    @children.setter
+    def children(self, value):
+        self._pool.frame(self.page_id).children = list(value)
+
+    @property
+    def size(self) -> int:
+        return self._pool.frame(self.page_id).size
+
+    @size.setter
+    def size(self, value: int):
+        self._pool.frame(self.page_id).size = value
+
+class BufferPool:
+    """
+    Buffer pool com capacidade limitada e evicção LRU sobre um `PageFile`.
+
+    Como os algoritmos da árvore alteram as listas de chaves e filhos no
+    próprio lugar, uma página é considerada suja quando a sua serialização
+    difere da imagem no arquivo; essa comparação é feita na evicção e em
+    `flush`, e só páginas alteradas são gravadas. Nós consultados a cada
+    operação, como a raiz e os níveis superiores, permanecem no pool.
+
+    Atributos:
+        capacity (int): O número máximo de páginas mantidas em memória.
+        hits, misses, evictions, writes (int): Contadores de uso do pool.
+    """
+    def __init__(self, page_file: PageFile, capacity: int):
+        """Cria o pool sobre `page_file` com no máximo `capacity` páginas."""
+        if capacity < _MIN_POOL_PAGES: raise ValueError(f"O buffer pool deve ter ao menos {_MIN_POOL_PAGES} páginas.")
+        self.file, self.capacity = page_file, capacity
+        self._frames: "OrderedDict[int, _Frame]" = OrderedDict()
+        self._nodes: "weakref.WeakValueDictionary[int, PagedNode]" = weakref.WeakValueDictionary()
+        self.hits = self.misses = self.evictions = self.writes = 0
+
+    def node(self, page_id: int) -> PagedNode:
+        """Retorna a referência única para a página `page_id`."""
+        node = self._nodes.get(page_id)
+        if node is None:
+            node = PagedNode(self, page_id)
+            self._nodes[page_id] = node
+        return node
+
+    def frame(self, page_id: int) -> _Frame:
+        """Retorna o conteúdo da página, lendo-o do arquivo se não estiver no pool."""
+        frame = self._frames.get(page_id)
+        if frame is not None:
+            self._frames.move_to_end(page_id)
+            self.hits += 1
+            return frame
+        self.misses += 1
+        leaf, keys, child_ids, size = self.file.read(page_id)
+        return self._admit(page_id, _Frame(leaf, keys, [self.node(c) for c in child_ids], size))
+
+    def allocate(self, leaf: bool) -> PagedNode:
+        """Reserva uma página para um novo nó vazio."""
+        page_id = self.file.allocate()
+        self._admit(page_id, _Frame(leaf, array("q"), [], 0))
+        return self.node(page_id)
+
+    def free(self, node: PagedNode):
+        """Descarta o nó e devolve sua página ao arquivo."""
+        self._frames.pop(node.page_id, None)
+        self.file.free(node.page_id)
+
+    def flush(self):
+        """Grava todas as páginas alteradas mantendo-as no pool."""
+        for page_id, frame in self._frames.items(): self._write_back(page_id, frame)
+
+    def _admit(self, page_id: int, frame: _Frame) -> _Frame:
+        self._frames[page_id] = frame
+        while len(self._frames) > self.capacity:
+            evicted_id, evicted = self._frames.popitem(last=False)
+            self._write_back(evicted_id, evicted)
+            self.evictions += 1
+        return frame
+
+    def _write_back(self, page_id: int, frame: _Frame):
+        data = self.file.encode(frame)
+        if data != self.file.raw(page_id):
+            self.file.write(page_id, data)
+            self.writes += 1
+
+class PagedBTree(BTree):
+    """
+    Árvore-B cujos nós são páginas de tamanho fixo em um arquivo.
+
+    Busca, inserção e remoção são os algoritmos da `BTree`; apenas a criação e
+    a liberação de nós passam pelo buffer pool. A árvore persiste entre
+    execuções: abrir o mesmo arquivo recupera a raiz gravada em `flush` ou
+    `close`. Como a verificação completa de contratos leria o arquivo inteiro,
+    o modo padrão é `CheckMode.CHEAP`. `snapshot`, `split`, `join` e as operações
+    de conjunto não são suportados: as páginas liberadas são reaproveitadas no
+    lugar.
+
+    Atributos:
+        pool (BufferPool): O buffer pool que mantém as páginas em memória.
+    """
+    def __init__(self, t: int, path: str, pool_pages: int = 1024, check_mode: CheckMode = CheckMode.CHEAP,
+                 sample_every: int = 100, stats: bool = False):
+        """Abre (ou cria) a árvore de ordem `t` no arquivo `path`."""
+        self._page_file = PageFile(path, t)
+        self.pool = BufferPool(self._page_file, pool_pages)
+        super().__init__(t, check_mode=check_mode, sample_every=sample_every, stats=stats)
+        if self._page_file.root_id:
+            self.pool.free(self.root)
+            self.root = self.pool.node(self._page_file.root_id)
+
+    @classmethod
+    def open(cls, path: str, **kwargs) -> "PagedBTree":
+        """Abre uma árvore existente, lendo a ordem `t` do cabeçalho do arquivo."""
+        page_file = PageFile(path)
+        t = page_file.t
+        page_file.close()
+        return cls(t, path, **kwargs)
+
+    def snapshot(self):
+        raise NotImplementedError("Snapshots de leitura não são suportados pela PagedBTree.")
+
+    def _empty_like(self, cls=None):
+        raise NotImplementedError("Divisão, junção e operações de conjunto não são suportadas pela PagedBTree.")
+
+    def _new_node(self, leaf: bool = False) -> PagedNode:
+        return self.pool.allocate(leaf)
+
+    def _release_node(self, node: PagedNode):
+        self.pool.free(node)
+
+    def flush(self):
+        """Grava as páginas alteradas e o cabeçalho com a raiz atual."""
+        self.pool.flush()
+        self._page_file.root_id = self.root.page_id
+        self._page_file.flush()
+
+    def close(self):
+        """Grava tudo e fecha o arquivo."""
+        self.flush()
+        self._page_file.close()
+
+    def __enter__(self) -> "PagedBTree":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
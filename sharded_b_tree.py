@@ -0,0 +1,171 @@
+import os
+import random
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+from b_tree import BTree
+from b_tree_node import BTreeNode
+from contracts_helpers import CheckMode
+
+def _build_shard(data: bytes, t: int, kwargs: dict) -> bytes:
+    """Constrói, em um processo de trabalho, a árvore de uma partição e retorna seu snapshot."""
+    keys = array("q")
+    keys.frombytes(data)
+    return BTree.bulk_load(keys, t, **{**kwargs, "check_mode": CheckMode.OFF}).to_bytes()
+
+def _partition(keys: Union[List[int], array], bounds: List[int]) -> List[bytes]:
+    """
+    Separa as chaves pelos limites e retorna os bytes (`array("q")`) de cada partição.
+
+    Com numpy, as chaves são ordenadas e cortadas nos limites em C, e as
+    partições já chegam ordenadas aos processos de trabalho; sem numpy, cada
+    chave é encaminhada em Python.
+    """
+    try: import numpy as np
+    except ImportError:
+        parts = [array("q") for _ in range(len(bounds) + 1)]
+        for k in keys: parts[bisect_right(bounds, k)].append(k)
+        return [part.tobytes() for part in parts]
+    ordered = np.sort(np.asarray(keys, dtype=np.int64))
+    return [part.tobytes() for part in np.split(ordered, np.searchsorted(ordered, bounds))]
+
+def _map_snapshot(fn: Callable[[BTree], Any], data: bytes) -> Any:
+    """Recarrega, em um processo de trabalho, a árvore de uma partição e aplica `fn` a ela."""
+    return fn(BTree.from_bytes(data, check_mode=CheckMode.OFF))
+
+class ShardedBTree:
+    """
+    Uma coleção de Árvores-B que particiona o espaço de chaves por intervalos.
+
+    A partição `i` guarda as chaves `k` com `bounds[i-1] <= k < bounds[i]`. Cada
+    operação é encaminhada à partição da chave, e iteração, intervalos e
+    estatísticas de ordem combinam as partições em ordem. `build` constrói as
+    partições em paralelo em um `ProcessPoolExecutor`; as árvores voltam ao
+    processo principal como snapshots binários, que são recarregados sem
+    reinserir as chaves. `map_shards` faz o mesmo no sentido inverso para
+    varreduras completas. As chaves devem caber em um inteiro de 64 bits.
+
+    Atributos:
+        t (int): A ordem das árvores das partições.
+        bounds (list[int]): As chaves que separam partições consecutivas.
+        shards (list[BTree]): As árvores das partições, em ordem de chave.
+    """
+    def __init__(self, t: int, bounds: Iterable[int] = (), **kwargs):
+        """Cria partições vazias separadas por `bounds`; `kwargs` vão para cada `BTree`."""
+        self.t, self.bounds = t, list(bounds)
+        if any(a >= b for a, b in zip(self.bounds, self.bounds[1:])):
+            raise ValueError("Os limites das partições devem estar em ordem estritamente crescente.")
+        self._tree_kwargs = kwargs
+        self.shards: List[BTree] = [BTree(t, **kwargs) for _ in range(len(self.bounds) + 1)]
+
+    @classmethod
+    def build(cls, keys: Iterable[int], t: int, shards: Optional[int] = None, workers: Optional[int] = None,
+              **kwargs) -> "ShardedBTree":
+        """
+        Constrói as partições a partir de chaves em qualquer ordem, com repetições.
+
+        Os limites são quantis de uma amostra das chaves, para que as partições
+        fiquem com tamanhos parecidos. As chaves são separadas no processo atual
+        (em C, se numpy estiver instalado) e cada partição é carregada por um
+        processo de `workers` (padrão: o número de núcleos); com `workers=0` tudo
+        roda no processo atual.
+        """
+        keys = keys if isinstance(keys, (list, array)) else list(keys)
+        shards = shards or os.cpu_count() or 1
+        if shards < 1: raise ValueError("O número de partições deve ser no mínimo 1.")
+        sample = sorted(set(random.Random(0).sample(keys, min(len(keys), 64 * shards))))
+        bounds = sorted({sample[len(sample) * i // shards] for i in range(1, shards)}) if sample else []
+        tree = cls(t, bounds, **kwargs)
+        payloads = _partition(keys, bounds)
+        if workers == 0:
+            tree.shards = [BTree.from_bytes(_build_shard(data, t, kwargs), **kwargs) for data in payloads]
+            return tree
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Cada snapshot é recarregado assim que chega, enquanto as partições seguintes
+            # ainda estão sendo construídas.
+            snapshots = pool.map(_build_shard, payloads, [t] * len(payloads), [kwargs] * len(payloads))
+            tree.shards = [BTree.from_bytes(data, **kwargs) for data in snapshots]
+        return tree
+
+    def to_tree(self, fill_factor: float = 1.0) -> BTree:
+        """Junta as partições em uma única `BTree`, em uma passada sobre as chaves em ordem."""
+        return BTree.from_sorted(iter(self), self.t, fill_factor, **self._tree_kwargs)
+
+    def map_shards(self, fn: Callable[[BTree], Any], workers: Optional[int] = None) -> List[Any]:
+        """
+        Aplica `fn` a cada partição em processos separados e retorna os resultados em ordem.
+
+        Cada partição é enviada como snapshot e recarregada no processo de trabalho,
+        então `fn` deve poder ser serializada (uma função de módulo, por exemplo) e
+        alterações feitas por ela não voltam para esta árvore. Com `workers=0`,
+        `fn` é aplicada no processo atual.
+        """
+        if workers == 0: return [fn(shard) for shard in self.shards]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_map_snapshot, [fn] * len(self.shards), [s.to_bytes() for s in self.shards]))
+
+    def shard_for(self, k: int) -> BTree:
+        """Retorna a partição responsável pela chave `k`."""
+        return self.shards[bisect_right(self.bounds, k)]
+
+    def insert(self, k: int):
+        self.shard_for(k).insert(k)
+
+    def delete(self, k: int):
+        self.shard_for(k).delete(k)
+
+    def insert_many(self, keys: Iterable[int]) -> List[Tuple[int, bool]]:
+        return self._route_batch(keys, BTree.insert_many)
+
+    def delete_many(self, keys: Iterable[int]) -> List[Tuple[int, bool]]:
+        return self._route_batch(keys, BTree.delete_many)
+
+    def search(self, k: int) -> Optional[Tuple[BTreeNode, int]]:
+        return self.shard_for(k).search(k)
+
+    def __contains__(self, k: int) -> bool:
+        return k in self.shard_for(k)
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self.shards)
+
+    def __iter__(self) -> Iterator[int]:
+        return chain.from_iterable(self.shards)
+
+    def __reversed__(self) -> Iterator[int]:
+        return chain.from_iterable(reversed(shard) for shard in reversed(self.shards))
+
+    def range(self, lo: Optional[int] = None, hi: Optional[int] = None,
+              inclusive: Union[bool, Tuple[bool, bool]] = (True, True)) -> Iterator[int]:
+        return chain.from_iterable(self.shards[i].range(lo, hi, inclusive) for i in self._shards_between(lo, hi))
+
+    def count_range(self, lo: Optional[int] = None, hi: Optional[int] = None,
+                    inclusive: Union[bool, Tuple[bool, bool]] = (True, True)) -> int:
+        return sum(self.shards[i].count_range(lo, hi, inclusive) for i in self._shards_between(lo, hi))
+
+    def rank(self, k: int) -> int:
+        i = bisect_right(self.bounds, k)
+        return sum(len(shard) for shard in self.shards[:i]) + self.shards[i].rank(k)
+
+    def select(self, i: int) -> int:
+        n = len(self)
+        if i < 0: i += n
+        if not 0 <= i < n: raise IndexError("Índice fora do intervalo da árvore.")
+        for shard in self.shards:
+            if i < len(shard): return shard.select(i)
+            i -= len(shard)
+
+    def _shards_between(self, lo: Optional[int], hi: Optional[int]) -> range:
+        first = 0 if lo is None else bisect_right(self.bounds, lo)
+        last = len(self.bounds) if hi is None else bisect_right(self.bounds, hi)
+        return range(first, last + 1)
+
+    # Agrupa o lote por partição e devolve os resultados na ordem da entrada.
+    def _route_batch(self, keys: Iterable[int], operation) -> List[Tuple[int, bool]]:
+        keys = list(keys)
+        groups: List[List[int]] = [[] for _ in self.shards]
+        for k in keys: groups[bisect_right(self.bounds, k)].append(k)
+        outcomes = [iter(operation(shard, group)) if group else iter(()) for shard, group in zip(self.shards, groups)]
+        return [next(outcomes[bisect_right(self.bounds, k)]) for k in keys]
@@ -1,8 +1,12 @@
 
 
+import random
+from array import array
 import pytest
 import icontract
 from b_tree import BTree
+from b_tree_node import BTreeNode, CompactBTreeNode, PrefixBTreeNode, PrefixKeys
+from contracts_helpers import CheckMode, _check_subtree
 
 @pytest.fixture
 def arvore_t2() -> BTree:
@@ -195,4 +199,626 @@ class TestBTreeContracts:
         
         assert not arvore_t3.root.keys
         assert arvore_t3.root.leaf
-        assert arvore_t3.get_height() == 0
\ No newline at end of file
+        assert arvore_t3.get_height() == 0
+
+class TestBTreeModosVerificacao:
+    """Agrupa os testes dos modos de verificação de contratos."""
+
+    def test_modo_invalido_e_amostragem_invalida(self):
+        """Caso: EXCEÇÃO. Modo desconhecido ou intervalo de amostragem menor que 1."""
+        with pytest.raises(ValueError):
+            BTree(t=3, check_mode="rapido")
+        with pytest.raises(ValueError, match="intervalo de amostragem"):
+            BTree(t=3, check_mode=CheckMode.SAMPLED, sample_every=0)
+
+    def test_modo_off_nao_verifica_invariantes(self):
+        """Caso: SUCESSO. Com os contratos desligados, a corrupção manual não é detectada."""
+        arvore = BTree(t=3, check_mode="off")
+        list(map(arvore.insert, [10, 20]))
+        arvore.root.keys = [20, 10]
+        arvore.search(10)
+
+    def test_modo_off_mantem_precondicoes(self):
+        """Caso: EXCEÇÃO. As pré-condições de busca continuam valendo no modo off."""
+        arvore = BTree(t=3, check_mode=CheckMode.OFF)
+        arvore.insert(10)
+        with pytest.raises(icontract.errors.ViolationError, match="A chave a ser inserida não deve existir"):
+            arvore.insert(10)
+
+    def test_modo_amostrado_verifica_a_cada_n_operacoes(self):
+        """Caso: EXCEÇÃO somente na N-ésima operação após a corrupção."""
+        arvore = BTree(t=3, check_mode=CheckMode.SAMPLED, sample_every=4)
+        list(map(arvore.insert, [10, 20]))
+        arvore.root.keys = [20, 10]
+        arvore.search(10)
+        with pytest.raises(icontract.errors.ViolationError, match="Verifica as invariantes"):
+            arvore.search(10)
+
+    def test_modo_barato_detecta_corrupcao_no_caminho_tocado(self):
+        """Caso: EXCEÇÃO. O caminho da chave inserida é validado após a operação."""
+        arvore = BTree(t=2, check_mode=CheckMode.CHEAP)
+        list(map(arvore.insert, range(1, 21)))
+        folha = arvore.root
+        while not folha.leaf: folha = folha.children[-1]
+        folha.keys.append(-1)
+        arvore.search(5)
+        with pytest.raises(icontract.errors.ViolationError, match="Verifica as invariantes"):
+            arvore.insert(100)
+
+    def test_modo_barato_operacoes_validas(self):
+        """Caso: SUCESSO. Sequência mista de operações válidas no modo barato."""
+        arvore = BTree(t=2, check_mode=CheckMode.CHEAP)
+        chaves = [(i * 37) % 101 for i in range(1, 101)]
+        list(map(arvore.insert, chaves))
+        list(map(arvore.delete, chaves[::2]))
+        assert _check_subtree(arvore.root, arvore.t)
+
+    @pytest.mark.parametrize("vizinho", ["_get_predecessor", "_get_successor"])
+    def test_modo_barato_verifica_caminho_do_substituto(self, monkeypatch, vizinho: str):
+        """
+        Caso: EXCEÇÃO. Ao remover uma chave de um nó interno, a folha de onde sai o
+              substituto (predecessor ou sucessor) também é verificada no modo barato.
+        """
+        arvore = BTree.from_sorted(range(100), t=3, check_mode=CheckMode.CHEAP)
+        if vizinho == "_get_successor":
+            # Com o filho da esquerda no mínimo, a remoção da separadora usa o sucessor.
+            while len(arvore.root.children[0].keys) >= arvore.t: arvore.delete(arvore.select(0))
+        lado, buscar = (-1 if vizinho == "_get_predecessor" else 0), getattr(BTree, vizinho)
+
+        def corromper(x):
+            folha = x
+            while not folha.leaf: folha = folha.children[lado]
+            folha.keys.reverse()
+            return buscar(arvore, x)
+
+        monkeypatch.setattr(arvore, vizinho, corromper)
+        with pytest.raises(icontract.errors.ViolationError, match="Verifica as invariantes"):
+            arvore.delete(arvore.root.keys[0])
+
+    def test_validador_completo_carrega_limites_dos_ancestrais(self):
+        """
+        Caso: EXCEÇÃO. Uma chave ordenada dentro da sua folha, mas fora do
+              intervalo definido por um separador da raiz, é detectada.
+        """
+        arvore = BTree(t=2)
+        list(map(arvore.insert, range(1, 31)))
+        folha = arvore.root
+        while not folha.leaf: folha = folha.children[0]
+        folha.keys[-1] = arvore.root.keys[0] + 0.5
+        assert not _check_subtree(arvore.root, arvore.t)
+
+
+class TestBTreeOrdensGrandes:
+    """Testes de corretude da busca binária dentro dos nós em ordens variadas."""
+
+    @pytest.mark.parametrize("t", [2, 5, 64])
+    def test_operacoes_aleatorias_equivalem_a_um_conjunto(self, t: int):
+        """Caso: SUCESSO. Inserções e remoções aleatórias mantêm o mesmo conteúdo de um `set`."""
+        rng = random.Random(t)
+        arvore, esperado = BTree(t=t, check_mode=CheckMode.CHEAP), set()
+        for _ in range(1500):
+            k = rng.randrange(500)
+            if k in esperado:
+                arvore.delete(k)
+                esperado.discard(k)
+            else:
+                arvore.insert(k)
+                esperado.add(k)
+        assert _check_subtree(arvore.root, arvore.t)
+        assert all((arvore.search(k) is not None) == (k in esperado) for k in range(500))
+
+
+class TestBTreeCargaEmLote:
+    """Testes da construção de baixo para cima a partir de chaves ordenadas."""
+
+    @pytest.mark.parametrize("t", [2, 3, 8])
+    @pytest.mark.parametrize("fill_factor", [0.5, 0.75, 1.0])
+    def test_from_sorted_respeita_invariantes(self, t: int, fill_factor: float):
+        """Caso: SUCESSO. Para vários tamanhos, a árvore construída é válida e contém todas as chaves."""
+        for n in [0, 1, 2 * t - 1, 2 * t, 97, 1000]:
+            arvore = BTree.from_sorted(range(n), t, fill_factor)
+            assert _check_subtree(arvore.root, arvore.t)
+            assert list(arvore) == list(range(n))
+
+    def test_from_sorted_aceita_iteravel_e_segue_operando(self):
+        """Caso: SUCESSO. A árvore carregada de um gerador aceita inserções e remoções com contratos ativos."""
+        arvore = BTree.from_sorted((k * 2 for k in range(200)), t=3)
+        arvore.insert(101)
+        arvore.delete(100)
+        assert arvore.search(101) is not None and arvore.search(100) is None
+
+    def test_bulk_load_ordena_e_remove_duplicatas(self):
+        """Caso: SUCESSO. Entrada desordenada e com repetições é ordenada antes da construção."""
+        arvore = BTree.bulk_load([5, 3, 9, 3, 1, 9, 7], t=2)
+        assert list(arvore) == [1, 3, 5, 7, 9]
+        assert _check_subtree(arvore.root, arvore.t)
+
+    def test_from_sorted_excecao_entrada_desordenada(self):
+        """Caso: EXCEÇÃO. Chaves fora de ordem ou repetidas são rejeitadas."""
+        with pytest.raises(ValueError, match="estritamente crescente"):
+            BTree.from_sorted([1, 2, 2, 3], t=2)
+        with pytest.raises(ValueError, match="fator de preenchimento"):
+            BTree.from_sorted([1, 2, 3], t=2, fill_factor=0)
+
+
+class TestBTreeOperacoesEmLote:
+    """Testes de `insert_many` e `delete_many`."""
+
+    def test_insert_many_ignora_duplicatas_e_informa_resultado(self, arvore_t2: BTree):
+        """Caso: SUCESSO. Chaves já existentes e repetidas no lote são ignoradas sem exceção."""
+        arvore_t2.insert(5)
+        resultado = arvore_t2.insert_many([9, 5, 1, 9, 3])
+        assert resultado == [(9, True), (5, False), (1, True), (9, False), (3, True)]
+        assert list(arvore_t2) == [1, 3, 5, 9]
+
+    def test_delete_many_ignora_chaves_inexistentes(self, arvore_t3: BTree):
+        """Caso: SUCESSO. Chaves ausentes são reportadas como não removidas."""
+        arvore_t3.insert_many(range(50))
+        resultado = arvore_t3.delete_many([10, 99, 10, 0])
+        assert resultado == [(10, True), (99, False), (10, False), (0, True)]
+        assert arvore_t3.search(10) is None and arvore_t3.search(11) is not None
+
+    @pytest.mark.parametrize("t", [2, 4])
+    def test_lotes_aleatorios_equivalem_a_um_conjunto(self, t: int):
+        """Caso: SUCESSO. Lotes aleatórios mantêm a árvore válida e com o conteúdo esperado."""
+        rng = random.Random(t)
+        arvore, esperado = BTree(t=t), set()
+        for _ in range(40):
+            lote = [rng.randrange(400) for _ in range(rng.randrange(1, 40))]
+            if rng.random() < 0.6:
+                arvore.insert_many(lote)
+                esperado.update(lote)
+            else:
+                arvore.delete_many(lote)
+                esperado.difference_update(lote)
+        assert list(arvore) == sorted(esperado)
+
+
+class TestBTreeIteracao:
+    """Testes de iteração ordenada, consultas por intervalo e cursores."""
+
+    @pytest.fixture
+    def arvore_grande(self) -> BTree:
+        """Retorna uma árvore de ordem t=2 com as chaves pares de 0 a 198."""
+        return BTree.from_sorted(range(0, 200, 2), t=2)
+
+    def test_iteracao_em_ordem_e_reversa(self, arvore_grande: BTree):
+        """Caso: SUCESSO. A iteração percorre as chaves em ordem crescente e decrescente."""
+        assert list(arvore_grande) == list(range(0, 200, 2))
+        assert list(reversed(arvore_grande)) == list(range(198, -1, -2))
+        assert list(BTree(t=3)) == []
+
+    def test_contains(self, arvore_grande: BTree):
+        """Caso: SUCESSO. O operador `in` usa a busca da árvore."""
+        assert 100 in arvore_grande and 101 not in arvore_grande
+
+    def test_range_com_limites_inclusivos_e_exclusivos(self, arvore_grande: BTree):
+        """Caso: SUCESSO. Os limites podem ser inclusivos, exclusivos ou abertos."""
+        assert list(arvore_grande.range(10, 20)) == [10, 12, 14, 16, 18, 20]
+        assert list(arvore_grande.range(10, 20, inclusive=False)) == [12, 14, 16, 18]
+        assert list(arvore_grande.range(11, 19, inclusive=(True, False))) == [12, 14, 16, 18]
+        assert list(arvore_grande.range(hi=4)) == [0, 2, 4]
+        assert list(arvore_grande.range(lo=195)) == [196, 198]
+        assert list(arvore_grande.range(50, 40)) == []
+
+    def test_range_e_preguicoso(self, arvore_grande: BTree):
+        """Caso: SUCESSO. O intervalo é um gerador consumido sob demanda."""
+        intervalo = arvore_grande.range(0)
+        assert next(intervalo) == 0 and next(intervalo) == 2
+
+    def test_cursor_seek_e_passos_nos_dois_sentidos(self, arvore_grande: BTree):
+        """Caso: SUCESSO. O cursor se posiciona por chave e avança ou recua um passo por vez."""
+        cursor = arvore_grande.cursor().seek(31)
+        assert cursor.key == 32
+        assert cursor.next() and cursor.key == 34
+        assert cursor.prev() and cursor.prev() and cursor.key == 30
+        assert arvore_grande.cursor().seek_last(31).key == 30
+        assert not arvore_grande.cursor().seek(199).valid
+        cursor = arvore_grande.cursor().last()
+        assert list(cursor.backward())[:3] == [198, 196, 194]
+
+
+class TestBTreeEstatisticasDeOrdem:
+    """Testes de `len`, `rank`, `select` e `count_range` baseados nos tamanhos das subárvores."""
+
+    def test_tamanho_acompanha_insercoes_e_remocoes(self, arvore_t2: BTree):
+        """Caso: SUCESSO. `len` reflete divisões, fusões e empréstimos."""
+        list(map(arvore_t2.insert, range(30)))
+        assert len(arvore_t2) == 30
+        list(map(arvore_t2.delete, range(0, 30, 3)))
+        assert len(arvore_t2) == 20
+        arvore_t2.delete_many(range(30))
+        assert len(arvore_t2) == 0
+
+    def test_rank_e_select(self):
+        """Caso: SUCESSO. `rank` conta as chaves menores; `select` devolve a i-ésima menor."""
+        arvore = BTree.from_sorted(range(0, 100, 5), t=2)
+        assert arvore.rank(0) == 0 and arvore.rank(12) == 3 and arvore.rank(15) == 3 and arvore.rank(1000) == 20
+        assert [arvore.select(i) for i in range(20)] == list(range(0, 100, 5))
+        assert arvore.select(-1) == 95
+
+    def test_select_excecao_indice_invalido(self, arvore_t3: BTree):
+        """Caso: EXCEÇÃO. Índices fora do intervalo são rejeitados."""
+        arvore_t3.insert(1)
+        with pytest.raises(IndexError):
+            arvore_t3.select(1)
+
+    def test_count_range(self):
+        """Caso: SUCESSO. A contagem respeita limites inclusivos, exclusivos e abertos."""
+        arvore = BTree.from_sorted(range(0, 100, 5), t=3)
+        assert arvore.count_range(10, 30) == 5
+        assert arvore.count_range(10, 30, inclusive=False) == 3
+        assert arvore.count_range(11, 29) == 3
+        assert arvore.count_range(hi=10) == 3 and arvore.count_range(lo=90) == 2
+        assert arvore.count_range(50, 10) == 0
+
+    def test_invariante_excecao_tamanho_inconsistente(self, arvore_t3: BTree):
+        """Caso: EXCEÇÃO. Um tamanho de subárvore corrompido é detectado pela invariante."""
+        list(map(arvore_t3.insert, [10, 20, 30, 40, 50, 60]))
+        arvore_t3.root.children[0].size += 1
+        with pytest.raises(icontract.errors.ViolationError, match="Verifica as invariantes"):
+            arvore_t3.search(10)
+
+
+class TestBTreeNoCompacto:
+    """Testes da árvore com nós compactos (`CompactBTreeNode`)."""
+
+    def test_operacoes_com_no_compacto(self):
+        """Caso: SUCESSO. Divisões, fusões e empréstimos preservam o array de chaves."""
+        arvore = BTree(t=2, node_class=CompactBTreeNode)
+        arvore.insert_many(range(100))
+        list(map(arvore.delete, range(0, 100, 3)))
+        assert list(arvore) == [k for k in range(100) if k % 3]
+        pilha = [arvore.root]
+        while pilha:
+            no = pilha.pop()
+            assert isinstance(no.keys, array)
+            pilha.extend(no.children)
+
+    def test_carga_em_lote_com_no_compacto(self):
+        """Caso: SUCESSO. A carga em lote cria nós do tipo configurado."""
+        arvore = BTree.from_sorted(range(1000), t=4, fill_factor=0.8, node_class=CompactBTreeNode)
+        assert isinstance(arvore.root, CompactBTreeNode) and len(arvore) == 1000
+
+    def test_no_sem_dicionario_de_atributos(self):
+        """Caso: SUCESSO. Os nós usam `__slots__` e não aceitam atributos arbitrários."""
+        with pytest.raises(AttributeError):
+            BTreeNode().extra = 1
+
+
+class TestBTreeSnapshot:
+    """Testes do formato binário de snapshot (`save`/`load`)."""
+
+    def test_salvar_e_carregar(self, tmp_path):
+        """Caso: SUCESSO. A árvore carregada tem as mesmas chaves, forma e tamanhos."""
+        chaves = random.Random(9).sample(range(100000), 3000)
+        arvore = BTree(t=3, check_mode=CheckMode.OFF)
+        arvore.insert_many(chaves)
+        caminho = str(tmp_path / "arvore.bts")
+        arvore.save(caminho)
+        carregada = BTree.load(caminho)
+        assert list(carregada) == sorted(chaves) and len(carregada) == 3000
+        assert carregada.get_height() == arvore.get_height() and carregada.select(1500) == arvore.select(1500)
+        assert _check_subtree(carregada.root, 3)
+        carregada.insert(-1)
+        carregada.delete(sorted(chaves)[0])
+
+    def test_arvore_vazia_e_no_compacto(self):
+        """Caso: SUCESSO. Árvores vazias e nós compactos fazem o ciclo completo."""
+        assert len(BTree.from_bytes(BTree(t=2).to_bytes())) == 0
+        dados = BTree.from_sorted(range(500), t=4).to_bytes()
+        arvore = BTree.from_bytes(dados, node_class=CompactBTreeNode)
+        assert isinstance(arvore.root.keys, array) and list(arvore) == list(range(500))
+        assert arvore.to_bytes() == dados
+
+    def test_snapshot_corrompido(self):
+        """Caso: EXCEÇÃO. Bytes alterados, truncados ou estranhos são rejeitados."""
+        dados = bytearray(BTree.from_sorted(range(100), t=2).to_bytes())
+        dados[40] ^= 0xFF
+        with pytest.raises(ValueError, match="Checksum"):
+            BTree.from_bytes(bytes(dados))
+        with pytest.raises(ValueError):
+            BTree.from_bytes(bytes(dados[:10]))
+        with pytest.raises(ValueError, match="snapshot"):
+            BTree.from_bytes(b"X" * 64)
+
+
+class TestBTreeEstatisticas:
+    """Testes da instrumentação opcional das operações (`BTreeStats`)."""
+
+    def test_contadores_e_histogramas(self):
+        """Caso: SUCESSO. Divisões, fusões, buscas e contratos são contabilizados."""
+        arvore = BTree(t=2, stats=True)
+        for k in range(20): arvore.insert(k)
+        for k in range(20): arvore.search(k)
+        for k in range(15): arvore.delete(k)
+        snapshot = arvore.stats.snapshot()
+        contadores, operacoes = snapshot["counters"], snapshot["operations"]
+        assert contadores["splits"] > 0 and contadores["root_splits"] > 0 and contadores["merges"] > 0
+        assert contadores["nodes_visited"] >= 20 and contadores["fills"] > 0
+        assert operacoes["insert"]["count"] == 20 and operacoes["delete"]["count"] == 15
+        assert operacoes["search"]["count"] == 20 and sum(operacoes["search"]["histogram_us"].values()) == 20
+        assert snapshot["contracts"]["checks"] > 0
+        arvore.stats.reset()
+        assert arvore.stats.snapshot()["operations"] == {}
+
+    def test_visitas_da_busca(self):
+        """Caso: SUCESSO. Uma busca sem sucesso visita um nó por nível."""
+        arvore = BTree.from_sorted(range(1000), t=2, stats=True)
+        arvore.search(-1)
+        assert arvore.stats.counters["nodes_visited"] == arvore.get_height() + 1
+
+    def test_desativadas_por_padrao(self):
+        """Caso: SUCESSO. Sem `stats=True` não há estatísticas."""
+        assert BTree(t=2).stats is None
+
+
+class TestBTreeInsercaoCrescente:
+    """Testes do caminho rápido para chaves crescentes (borda direita)."""
+
+    @staticmethod
+    def _ocupacao(arvore: BTree) -> float:
+        """Retorna a fração das posições de chave ocupadas nos nós da árvore."""
+        pilha, nos, chaves = [arvore.root], 0, 0
+        while pilha:
+            no = pilha.pop()
+            nos, chaves = nos + 1, chaves + len(no.keys)
+            pilha.extend(no.children)
+        return chaves / (nos * (2 * arvore.t - 1))
+
+    @pytest.mark.parametrize("t", [2, 3, 8])
+    def test_insercao_crescente_enche_os_nos(self, t: int):
+        """Caso: SUCESSO. Inserções crescentes deixam os nós praticamente cheios e a árvore válida."""
+        arvore = BTree(t=t, stats=True)
+        for k in range(1000): arvore.insert(k)
+        assert list(arvore) == list(range(1000)) and len(arvore) == 1000
+        assert self._ocupacao(arvore) > 0.9 and arvore.stats.counters["appends"] > 950
+        assert _check_subtree(arvore.root, t)
+
+    def test_borda_direita_apos_remocoes(self):
+        """Caso: SUCESSO. Fusões e divisões na borda direita não deixam o atalho desatualizado."""
+        arvore, esperado = BTree(t=2), set()
+        rng = random.Random(13)
+        for rodada in range(15):
+            for k in range(rodada * 50, rodada * 50 + 50):
+                arvore.insert(k)
+                esperado.add(k)
+            for k in rng.sample(sorted(esperado), 30):
+                arvore.delete(k)
+                esperado.discard(k)
+        arvore.insert_many(range(5000, 5100))
+        assert list(arvore) == sorted(esperado | set(range(5000, 5100)))
+        assert arvore.rank(5050) == len(esperado) + 50
+
+
+class TestBTreeBuscaEmLote:
+    """Testes da busca vetorizada `search_many` (requer NumPy)."""
+
+    @pytest.mark.parametrize("node_class", [BTreeNode, CompactBTreeNode])
+    def test_mascara_e_posicoes(self, node_class):
+        """Caso: SUCESSO. A máscara e as posições coincidem com `search` e `rank`, na ordem da entrada."""
+        np = pytest.importorskip("numpy")
+        chaves = random.Random(5).sample(range(20000), 3000)
+        arvore = BTree.bulk_load(chaves, t=3, node_class=node_class, check_mode=CheckMode.OFF)
+        consultas = np.random.default_rng(5).integers(-10, 20010, 5000)
+        presentes = set(chaves)
+        esperado = [int(k) in presentes for k in consultas]
+        assert arvore.search_many(consultas).tolist() == esperado
+        posicoes = arvore.search_many(consultas, positions=True).tolist()
+        assert posicoes == [arvore.rank(int(k)) if e else -1 for k, e in zip(consultas, esperado)]
+
+    def test_arvore_vazia_e_lista(self):
+        """Caso: SUCESSO. Aceita listas, consultas repetidas e árvores vazias."""
+        pytest.importorskip("numpy")
+        assert BTree(t=2).search_many([1, 2]).tolist() == [False, False]
+        arvore = BTree.from_sorted(range(10), t=2)
+        assert arvore.search_many([3, 3, 42, 0]).tolist() == [True, True, False, True]
+
+
+class TestBTreeRemocaoPreguicosa:
+    """Testes da remoção preguiçosa (marcas de remoção e compactação)."""
+
+    def test_marcas_sao_invisiveis(self):
+        """Caso: SUCESSO. Chaves marcadas somem de buscas, iteração e estatísticas de ordem antes da compactação."""
+        arvore = BTree.from_sorted(range(100), t=3, lazy_delete=True, compaction_ratio=1.0, stats=True)
+        for k in range(0, 100, 3): arvore.delete(k)
+        vivas = [k for k in range(100) if k % 3]
+        assert arvore.stats.counters["compactions"] == 0 and len(arvore._tombstones) == 100 - len(vivas)
+        assert arvore.root.size == len(vivas) and _check_subtree(arvore.root, 3, arvore._tombstones)
+        assert list(arvore) == vivas and list(reversed(arvore)) == vivas[::-1] and len(arvore) == len(vivas)
+        assert 30 not in arvore and arvore.search(30) is None and list(arvore.range(29, 34)) == [29, 31, 32, 34]
+        assert [arvore.rank(k) for k in (0, 31, 100)] == [0, vivas.index(31), len(vivas)]
+        assert [arvore.select(i) for i in range(len(vivas))] == vivas
+        assert arvore.count_range(10, 20, inclusive=(False, True)) == len([k for k in vivas if 10 < k <= 20])
+        with pytest.raises(icontract.ViolationError): arvore.delete(30)
+        arvore.insert(30)
+        assert 30 in arvore and arvore.rank(31) == vivas.index(31) + 1
+
+    def test_compactacao_automatica(self):
+        """Caso: SUCESSO. Passada a proporção de marcas, elas são removidas fisicamente."""
+        arvore, esperado = BTree(t=2, lazy_delete=True, compaction_ratio=0.25, stats=True), set()
+        rng = random.Random(16)
+        for _ in range(2000):
+            k = rng.randrange(400)
+            if k in esperado: arvore.delete(k); esperado.discard(k)
+            else: arvore.insert(k); esperado.add(k)
+        assert arvore.stats.counters["compactions"] > 0
+        assert len(arvore._tombstones) <= 0.25 * (arvore.root.size + len(arvore._tombstones))
+        assert list(arvore) == sorted(esperado) and _check_subtree(arvore.root, 2, arvore._tombstones)
+        arvore.delete_many(list(esperado)[:10])
+        arvore.compact()
+        assert not arvore._tombstones and arvore.root.size == len(esperado) - 10
+
+    def test_compactacao_em_lote(self):
+        """Caso: SUCESSO. Passado o limite, uma única passada retira todas as marcas, sem alterar snapshots anteriores."""
+        arvore = BTree.from_sorted(range(1000), t=3, lazy_delete=True, compaction_ratio=0.1,
+                                   check_mode=CheckMode.CHEAP, stats=True)
+        leitura = None
+        for n, k in enumerate(random.Random(3).sample(range(1000), 400)):
+            if n == 50: leitura = arvore.snapshot()
+            antes = arvore.stats.counters["compactions"]
+            arvore.delete(k)
+            guardadas = arvore.root.size + len(arvore._tombstones)
+            assert len(arvore._tombstones) <= 0.1 * guardadas
+            if arvore.stats.counters["compactions"] > antes: assert not arvore._tombstones
+        assert 0 < arvore.stats.counters["compactions"] <= 5
+        assert len(arvore) == 600 and _check_subtree(arvore.root, 3, arvore._tombstones)
+        assert [arvore.select(i) for i in range(0, 600, 50)] == list(arvore)[::50]
+        assert len(leitura) == 950 and _check_subtree(leitura.root, 3, leitura._tombstones)
+
+    def test_snapshot_compacta(self):
+        """Caso: SUCESSO. O snapshot grava apenas as chaves vivas, sem compactar a árvore nem o snapshot de leitura."""
+        arvore = BTree.from_sorted(range(50), t=2, lazy_delete=True, compaction_ratio=1.0)
+        arvore.delete_many(range(10))
+        leitura, raiz = arvore.snapshot(), arvore.root
+        assert list(BTree.from_bytes(arvore.to_bytes())) == list(range(10, 50))
+        assert list(BTree.from_bytes(leitura.to_bytes())) == list(range(10, 50))
+        assert arvore.root is raiz and len(arvore._tombstones) == 10 and len(leitura._tombstones) == 10
+
+    def test_proporcao_invalida(self):
+        """Caso: EXCEÇÃO. A proporção de compactação deve estar em (0, 1]."""
+        with pytest.raises(ValueError): BTree(t=2, compaction_ratio=0)
+
+
+class TestBTreeCopiaSobEscrita:
+    """Testes dos snapshots de leitura com cópia sob escrita."""
+
+    @staticmethod
+    def _nos(raiz: BTreeNode) -> set:
+        """Retorna os ids de todos os nós da subárvore."""
+        pilha, ids = [raiz], set()
+        while pilha:
+            no = pilha.pop()
+            ids.add(id(no))
+            pilha.extend(no.children)
+        return ids
+
+    @pytest.mark.parametrize("lazy_delete", [False, True])
+    def test_snapshot_estavel(self, lazy_delete: bool):
+        """Caso: SUCESSO. Escritas posteriores não alteram o snapshot, que continua uma árvore válida."""
+        arvore = BTree(t=2, check_mode=CheckMode.CHEAP, lazy_delete=lazy_delete)
+        arvore.insert_many(range(0, 400, 2))
+        antes = arvore.snapshot()
+        rng = random.Random(19)
+        for k in rng.sample(range(400), 150):
+            if k in arvore: arvore.delete(k)
+            else: arvore.insert(k)
+        arvore.insert_many(range(400, 500))
+        assert list(antes) == list(range(0, 400, 2)) and len(antes) == 200 and antes.rank(100) == 50
+        assert _check_subtree(antes.root, 2, antes._tombstones) and _check_subtree(arvore.root, 2, arvore._tombstones)
+        assert list(BTree.from_bytes(antes.to_bytes())) == list(antes)
+        with pytest.raises(NotImplementedError):
+            antes.insert(1)
+
+    def test_escrita_copia_apenas_o_caminho(self):
+        """Caso: SUCESSO. Uma inserção após o snapshot copia só os nós do caminho até a folha."""
+        arvore = BTree.from_sorted(range(0, 20000, 2), t=4, fill_factor=0.5, check_mode=CheckMode.OFF)
+        snap = arvore.snapshot()
+        arvore.insert(5001)
+        novos = self._nos(arvore.root) - self._nos(snap.root)
+        assert len(novos) == arvore.get_height() + 1
+        assert 5001 in arvore and 5001 not in snap
+
+
+class TestBTreeDivisaoJuncao:
+    """Testes de `split`, `join` e das operações de conjunto."""
+
+    @pytest.mark.parametrize("t", [2, 3, 5])
+    def test_split_e_join(self, t: int):
+        """Caso: SUCESSO. As partes e a junção são árvores válidas e a árvore original não muda."""
+        rng = random.Random(20 + t)
+        chaves = rng.sample(range(5000), 800)
+        arvore = BTree.bulk_load(chaves, t, check_mode=CheckMode.CHEAP)
+        for k in [-1, 0, rng.choice(chaves), rng.randrange(5000), 5000]:
+            esquerda, direita = arvore.split(k)
+            assert list(esquerda) == sorted(c for c in chaves if c < k)
+            assert list(direita) == sorted(c for c in chaves if c >= k)
+            assert _check_subtree(esquerda.root, t) and _check_subtree(direita.root, t)
+            assert len(esquerda) + len(direita) == 800 and list(arvore) == sorted(chaves)
+            esquerda.insert(-5)
+            juncao = BTree.join(esquerda, direita)
+            assert list(juncao) == [-5] + sorted(chaves) and _check_subtree(juncao.root, t)
+            juncao.delete_many(chaves[:100])
+            assert len(esquerda) + len(direita) == 801 and list(arvore) == sorted(chaves)
+
+    def test_split_com_remocao_preguicosa(self):
+        """Caso: SUCESSO. As marcas de remoção vão para a parte da chave correspondente."""
+        arvore = BTree.from_sorted(range(100), t=3, lazy_delete=True, compaction_ratio=1.0)
+        arvore.delete_many([10, 60])
+        esquerda, direita = arvore.split(50)
+        assert 10 not in esquerda and 60 not in direita and len(esquerda) == len(direita) == 49
+
+    def test_join_chaves_sobrepostas(self):
+        """Caso: EXCEÇÃO. As chaves da árvore da esquerda devem ser menores que as da direita."""
+        with pytest.raises(ValueError):
+            BTree.join(BTree.from_sorted(range(10), t=2), BTree.from_sorted(range(5, 20), t=2))
+
+    def test_operacoes_de_conjunto(self):
+        """Caso: SUCESSO. União, interseção e diferença coincidem com as de `set`."""
+        rng = random.Random(20)
+        a, b = set(rng.sample(range(1000), 300)), set(rng.sample(range(1000), 400))
+        arvore_a, arvore_b = BTree.bulk_load(a, t=3), BTree.bulk_load(b, t=4)
+        assert list(arvore_a.union(arvore_b)) == sorted(a | b)
+        assert list(arvore_a.intersection(arvore_b)) == sorted(a & b)
+        assert list(arvore_a.difference(arvore_b)) == sorted(a - b)
+        assert _check_subtree(arvore_a.union(arvore_b, fill_factor=0.5).root, 3)
+
+
+class TestBTreeChavesGenericas:
+    """Testes com chaves que não são inteiras e com o nó de prefixo comprimido."""
+
+    @staticmethod
+    def _urls(n: int, seed: int) -> list:
+        """Retorna `n` URLs distintas com prefixos longos em comum."""
+        rng = random.Random(seed)
+        hosts = ["https://www.exemplo.com.br/produtos/", "https://blog.exemplo.com.br/2024/", "http://wiki.org/pagina/"]
+        return list({rng.choice(hosts) + str(rng.randrange(10 * n)) for _ in range(n)})
+
+    @pytest.mark.parametrize("node_class", [BTreeNode, PrefixBTreeNode])
+    @pytest.mark.parametrize("codificar", [False, True])
+    def test_operacoes_com_textos(self, node_class: type, codificar: bool):
+        """Caso: SUCESSO. Inserção, remoção, busca, intervalos e posições funcionam com str e bytes."""
+        urls = [u.encode() if codificar else u for u in self._urls(400, 21)]
+        arvore = BTree(t=3, check_mode=CheckMode.CHEAP, node_class=node_class)
+        arvore.insert_many(urls)
+        for u in urls[:150]: arvore.delete(u)
+        esperado = sorted(urls[150:])
+        assert list(arvore) == esperado and _check_subtree(arvore.root, 3)
+        assert all(u in arvore for u in esperado) and not any(u in arvore for u in urls[:150])
+        assert arvore.rank(esperado[100]) == 100 and arvore.select(100) == esperado[100]
+        assert list(arvore.range(esperado[10], esperado[20], inclusive=False)) == esperado[11:20]
+        consultas = [esperado[5], urls[0], esperado[-1]]
+        assert arvore.search_many(consultas).tolist() == [True, False, True]
+        assert arvore.search_many(consultas, positions=True).tolist() == [5, -1, len(esperado) - 1]
+
+    def test_nos_guardam_prefixo(self):
+        """Caso: SUCESSO. Os nós de prefixo guardam o prefixo comum uma vez e buscam pelos sufixos."""
+        urls = sorted(self._urls(1000, 22))
+        arvore = BTree.from_sorted(urls, t=8, node_class=PrefixBTreeNode)
+        folha = arvore.root
+        while not folha.leaf: folha = folha.children[0]
+        assert isinstance(folha.keys, PrefixKeys) and folha.keys.prefix.startswith("http")
+        assert list(folha.keys) == urls[:len(folha.keys)]
+        assert folha.keys.bisect_left(urls[3]) == 3 and folha.keys.bisect_left("a") == 0
+        assert all(u in arvore for u in urls) and "https://www.exemplo.com.br/" not in arvore
+
+    def test_chaves_misturadas_no_prefixo(self):
+        """Caso: EXCEÇÃO. O nó de prefixo só aceita chaves str ou bytes."""
+        with pytest.raises(TypeError):
+            PrefixKeys([1, 2])
+
+    def test_snapshot_binario_exige_inteiros(self):
+        """Caso: EXCEÇÃO. O snapshot binário só guarda chaves inteiras."""
+        with pytest.raises(TypeError, match="inteiras"):
+            BTree.from_sorted(["a", "b"], t=2).to_bytes()
+
+    def test_classe_de_no_sem_gancho_de_busca(self):
+        """Caso: SUCESSO. Uma classe de nó sem `bisect_keys` usa a bisseção comum."""
+        class NoSimples:
+            def __init__(self, leaf: bool = False):
+                self.leaf, self.keys, self.children, self.size = leaf, [], [], 0
+
+        arvore = BTree.from_sorted(range(0, 200, 2), t=3, node_class=NoSimples)
+        arvore.insert(7)
+        arvore.delete(10)
+        assert 7 in arvore and 10 not in arvore and arvore.rank(12) == 6
@@ -0,0 +1,50 @@
+import random
+import pytest
+from buffered_b_tree import BufferedBTree
+from contracts_helpers import CheckMode, _check_subtree
+
+class TestBufferedBTree:
+    """Testes da Árvore-B com buffers de escrita."""
+
+    @pytest.mark.parametrize("t, buffer_size", [(2, 1), (2, 4), (3, 16)])
+    def test_equivale_a_um_conjunto(self, t: int, buffer_size: int):
+        """Caso: SUCESSO. Escritas cegas intercaladas com consultas se comportam como um conjunto."""
+        arvore, esperado = BufferedBTree(t, buffer_size=buffer_size), set()
+        rng = random.Random(t * 100 + buffer_size)
+        for passo in range(1500):
+            k = rng.randrange(300)
+            if rng.random() < 0.55:
+                arvore.insert(k)
+                esperado.add(k)
+            else:
+                arvore.delete(k)
+                esperado.discard(k)
+            if passo % 50 == 0: assert all((q in arvore) == (q in esperado) for q in range(0, 300, 7))
+            assert _check_subtree(arvore.root, t, arvore._tombstones)
+        assert list(arvore) == sorted(esperado) and len(arvore) == len(esperado)
+        assert arvore.rank(150) == len([k for k in esperado if k < 150])
+
+    def test_mensagens_pendentes(self):
+        """Caso: SUCESSO. As consultas enxergam as mensagens ainda nos buffers, e a mais recente prevalece."""
+        arvore = BufferedBTree.from_sorted(range(0, 2000, 2), t=4, buffer_size=1000, check_mode=CheckMode.OFF, stats=True)
+        arvore.insert_many([1, 3, 5])
+        arvore.delete_many([0, 3])
+        arvore.insert(0)
+        assert arvore.stats.counters["flushes"] == 0 and arvore.root.buffer
+        assert [k in arvore for k in range(7)] == [True, True, True, False, True, True, True]
+        assert arvore.search(5) is not None and not arvore.root.buffer
+        assert list(arvore.range(0, 6)) == [0, 1, 2, 4, 5, 6]
+
+    def test_busca_em_lote_com_buffers(self):
+        """Caso: SUCESSO. `search_many` combina as mensagens pendentes com a máscara da árvore."""
+        pytest.importorskip("numpy")
+        arvore = BufferedBTree.from_sorted(range(100), t=2, buffer_size=500, check_mode=CheckMode.OFF)
+        arvore.delete_many(range(0, 100, 10))
+        arvore.insert(500)
+        assert arvore.search_many([0, 1, 500, 501]).tolist() == [False, True, True, False]
+        assert arvore.search_many([1, 500], positions=True).tolist() == [0, 90]
+
+    def test_tamanho_de_buffer_invalido(self):
+        """Caso: EXCEÇÃO. O buffer deve comportar ao menos uma mensagem."""
+        with pytest.raises(ValueError):
+            BufferedBTree(t=2, buffer_size=0)
@@ -0,0 +1,82 @@
+import random
+import sys
+import threading
+import pytest
+import icontract
+from b_tree import BTree
+from concurrent_b_tree import ConcurrentBTree
+from contracts_helpers import _check_subtree
+
+def _validar(arvore: ConcurrentBTree) -> BTree:
+    """Recarrega a árvore por snapshot, que recalcula os tamanhos, e verifica sua estrutura."""
+    copia = BTree.from_bytes(arvore.to_bytes())
+    assert _check_subtree(copia.root, arvore.t)
+    return copia
+
+class TestConcurrentBTree:
+    """Testes da Árvore-B com travas por nó."""
+
+    def test_operacoes_sequenciais(self):
+        """Caso: SUCESSO. Sem concorrência, a árvore se comporta como a `BTree`."""
+        arvore = ConcurrentBTree(t=2)
+        chaves = random.Random(3).sample(range(1000), 400)
+        for k in chaves: arvore.insert(k)
+        for k in chaves[::2]: arvore.delete(k)
+        restantes = sorted(chaves[1::2])
+        assert list(arvore) == restantes and len(arvore) == 200
+        assert arvore.search(restantes[0]) is not None and chaves[0] not in arvore
+        assert list(_validar(arvore)) == restantes
+        assert arvore.insert_many([5000, restantes[0], 5000]) == [(5000, True), (restantes[0], False), (5000, False)]
+
+    def test_violacoes_e_operacoes_nao_suportadas(self):
+        """Caso: EXCEÇÃO. Duplicatas e ausências violam os contratos; estatísticas de ordem não existem."""
+        arvore = ConcurrentBTree.from_sorted(range(50), t=3)
+        assert len(arvore) == 50
+        with pytest.raises(icontract.ViolationError):
+            arvore.insert(10)
+        with pytest.raises(icontract.ViolationError):
+            arvore.delete(100)
+        with pytest.raises(NotImplementedError):
+            arvore.rank(10)
+        with pytest.raises(TypeError):
+            ConcurrentBTree.from_sorted(range(10), 2, stats=True)
+        assert list(ConcurrentBTree.bulk_load([3, 1, 2], 2)) == [1, 2, 3]
+        assert len(ConcurrentBTree.from_bytes(arvore.to_bytes())) == 50
+
+    @pytest.mark.parametrize("t", [2, 3])
+    def test_estresse_com_varias_threads(self, t: int):
+        """Caso: SUCESSO. Escritores em faixas disjuntas e leitores concorrentes mantêm a árvore válida."""
+        estaveis = list(range(0, 40000, 40))
+        arvore = ConcurrentBTree.from_sorted(estaveis, t=t)
+        esperado, erros = [set() for _ in range(4)], []
+
+        def escritor(indice: int):
+            rng = random.Random(indice)
+            faixa = [k for k in range(indice * 10000, (indice + 1) * 10000) if k % 40][:600]
+            for _ in range(1500):
+                k = rng.choice(faixa)
+                if k in esperado[indice]:
+                    arvore.delete(k)
+                    esperado[indice].discard(k)
+                else:
+                    arvore.insert(k)
+                    esperado[indice].add(k)
+
+        def leitor(indice: int):
+            rng = random.Random(100 + indice)
+            for _ in range(3000):
+                k = rng.choice(estaveis)
+                if k not in arvore: erros.append(k)
+
+        intervalo = sys.getswitchinterval()
+        sys.setswitchinterval(1e-5)
+        try:
+            threads = [threading.Thread(target=escritor, args=(i,)) for i in range(4)]
+            threads += [threading.Thread(target=leitor, args=(i,)) for i in range(2)]
+            for th in threads: th.start()
+            for th in threads: th.join()
+        finally:
+            sys.setswitchinterval(intervalo)
+        assert not erros
+        todas = sorted(set(estaveis).union(*esperado))
+        assert list(_validar(arvore)) == todas and len(arvore) == len(todas)
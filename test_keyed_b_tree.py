@@ -0,0 +1,44 @@
+import random
+import pytest
+from contracts_helpers import CheckMode, _check_subtree
+from keyed_b_tree import KeyedBTree
+
+class TestKeyedBTree:
+    """Testes da Árvore-B ordenada por uma função de chave."""
+
+    def test_ordem_pela_funcao_de_chave(self):
+        """Caso: SUCESSO. Os valores ficam na ordem das chaves e são devolvidos como foram inseridos."""
+        arvore = KeyedBTree(t=2, key=str.casefold, check_mode=CheckMode.FULL)
+        for nome in ["Maria", "joão", "Ana", "carlos", "Bia", "ana"]:
+            if nome not in arvore: arvore.insert(nome)
+        assert list(arvore) == ["Ana", "Bia", "carlos", "joão", "Maria"]
+        assert "MARIA" in arvore and arvore.rank("CARLOS") == 2 and arvore.select(-1) == "Maria"
+        assert list(arvore.range("b", "k")) == ["Bia", "carlos", "joão"]
+        assert arvore.cursor().seek("c").key == "carlos"
+        arvore.delete("ana")
+        assert list(reversed(arvore)) == ["Maria", "joão", "carlos", "Bia"]
+
+    def test_registros_como_indice_secundario(self):
+        """Caso: SUCESSO. Registros são indexados por um campo, com lotes, divisão e operações de conjunto."""
+        rng = random.Random(21)
+        registros = [(f"/docs/{rng.randrange(10 ** 6):07d}", i) for i in range(500)]
+        arvore = KeyedBTree.bulk_load(registros, t=4, key=lambda r: r[0])
+        por_caminho = {}
+        for r in registros: por_caminho.setdefault(r[0], r)
+        esperado = [por_caminho[c] for c in sorted(por_caminho)]
+        assert list(arvore) == esperado and _check_subtree(arvore.root, 4)
+        resultado = arvore.delete_many([esperado[0], ("/docs/inexistente", -1)])
+        assert resultado == [(esperado[0], True), (("/docs/inexistente", -1), False)]
+        esquerda, direita = arvore.split(("/docs/0500000", None))
+        assert list(esquerda) + list(direita) == esperado[1:]
+        assert all(r[0] < "/docs/0500000" for r in esquerda)
+        assert list(esquerda.union(direita)) == esperado[1:] and list(arvore.difference(direita)) == list(esquerda)
+        assert arvore.search_many([esperado[1], ("/x", 0)]).tolist() == [True, False]
+
+    def test_snapshots_nao_suportados(self):
+        """Caso: EXCEÇÃO. Snapshots de leitura e binários não são suportados."""
+        arvore = KeyedBTree(t=2, key=len)
+        with pytest.raises(NotImplementedError):
+            arvore.snapshot()
+        with pytest.raises(NotImplementedError):
+            KeyedBTree.from_bytes(b"")
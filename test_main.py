@@ -0,0 +1,22 @@
+import io
+from b_tree import BTree
+from main import run_stream
+
+class TestModoBatch:
+    """Testes do modo não interativo de `main.py`."""
+
+    def test_operacoes_e_resultados(self):
+        """Caso: SUCESSO. Cada linha de operação produz uma linha de resultado, na ordem da entrada."""
+        entrada = ["i 5 7 9 5", "", "# comentário", "i 7 11", "s 5 6 11", "d 5 6", "r 0 100", "c 6 10"]
+        saida = io.StringIO()
+        total = run_stream(BTree(t=2, check_mode="off"), entrada, saida, chunk=3)
+        assert saida.getvalue().splitlines() == ["i 1 1 1 0", "i 0 1", "s 1 0 1", "d 1 0", "r 7 9 11", "c 2"]
+        assert total == 13
+
+    def test_linhas_invalidas(self):
+        """Caso: EXCEÇÃO. Linhas inválidas geram uma linha de erro e o processamento continua."""
+        saida = io.StringIO()
+        run_stream(BTree(t=2, check_mode="off"), ["i 1", "x 2", "s a", "r 1", "s 1"], saida)
+        linhas = saida.getvalue().splitlines()
+        assert linhas[0] == "i 1" and linhas[-1] == "s 1"
+        assert [linha.split()[:2] for linha in linhas[1:4]] == [["e", "2"], ["e", "3"], ["e", "4"]]
@@ -0,0 +1,54 @@
+import random
+import pytest
+from contracts_helpers import CheckMode, _check_subtree
+from paged_b_tree import PagedBTree
+
+@pytest.fixture
+def caminho(tmp_path) -> str:
+    """Retorna o caminho de um arquivo de páginas ainda inexistente."""
+    return str(tmp_path / "arvore.db")
+
+class TestPagedBTree:
+    """Testes da Árvore-B paginada em disco com buffer pool."""
+
+    def test_operacoes_com_pool_pequeno(self, caminho: str):
+        """Caso: SUCESSO. Com poucas páginas em memória, as evicções preservam o conteúdo."""
+        rng, esperado = random.Random(7), set()
+        with PagedBTree(t=2, path=caminho, pool_pages=8, check_mode=CheckMode.FULL) as arvore:
+            for _ in range(300):
+                k = rng.randrange(150)
+                if k in esperado:
+                    arvore.delete(k)
+                    esperado.discard(k)
+                else:
+                    arvore.insert(k)
+                    esperado.add(k)
+            assert list(arvore) == sorted(esperado) and len(arvore) == len(esperado)
+            assert arvore.pool.evictions > 0 and arvore.pool.writes > 0
+
+    def test_arvore_persiste_entre_aberturas(self, caminho: str):
+        """Caso: SUCESSO. Reabrir o arquivo recupera a raiz e todas as chaves."""
+        with PagedBTree(t=3, path=caminho, pool_pages=16) as arvore:
+            arvore.insert_many(range(0, 1000, 3))
+            arvore.delete_many(range(0, 1000, 9))
+        with PagedBTree.open(caminho, pool_pages=16) as arvore:
+            esperado = [k for k in range(0, 1000, 3) if k % 9]
+            assert arvore.t == 3 and list(arvore) == esperado
+            assert _check_subtree(arvore.root, arvore.t)
+
+    def test_paginas_liberadas_sao_reaproveitadas(self, caminho: str):
+        """Caso: SUCESSO. Fusões devolvem páginas, reutilizadas nas inserções seguintes."""
+        with PagedBTree(t=2, path=caminho, pool_pages=8) as arvore:
+            arvore.insert_many(range(500))
+            paginas = arvore._page_file._page_count
+            arvore.delete_many(range(500))
+            arvore.insert_many(range(500))
+            assert arvore._page_file._page_count == paginas
+
+    def test_excecao_ordem_diferente_e_pool_pequeno(self, caminho: str):
+        """Caso: EXCEÇÃO. Abrir com outra ordem ou com um pool pequeno demais é rejeitado."""
+        PagedBTree(t=3, path=caminho).close()
+        with pytest.raises(ValueError, match="criado com t=3"):
+            PagedBTree(t=4, path=caminho)
+        with pytest.raises(ValueError, match="ao menos 8 páginas"):
+            PagedBTree(t=3, path=caminho, pool_pages=2)
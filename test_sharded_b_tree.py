@@ -0,0 +1,52 @@
+import random
+import sys
+from array import array
+import pytest
+import icontract
+from b_tree_node import CompactBTreeNode
+from contracts_helpers import _check_subtree
+from sharded_b_tree import ShardedBTree, _partition
+
+class TestShardedBTree:
+    """Testes da Árvore-B particionada por intervalos de chaves."""
+
+    @pytest.mark.parametrize("workers", [0, 2])
+    def test_construcao_e_consultas(self, workers: int):
+        """Caso: SUCESSO. A construção em paralelo equivale a uma única árvore com as mesmas chaves."""
+        rng = random.Random(18)
+        chaves = [rng.randrange(100000) for _ in range(5000)]
+        arvore = ShardedBTree.build(chaves, t=3, shards=4, workers=workers, node_class=CompactBTreeNode)
+        esperado = sorted(set(chaves))
+        assert len(arvore.shards) == 4 and all(_check_subtree(s.root, 3) for s in arvore.shards)
+        assert list(arvore) == esperado and list(reversed(arvore)) == esperado[::-1] and len(arvore) == len(esperado)
+        assert list(arvore.range(20000, 60000, inclusive=(True, False))) == [k for k in esperado if 20000 <= k < 60000]
+        assert arvore.count_range(hi=50000) == len([k for k in esperado if k <= 50000])
+        assert arvore.rank(esperado[2000]) == 2000 and arvore.select(-1) == esperado[-1]
+        assert arvore.map_shards(len, workers=workers) == [len(s) for s in arvore.shards]
+        assert list(arvore.to_tree()) == esperado
+
+    def test_particao_sem_numpy(self, monkeypatch):
+        """Caso: SUCESSO. Sem numpy, as chaves vão para as mesmas partições, e os limites ficam à direita."""
+        pytest.importorskip("numpy")
+        chaves, limites = [7, 100, 3, 250, 199, 100, 200, -5], [100, 200]
+        com_numpy = _partition(chaves, limites)
+        monkeypatch.setitem(sys.modules, "numpy", None)
+        sem_numpy = _partition(chaves, limites)
+        assert [sorted(array("q", p)) for p in com_numpy] == [sorted(array("q", p)) for p in sem_numpy]
+        assert [sorted(array("q", p)) for p in sem_numpy] == [[-5, 3, 7], [100, 100, 199], [200, 250]]
+
+    def test_escritas_encaminhadas(self):
+        """Caso: SUCESSO. Escritas vão para a partição do intervalo da chave e respeitam os contratos dela."""
+        arvore = ShardedBTree(2, bounds=[100, 200])
+        assert arvore.insert_many([150, 5, 250, 150]) == [(150, True), (5, True), (250, True), (150, False)]
+        arvore.insert(100)
+        assert [len(s) for s in arvore.shards] == [1, 2, 1] and 100 in arvore.shard_for(199)
+        arvore.delete(5)
+        assert list(arvore) == [100, 150, 250] and arvore.search(250) is not None
+        with pytest.raises(icontract.ViolationError):
+            arvore.delete(5)
+
+    def test_limites_invalidos(self):
+        """Caso: EXCEÇÃO. Os limites das partições devem ser estritamente crescentes."""
+        with pytest.raises(ValueError):
+            ShardedBTree(2, bounds=[10, 10])